@@ -0,0 +1,60 @@
+# -*- coding: utf-8 -*-
+"""Measure the per-call overhead of looking up a component, before and after caching bound components.
+
+Run with:
+
+    python scripts/benchmarks/component_dispatch.py
+
+This doesn't need a running streamlit server (or a kiara context), it only measures the lookup path a
+'st.kiara.<component_name>' access goes through.
+"""
+import tempfile
+import timeit
+from functools import partial
+
+from kiara_streamlit.components.mgmt import ComponentMgmt, KiaraComponents
+
+COMPONENT_NAMES = ["value_select_box", "write_value", "sql_query", "write_valueset"]
+NUMBER = 100000
+
+component_mgmt = ComponentMgmt()
+components = KiaraComponents(component_mgmt=component_mgmt, temp_dir=tempfile.mkdtemp())
+session_state = {"__kiara_components__": components}
+
+
+def uncached_dispatch(component_name: str):
+    # what 'KiaraStreamlit._get_component' used to do on every access
+    if "__kiara_components__" not in session_state.keys():
+        raise Exception("No components object.")
+    comps = session_state["__kiara_components__"]
+    func = component_mgmt.get_component(component_name)
+    return partial(func, comps)
+
+
+def cached_dispatch(component_name: str):
+
+    comps = session_state.get("__kiara_components__", None)
+    return comps.get_component(component_name)
+
+
+def run():
+
+    # make sure all component collections are imported, so we only measure the lookup itself
+    for name in COMPONENT_NAMES:
+        uncached_dispatch(name)
+        cached_dispatch(name)
+
+    results = {}
+    for label, func in [("uncached", uncached_dispatch), ("cached", cached_dispatch)]:
+        duration = timeit.timeit(
+            lambda: [func(name) for name in COMPONENT_NAMES], number=NUMBER
+        )
+        per_call = duration / (NUMBER * len(COMPONENT_NAMES)) * 1000000000
+        results[label] = per_call
+        print(f"{label:>10}: {per_call:8.1f} ns per component lookup")
+
+    print(f"   speedup: {results['uncached'] / results['cached']:8.1f}x")
+
+
+if __name__ == "__main__":
+    run()
@@ -11,6 +11,10 @@ import streamlit as st
 from kiara import KiaraEntryPointItem, find_kiara_modules_under
 from kiara.config import KiaraConfig
 
+from kiara_streamlit.defaults import (
+    SHARED_VALUE_CACHE_MAX_BYTES,
+    VALUE_CACHE_MAX_BYTES,
+)
 from kiara_streamlit.streamlit import KiaraStreamlit
 
 __author__ = """Markus Binsteiner"""
@@ -41,12 +45,37 @@ modules: KiaraEntryPointItem = (find_kiara_modules_under, ["kiara_streamlit"])
 def init(
     kiara_config: typing.Union[
         None, KiaraConfig, typing.Mapping[str, typing.Any]
-    ] = None
+    ] = None,
+    shared_context: bool = False,
+    context_pool_size: int = 0,
+    value_cache_size: int = VALUE_CACHE_MAX_BYTES,
+    shared_value_cache_size: int = SHARED_VALUE_CACHE_MAX_BYTES,
 ) -> KiaraStreamlit:
+    """Initialize the kiara streamlit context, and attach it to the 'st' module as 'st.kiara'.
+
+    If 'shared_context' is set to 'True', all browser sessions of this streamlit server will use the same kiara
+    context, instead of creating a new one for every session. That context (including its data registry and aliases)
+    is not isolated per session: values saved in one session are visible in all others, and only writes done by
+    components are serialized, so this is best suited for mostly read-only apps (see 'SharedKiaraContext').
+
+    If 'context_pool_size' is larger than 0 (and 'shared_context' is not used), that many kiara contexts will be created
+    in a background thread ahead of time, and handed out to new sessions when they are first needed.
+
+    'value_cache_size' is the memory budget (in bytes) of the per-session cache for value data and conversions (like
+    the pandas dataframes that are used to display tables). Arrow data (tables, arrays) is also shared between all
+    sessions, via a process-wide cache with a memory budget of 'shared_value_cache_size' bytes (set to 0 to disable).
+    """
+
     @st.experimental_singleton
     def get_ktx() -> KiaraStreamlit:
 
-        ktx = KiaraStreamlit(kiara_config=kiara_config)
+        ktx = KiaraStreamlit(
+            kiara_config=kiara_config,
+            shared_context=shared_context,
+            context_pool_size=context_pool_size,
+            value_cache_size=value_cache_size,
+            shared_value_cache_size=shared_value_cache_size,
+        )
         return ktx
 
     if not hasattr(st, "kiara"):
@@ -0,0 +1,87 @@
+# -*- coding: utf-8 -*-
+"""Helpers to send Arrow data to the browser, without converting it to pandas first.
+
+Streamlit serializes everything that is displayed via 'dataframe'/'table' as Arrow IPC stream anyway, and accepts
+Arrow tables as input directly. Its frontend needs the (pandas) schema metadata pandas would create though, which is
+what 'with_display_metadata' adds.
+"""
+
+import json
+import typing
+
+import pyarrow as pa
+
+
+def _pandas_type(arrow_type: pa.DataType) -> typing.Tuple[str, str]:
+
+    try:
+        from pyarrow.pandas_compat import get_logical_type
+
+        pandas_type = get_logical_type(arrow_type)
+    except Exception:
+        pandas_type = "object"
+
+    if pa.types.is_dictionary(arrow_type):
+        return pandas_type, str(arrow_type.index_type.to_pandas_dtype().__name__)
+
+    # the numpy types pandas would use for the converted columns
+    if pa.types.is_timestamp(arrow_type):
+        return pandas_type, "datetime64[ns]"
+    if pa.types.is_boolean(arrow_type):
+        return pandas_type, "bool"
+    if pa.types.is_integer(arrow_type) or pa.types.is_floating(arrow_type):
+        return pandas_type, str(arrow_type.to_pandas_dtype().__name__)
+    return pandas_type, "object"
+
+
+def with_display_metadata(table: pa.Table, offset: int = 0) -> pa.Table:
+    """Add the schema metadata streamlit needs to display an Arrow table directly (zero-copy).
+
+    The rows are displayed with index 'offset' to 'offset + num_rows - 1'.
+    """
+
+    columns = []
+    for field, column in zip(table.schema, table.columns):
+        pandas_type, numpy_type = _pandas_type(field.type)
+        metadata = None
+        if pa.types.is_dictionary(field.type):
+            num_categories = len(column.chunk(0).dictionary) if column.num_chunks else 0
+            metadata = {"num_categories": num_categories, "ordered": field.type.ordered}
+        elif pa.types.is_timestamp(field.type) and field.type.tz:
+            metadata = {"timezone": field.type.tz}
+        columns.append(
+            {
+                "name": field.name,
+                "field_name": field.name,
+                "pandas_type": pandas_type,
+                "numpy_type": numpy_type,
+                "metadata": metadata,
+            }
+        )
+
+    pandas_metadata = {
+        "index_columns": [
+            {
+                "kind": "range",
+                "name": None,
+                "start": offset,
+                "stop": offset + table.num_rows,
+                "step": 1,
+            }
+        ],
+        "column_indexes": [
+            {
+                "name": None,
+                "field_name": None,
+                "pandas_type": "unicode",
+                "numpy_type": "object",
+                "metadata": {"encoding": "UTF-8"},
+            }
+        ],
+        "columns": columns,
+        "creator": {"library": "pyarrow", "version": pa.__version__},
+    }
+
+    schema_metadata: typing.Dict[bytes, bytes] = dict(table.schema.metadata or {})
+    schema_metadata[b"pandas"] = json.dumps(pandas_metadata).encode("utf-8")
+    return table.replace_schema_metadata(schema_metadata)
@@ -0,0 +1,342 @@
+# -*- coding: utf-8 -*-
+import collections
+import sys
+import threading
+import typing
+import uuid
+
+import pyarrow as pa
+
+# rough memory use of a node and an edge of a networkx graph (without attributes)
+_GRAPH_NODE_MEMORY_SIZE = 300
+_GRAPH_EDGE_MEMORY_SIZE = 150
+
+
+def estimate_size(item: typing.Any) -> typing.Optional[int]:
+    """Estimate the memory footprint of a cached item, in bytes.
+
+    Returns 'None' for items whose size can't be estimated (for example containers, where 'sys.getsizeof' would only
+    count the container itself, not its content).
+    """
+
+    if isinstance(item, (pa.Table, pa.Array, pa.ChunkedArray, pa.RecordBatch)):
+        return item.nbytes
+
+    if isinstance(item, (str, bytes, int, float, bool)) or item is None:
+        return sys.getsizeof(item)
+
+    try:
+        import pandas as pd
+
+        if isinstance(item, pd.DataFrame):
+            return int(item.memory_usage(index=True, deep=True).sum())
+        if isinstance(item, pd.Series):
+            return int(item.memory_usage(index=True, deep=True))
+    except ImportError:
+        pass
+
+    try:
+        import numpy as np
+
+        if isinstance(item, np.ndarray) and item.dtype != object:
+            return item.nbytes
+    except ImportError:
+        pass
+
+    try:
+        import networkx as nx
+
+        if isinstance(item, nx.Graph):
+            return (
+                item.number_of_nodes() * _GRAPH_NODE_MEMORY_SIZE
+                + item.number_of_edges() * _GRAPH_EDGE_MEMORY_SIZE
+            )
+    except ImportError:
+        pass
+
+    return None
+
+
+class LRUCache(object):
+    """A least-recently-used cache, with a memory budget (in bytes) instead of a max. number of items.
+
+    Items that are larger than the whole budget are never cached, and neither are items whose size is not provided
+    and can't be estimated (see 'estimate_size').
+    """
+
+    def __init__(self, max_bytes: int):
+
+        if max_bytes < 0:
+            raise ValueError(f"Invalid max. cache size '{max_bytes}': must be >= 0.")
+
+        self._max_bytes: int = max_bytes
+        # key -> (item, size)
+        self._items: collections.OrderedDict = collections.OrderedDict()
+        self._size: int = 0
+        self._lock = threading.RLock()
+
+        self._hits: int = 0
+        self._misses: int = 0
+        self._evictions: int = 0
+
+    @property
+    def max_bytes(self) -> int:
+        return self._max_bytes
+
+    def __contains__(self, key: typing.Hashable) -> bool:
+        return key in self._items.keys()
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def get(self, key: typing.Hashable, default: typing.Any = None) -> typing.Any:
+
+        with self._lock:
+            item = self._items.get(key, None)
+            if item is None:
+                self._misses = self._misses + 1
+                return default
+            self._items.move_to_end(key)
+            self._hits = self._hits + 1
+            return item[0]
+
+    def put(
+        self, key: typing.Hashable, item: typing.Any, size: typing.Optional[int] = None
+    ) -> bool:
+        """Add an item to the cache, evicting least recently used items if necessary.
+
+        Returns whether the item was cached.
+        """
+
+        if size is None:
+            size = estimate_size(item)
+
+        with self._lock:
+            self._remove(key)
+            if size is None or size > self._max_bytes:
+                return False
+
+            while self._size + size > self._max_bytes:
+                self._evict()
+
+            self._items[key] = (item, size)
+            self._size = self._size + size
+            return True
+
+    def get_or_create(
+        self,
+        key: typing.Hashable,
+        create: typing.Callable[[], typing.Any],
+        size: typing.Optional[typing.Callable[[typing.Any], int]] = None,
+    ) -> typing.Any:
+        """Return the cached item for a key, or create (and cache) it if it is not in the cache yet."""
+
+        marker = self._items
+        item = self.get(key, default=marker)
+        if item is marker:
+            item = create()
+            self.put(key, item, size=size(item) if size is not None else None)
+        return item
+
+    def remove(self, key: typing.Hashable) -> None:
+
+        with self._lock:
+            self._remove(key)
+
+    def clear(self) -> None:
+
+        with self._lock:
+            self._items.clear()
+            self._size = 0
+
+    def _remove(self, key: typing.Hashable) -> None:
+
+        item = self._items.pop(key, None)
+        if item is not None:
+            self._size = self._size - item[1]
+
+    def _evict(self) -> None:
+
+        _, (_, size) = self._items.popitem(last=False)
+        self._size = self._size - size
+        self._evictions = self._evictions + 1
+
+    @property
+    def stats(self) -> typing.Mapping[str, typing.Any]:
+        """Usage statistics for this cache (hits, misses, evictions, size in bytes)."""
+
+        with self._lock:
+            return {
+                "items": len(self._items),
+                "size": self._size,
+                "max_size": self._max_bytes,
+                "hits": self._hits,
+                "misses": self._misses,
+                "evictions": self._evictions,
+            }
+
+
+def is_shareable(item: typing.Any) -> bool:
+    """Whether an item can be shared between sessions (which is only the case for immutable Arrow data)."""
+
+    return isinstance(item, (pa.Table, pa.Array, pa.ChunkedArray, pa.RecordBatch))
+
+
+class SharedValueCache(object):
+    """A process-wide cache for (immutable) Arrow value data, shared between all sessions.
+
+    Sessions register themselves (usually via their components object), and every cache entry keeps track of the
+    sessions that use it. Sessions need to be released explicitly once they end (see 'release_session' and
+    'release_inactive_sessions'). If the memory budget is exceeded, entries that are not used by any session are evicted
+    first (least recently used first), and only then entries that are still in use.
+    """
+
+    def __init__(self, max_bytes: int):
+
+        if max_bytes < 0:
+            raise ValueError(f"Invalid max. cache size '{max_bytes}': must be >= 0.")
+
+        self._max_bytes: int = max_bytes
+        # value_id -> (item, size, session ids)
+        self._entries: collections.OrderedDict = collections.OrderedDict()
+        self._size: int = 0
+        self._sessions: typing.Set[str] = set()
+        self._lock = threading.RLock()
+
+        self._hits: int = 0
+        self._misses: int = 0
+        self._evictions: int = 0
+
+    @property
+    def max_bytes(self) -> int:
+        return self._max_bytes
+
+    def __contains__(self, value_id: str) -> bool:
+        return value_id in self._entries.keys()
+
+    def register_session(self, session_id: typing.Optional[str] = None) -> str:
+        """Register a session (with a new, random id if none is provided).
+
+        Returns the session id to use for 'get'/'put'.
+        """
+
+        if session_id is None:
+            session_id = str(uuid.uuid4())
+        with self._lock:
+            self._sessions.add(session_id)
+        return session_id
+
+    def release_session(self, session_id: str) -> None:
+        """Remove all references of a session to cache entries."""
+
+        with self._lock:
+            self._sessions.discard(session_id)
+            for _, _, sessions in self._entries.values():
+                sessions.discard(session_id)
+
+    def release_inactive_sessions(
+        self, active_session_ids: typing.Iterable[str]
+    ) -> int:
+        """Release all registered sessions that are not in the provided list of active ones.
+
+        Returns the number of released sessions.
+        """
+
+        active = set(active_session_ids)
+        with self._lock:
+            inactive = [s for s in self._sessions if s not in active]
+            for session_id in inactive:
+                self.release_session(session_id)
+        return len(inactive)
+
+    def get(
+        self, value_id: str, session_id: str, default: typing.Any = None
+    ) -> typing.Any:
+
+        with self._lock:
+            entry = self._entries.get(value_id, None)
+            if entry is None:
+                self._misses = self._misses + 1
+                return default
+            self._entries.move_to_end(value_id)
+            entry[2].add(session_id)
+            self._hits = self._hits + 1
+            return entry[0]
+
+    def put(
+        self,
+        value_id: str,
+        item: typing.Any,
+        session_id: str,
+        size: typing.Optional[int] = None,
+    ) -> bool:
+        """Add value data to the cache, on behalf of a session.
+
+        Returns whether the item was cached (which it won't be if it is not Arrow data, or larger than the budget).
+        """
+
+        if not is_shareable(item):
+            return False
+
+        if size is None:
+            size = estimate_size(item)
+
+        with self._lock:
+            entry = self._entries.pop(value_id, None)
+            if entry is not None:
+                self._size = self._size - entry[1]
+            if size is None or size > self._max_bytes:
+                return False
+
+            self._evict(self._size + size - self._max_bytes)
+
+            self._entries[value_id] = (item, size, {session_id})
+            self._size = self._size + size
+            return True
+
+    def get_or_create(
+        self,
+        value_id: str,
+        session_id: str,
+        create: typing.Callable[[], typing.Any],
+    ) -> typing.Any:
+        """Return the cached data for a value id, or create (and cache, if possible) it."""
+
+        marker = self._entries
+        item = self.get(value_id, session_id=session_id, default=marker)
+        if item is marker:
+            item = create()
+            self.put(value_id, item, session_id=session_id)
+        return item
+
+    def _evict(self, required: int) -> None:
+
+        if required <= 0:
+            return
+
+        # first entries nobody uses anymore, then the ones that are still in use (least recently used first in both cases)
+        unused = [k for k, v in self._entries.items() if not v[2]]
+        used = [k for k, v in self._entries.items() if v[2]]
+        for value_id in unused + used:
+            if required <= 0:
+                break
+            _, size, _ = self._entries.pop(value_id)
+            self._size = self._size - size
+            self._evictions = self._evictions + 1
+            required = required - size
+
+    @property
+    def stats(self) -> typing.Mapping[str, typing.Any]:
+        """Usage statistics for this cache (hits, misses, evictions, size in bytes, sessions)."""
+
+        with self._lock:
+            return {
+                "items": len(self._entries),
+                "items_in_use": len([v for v in self._entries.values() if v[2]]),
+                "size": self._size,
+                "max_size": self._max_bytes,
+                "sessions": len(self._sessions),
+                "hits": self._hits,
+                "misses": self._misses,
+                "evictions": self._evictions,
+            }
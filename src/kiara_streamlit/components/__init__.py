@@ -1,13 +1,22 @@
 # -*- coding: utf-8 -*-
+import sys
+import threading
 import typing
 
 import streamlit as st
 from kiara import Kiara
 from kiara.data import Value
 from kiara.data.registry import DataRegistry
+from kiara.data.values import ValueSchema
 from kiara.workflow.kiara_workflow import KiaraWorkflow
 from streamlit.delta_generator import DeltaGenerator
 
+from kiara_streamlit.caching import LRUCache, SharedValueCache, estimate_size
+from kiara_streamlit.context import get_write_lock
+from kiara_streamlit.data_index import AliasIndex, get_alias_index
+from kiara_streamlit.defaults import VALUE_CACHE_MAX_BYTES
+from kiara_streamlit.table_utils import sample_table
+
 if typing.TYPE_CHECKING:
     pass
 
@@ -25,10 +34,25 @@ class KiaraComponentMixin(object):
         cls = type(name, tuple(mixins), {})
         return cls
 
-    def __init__(self, temp_dir: str, **kwargs):
+    def __init__(
+        self,
+        temp_dir: str,
+        value_cache: typing.Optional[LRUCache] = None,
+        shared_value_cache: typing.Optional[SharedValueCache] = None,
+        session_id: typing.Optional[str] = None,
+        **kwargs,
+    ):
 
         self._temp_dir: str = temp_dir
         self._kiara: typing.Optional[Kiara] = None
+        self._value_cache: typing.Optional[LRUCache] = value_cache
+
+        self._shared_value_cache: typing.Optional[SharedValueCache] = shared_value_cache
+        self._shared_value_cache_session: typing.Optional[str] = None
+        if self._shared_value_cache is not None:
+            self._shared_value_cache_session = (
+                self._shared_value_cache.register_session(session_id=session_id)
+            )
 
     @property
     def temp_dir(self):
@@ -49,6 +73,125 @@ class KiaraComponentMixin(object):
     def data_registry(self) -> DataRegistry:
         return self.kiara.data_registry
 
+    @property
+    def write_lock(self) -> threading.RLock:
+        """The lock to hold while registering or saving values (the kiara context might be shared between sessions)."""
+
+        return get_write_lock(self.kiara)
+
+    @property
+    def value_cache(self) -> LRUCache:
+        """The (session-specific) cache for value data, and conversions of it."""
+
+        if self._value_cache is None:
+            self._value_cache = LRUCache(max_bytes=VALUE_CACHE_MAX_BYTES)
+        return self._value_cache
+
+    def get_cached_value_data(self, value: Value) -> typing.Any:
+        """Return the data of a value, using the session cache, and the cache shared between sessions (if available)."""
+
+        if self._shared_value_cache is not None:
+            data = self._shared_value_cache.get(
+                value.id,
+                session_id=self._shared_value_cache_session,  # type: ignore
+                default=self,
+            )
+            if data is not self:
+                return data
+
+        key = (value.id, "value_data")
+        data = self.value_cache.get(key, default=self)
+        if data is not self:
+            return data
+
+        data = value.get_value_data()
+        # data that can be shared is only held (and accounted for) in the shared cache, everything else in the session one
+        if self._shared_value_cache is None or not self._shared_value_cache.put(
+            value.id,
+            data,
+            session_id=self._shared_value_cache_session,  # type: ignore
+        ):
+            self.value_cache.put(key, data)
+        return data
+
+    def sample_value(
+        self,
+        value: Value,
+        method: str = "random",
+        size: float = 10,
+        seed: typing.Optional[int] = None,
+        stratify_by: typing.Optional[str] = None,
+    ) -> Value:
+        """Return a (not yet saved) value that holds a sample of another value.
+
+        Samples are cached per value id, method, size (in percent), seed and stratification column, so reruns always get
+        the same sample. Table and array data is sampled natively (see 'table_utils.sample_table'), for all other value
+        types the 'percent' operation of the 'sample' operation type is used, which only supports the 'random' method.
+        """
+
+        key = ("sample", value.id, method, size, seed, stratify_by)
+        cached = self.value_cache.get(key, None)
+        if cached is not None:
+            return cached
+
+        if value.type_name in ["table", "array"]:
+            data = sample_table(
+                self.get_cached_value_data(value),
+                method=method,
+                size=size,
+                seed=seed,
+                stratify_by=stratify_by,
+            )
+            with self.write_lock:
+                sampled = self.data_registry.register_data(
+                    data,
+                    value_schema=ValueSchema(
+                        type=value.type_name, doc=f"A sample of value '{value.id}'."
+                    ),
+                )
+            size_in_bytes = estimate_size(data)
+        else:
+            if method != "random":
+                raise Exception(
+                    f"Can't sample value of type '{value.type_name}': only method 'random' is supported."
+                )
+            op_type = self.kiara.operation_mgmt.operation_types.get("sample", None)
+            ops = (
+                op_type.get_operations_for_value_type(value.type_name)
+                if op_type is not None
+                else {}
+            )
+            if "percent" not in ops.keys():
+                raise Exception(
+                    f"Can't sample value of type '{value.type_name}': no sample operation available."
+                )
+            result = ops["percent"].module.run(
+                _attach_lineage=False, value_item=value, sample_size=size
+            )
+            sampled = result.get_value_obj("sampled_value")
+            # the sampled data is held by the data registry anyway, the cache only keeps the value object
+            size_in_bytes = sys.getsizeof(sampled)
+
+        self.value_cache.put(key, sampled, size=size_in_bytes)
+        return sampled
+
+    @property
+    def alias_index(self) -> AliasIndex:
+        return get_alias_index(self.data_store)
+
+    def save_value(
+        self, value: Value, aliases: typing.Optional[typing.Iterable[str]] = None
+    ) -> Value:
+        """Save a value into the data store, and add its aliases to the alias index."""
+
+        if aliases:
+            aliases = list(aliases)
+        with self.write_lock:
+            stored = value.save(aliases=aliases)
+        if aliases:
+            self.alias_index.value_saved(stored, aliases)
+        return stored
+
 
 class KiaraBaseWidgetsMixin(KiaraComponentMixin):
     def value_data(self, value_id: str, container: DeltaGenerator = st):
@@ -49,6 +49,8 @@ class KiaraFileComponentsMixin(KiaraComponentMixin):
             "file_bundle.import_from.local.folder_path", inputs=inputs
         )
         imported_bundle = result.get_value_obj("value_item")
+        if aliases:
+            self.alias_index.value_saved(imported_bundle, aliases)
 
         return imported_bundle
 
@@ -74,13 +76,13 @@ class KiaraFileComponentsMixin(KiaraComponentMixin):
         if store is False:
             return file_obj
         elif store is True:
-            stored = file_obj.save()
+            stored = self.save_value(file_obj)
             return stored
         elif isinstance(store, str):
-            stored = file_obj.save(aliases=[store])
+            stored = self.save_value(file_obj, aliases=[store])
             return stored
         elif isinstance(store, typing.Iterable):
-            stored = file_obj.save(aliases=store)
+            stored = self.save_value(file_obj, aliases=store)
             return stored
         else:
             raise NotImplementedError()
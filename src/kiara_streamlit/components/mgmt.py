@@ -1,48 +1,84 @@
 # -*- coding: utf-8 -*-
 import ast
+import hashlib
+import importlib
 import inspect
+import json
+import logging
 import os
 import typing
+import uuid
 from ast import Attribute, Call, Constant, Expr, Import, ImportFrom
 from pathlib import Path
 
 import streamlit as st
 from kiara.defaults import DEFAULT_NO_DESC_VALUE
 from kiara.metadata.core_models import DocumentationMetadataModel
-from kiara.utils import camel_case_to_snake_case
 from pydantic import validate_arguments
 from pydantic.decorator import ValidatedFunction
 from pydantic.main import BaseModel
 from streamlit.delta_generator import DeltaGenerator
 
 from kiara_streamlit.components import KiaraComponentMixin
-from kiara_streamlit.components.file import KiaraFileComponentsMixin
-from kiara_streamlit.components.module import KiaraModuleComponentsMixin
-from kiara_streamlit.components.onboarding import KiaraOnboardingComponentsMixin
-from kiara_streamlit.components.operations import KiaraOperationComponentsMixin
-from kiara_streamlit.components.pipeline import KiaraPipelineComponentsMixin
-from kiara_streamlit.components.processing import KiaraProcessingComponentsMixin
-from kiara_streamlit.components.tabular_data import TableComponentsMixin
-from kiara_streamlit.components.value_info import KiaraValueInfoComponentsMixin
-from kiara_streamlit.components.value_input import KiaraInputComponentsMixin
-from kiara_streamlit.defaults import EXAMPLE_BASE_DIR, TEMPLATES_BASE_DIR
-from kiara_streamlit.utils import render_example_template
+from kiara_streamlit.defaults import (
+    COMPONENT_MANIFEST_DIR,
+    EXAMPLE_BASE_DIR,
+    TEMPLATES_BASE_DIR,
+)
 
+log = logging.getLogger("kiara.streamlit")
 
-def _extract_component_class_name(cls: typing.Type[KiaraComponentMixin]):
+COMPONENT_COLLECTIONS: typing.Mapping[str, str] = {
+    "file": "kiara_streamlit.components.file:KiaraFileComponentsMixin",
+    "input": "kiara_streamlit.components.value_input:KiaraInputComponentsMixin",
+    "module": "kiara_streamlit.components.module:KiaraModuleComponentsMixin",
+    "onboarding": "kiara_streamlit.components.onboarding:KiaraOnboardingComponentsMixin",
+    "operation": "kiara_streamlit.components.operations:KiaraOperationComponentsMixin",
+    "pipeline": "kiara_streamlit.components.pipeline:KiaraPipelineComponentsMixin",
+    "processing": "kiara_streamlit.components.processing:KiaraProcessingComponentsMixin",
+    "table": "kiara_streamlit.components.tabular_data:TableComponentsMixin",
+    "value_info": "kiara_streamlit.components.value_info:KiaraValueInfoComponentsMixin",
+}
+"""All available component collections, and the (lazily imported) mixin class that implements them."""
 
-    if hasattr(cls, "_type_name"):
-        return cls._type_name  # type: ignore
+_COLLECTION_CLASSES: typing.Dict[str, typing.Type[KiaraComponentMixin]] = {}
 
-    result = camel_case_to_snake_case(cls.__name__)
-    if result.endswith("_mixin"):
-        result = result[0:-6]
-    if result.endswith("_components"):
-        result = result[0:-11]
+COMPONENTS_SOURCE_DIR = os.path.dirname(__file__)
 
-    if result.startswith("kiara_"):
-        result = result[6:]
-    return result
+IGNORE_ARG_FIELDS = ["v__duplicate_kwargs", "self", "args", "kwargs", "container"]
+
+
+def _calculate_components_source_hash() -> str:
+    """Calculate a hash over the source code of all component collections."""
+
+    sha = hashlib.sha256()
+    for f in sorted(os.listdir(COMPONENTS_SOURCE_DIR)):
+        if not f.endswith(".py"):
+            continue
+        sha.update(f.encode())
+        with open(os.path.join(COMPONENTS_SOURCE_DIR, f), "rb") as source:
+            sha.update(source.read())
+    return sha.hexdigest()
+
+
+def get_component_collection_class(
+    component_collection: str,
+) -> typing.Type[KiaraComponentMixin]:
+    """Import (if necessary) and return the mixin class for a component collection."""
+
+    cls = _COLLECTION_CLASSES.get(component_collection, None)
+    if cls is not None:
+        return cls
+
+    path = COMPONENT_COLLECTIONS.get(component_collection, None)
+    if path is None:
+        raise Exception(f"No component collection '{component_collection}' available.")
+
+    module_name, cls_name = path.split(":")
+    module = importlib.import_module(module_name)
+    cls = getattr(module, cls_name)
+    _COLLECTION_CLASSES[component_collection] = cls
+    return cls
 
 
 class EmbeddExampleTransformer(ast.NodeTransformer):
@@ -218,44 +254,85 @@ class ExampleCode(object):
         self._minimal_source_code = _new_lines
 
 
-class AllComponentsMixin(
-    KiaraFileComponentsMixin,
-    KiaraOperationComponentsMixin,
-    KiaraOnboardingComponentsMixin,
-    KiaraProcessingComponentsMixin,
-    KiaraPipelineComponentsMixin,
-    KiaraModuleComponentsMixin,
-    TableComponentsMixin,
-    KiaraValueInfoComponentsMixin,
-    KiaraInputComponentsMixin,
-):
-    pass
+class KiaraComponents(KiaraComponentMixin):
+    """The (session-specific) object all components are run against.
 
+    Instead of inheriting from all component mixin classes, this class looks up unknown attributes in the component
+    index, and imports the component collection that provides them on first access. That way, apps only pay the
+    import cost (and dependencies) of the component collections they actually use.
+    """
 
-class ComponentMgmt(object):
-    def __init__(self, example_base_dir: typing.Optional[str] = None):
+    def __init__(self, component_mgmt: "ComponentMgmt", temp_dir: str, **kwargs):
 
-        if example_base_dir is None:
-            example_base_dir = EXAMPLE_BASE_DIR
+        self._component_mgmt: ComponentMgmt = component_mgmt
+        self._bound_components: typing.Dict[str, typing.Callable] = {}
+        super().__init__(temp_dir=temp_dir, **kwargs)
+
+    def get_component(self, component_name: str) -> typing.Callable:
+        """Return the component with the provided name, bound to this object.
+
+        Bound components are cached, so repeated lookups (which happen on every script rerun) are a single dict lookup.
+        """
+
+        comp = self._bound_components.get(component_name, None)
+        if comp is None:
+            func = self._component_mgmt.get_component(component_name)
+            comp = func.__get__(self, self.__class__)
+            self._bound_components[component_name] = comp
+        return comp
+
+    def __getattr__(self, item):
+
+        if item.startswith("_"):
+            raise AttributeError(f"Components object does not have attribute '{item}'.")
+
+        component_collection = self._component_mgmt.attributes_index.get(item, None)
+        if component_collection is None:
+            raise AttributeError(f"Components object does not have attribute '{item}'.")
+
+        cls = get_component_collection_class(component_collection)
+        attr = inspect.getattr_static(cls, item)
+        if inspect.isfunction(attr):
+            # plain methods can be bound once and stored on the instance, so '__getattr__' won't be called for them again
+            bound = attr.__get__(self, self.__class__)
+            self.__dict__[item] = bound
+            return bound
+        if hasattr(attr, "__get__"):
+            return attr.__get__(self, self.__class__)
+        return attr
+
+    def __dir__(self) -> typing.Iterable[str]:
+
+        result = set(super().__dir__())
+        result.update(self._component_mgmt.attributes_index.keys())
+        return result
 
-        self._example_base_dir: str = example_base_dir
 
-        self._components_cls: typing.Type[AllComponentsMixin] = AllComponentsMixin
+def __getattr__(name: str) -> typing.Any:
 
-        # self._all_mixin_classes: typing.Dict[str, typing.Type[KiaraComponentMixin]] = {
-        #     _extract_component_class_name(cls): cls
-        #     for cls in _get_all_subclasses(KiaraComponentMixin, ignore_abstract=True)
-        # }
+    # for backwards compatibility, the class that inherits from all component collections is only created if
+    # somebody asks for it explicitly, because it requires importing all of them
+    if name == "AllComponentsMixin":
+        if name not in _COLLECTION_CLASSES.keys():
+            mixins = [get_component_collection_class(c) for c in COMPONENT_COLLECTIONS]
+            _COLLECTION_CLASSES[name] = type(name, tuple(mixins), {})
+        return _COLLECTION_CLASSES[name]
+
+    raise AttributeError(f"module '{__name__}' has no attribute '{name}'")
+
+
+class ComponentMgmt(object):
+    def __init__(
+        self,
+        example_base_dir: typing.Optional[str] = None,
+        manifest_dir: typing.Optional[str] = COMPONENT_MANIFEST_DIR,
+    ):
 
-        subclasses: typing.Iterable[
-            typing.Type[typing.Any]
-        ] = self._components_cls.__bases__
+        if example_base_dir is None:
+            example_base_dir = EXAMPLE_BASE_DIR
 
-        self._all_mixin_classes: typing.Dict[str, typing.Type[KiaraComponentMixin]] = {
-            _extract_component_class_name(cls): cls
-            for cls in subclasses
-            if issubclass(cls, KiaraComponentMixin)
-        }
+        self._example_base_dir: str = example_base_dir
+        self._manifest_dir: typing.Optional[str] = manifest_dir
 
         self._components_by_collection: typing.Optional[
             typing.Dict[str, typing.Dict[str, BaseModel]]
@@ -263,6 +340,10 @@ class ComponentMgmt(object):
         self._components_index: typing.Optional[
             typing.Dict[str, typing.Tuple[str, str]]
         ] = None
+        self._component_infos: typing.Optional[
+            typing.Dict[str, typing.Dict[str, typing.Dict[str, typing.Any]]]
+        ] = None
+        self._attributes_index: typing.Optional[typing.Dict[str, str]] = None
         self._docs: typing.Dict[str, typing.Dict[str, DocumentationMetadataModel]] = {}
         self._examples: typing.Optional[
             typing.Dict[str, typing.Dict[str, ExampleCode]]
@@ -270,47 +351,239 @@ class ComponentMgmt(object):
 
     @property
     def component_collections(self) -> typing.Iterable[str]:
-        return sorted(self._all_mixin_classes.keys())
+        return sorted(COMPONENT_COLLECTIONS.keys())
 
     @property
     def all_components_by_collection(
         self,
     ) -> typing.Mapping[str, typing.Mapping[str, BaseModel]]:
+        """Return the (pydantic) argument models for all components, sorted by collection.
+
+        Creating those models is fairly expensive, so this should only be used when really necessary. Most information
+        about the available components is also available via the (cached) 'component_infos' property.
+        """
 
         if self._components_by_collection is not None:
             return self._components_by_collection
 
         funcs: typing.Dict[str, typing.Dict[str, BaseModel]] = {}
-        index: typing.Dict[str, typing.Tuple[str, str]] = {}
-        for component_collection in sorted(self._all_mixin_classes.keys()):
+        for component_collection in self.component_collections:
 
-            cls = self._all_mixin_classes[component_collection]
+            cls = get_component_collection_class(component_collection)
+            funcs[component_collection] = self._get_mixin_functions(cls)
 
-            functions = self._get_mixin_functions(cls)
-            for alias in functions.keys():
+        self._components_by_collection = funcs
+
+        return self._components_by_collection
+
+    @property
+    def component_infos(
+        self,
+    ) -> typing.Mapping[str, typing.Mapping[str, typing.Mapping[str, typing.Any]]]:
+        """Return name, argument details and documentation for all components, sorted by collection.
+
+        If a manifest directory is configured, this information is loaded from a manifest file that is keyed by
+        package version and a hash of the components source code. If no such manifest exists yet, the information is
+        assembled from the component argument models, and the manifest is written for the next start.
+        """
+
+        if self._component_infos is not None:
+            return self._component_infos
+
+        manifest = None
+        if self._manifest_dir:
+            manifest = self._load_manifest()
+
+        if manifest is None:
+            manifest = {
+                "collections": self._create_component_infos(),
+                "attributes": self._create_attributes_index(),
+            }
+            if self._manifest_dir:
+                self._write_manifest(manifest)
+
+        infos = manifest["collections"]
+        index: typing.Dict[str, typing.Tuple[str, str]] = {}
+        for component_collection in sorted(infos.keys()):
+            for alias in infos[component_collection].keys():
                 if alias in index.keys():
                     raise Exception(f"Duplicate component name: {alias}.")
                 index[alias] = (component_collection, alias)
 
-            funcs[component_collection] = functions
-
-        self._components_by_collection = funcs
+        self._component_infos = infos
         self._components_index = index
+        self._attributes_index = manifest["attributes"]
 
-        return self._components_by_collection
+        return self._component_infos
 
     @property
     def components_index(self) -> typing.Mapping[str, typing.Tuple[str, str]]:
 
         if self._components_index is None:
-            self.all_components_by_collection  # type: ignore
+            self.component_infos  # type: ignore
         return self._components_index  # type: ignore
 
+    @property
+    def attributes_index(self) -> typing.Mapping[str, str]:
+        """Map the names of all public attributes of all component collections to the collection that provides them."""
+
+        if self._attributes_index is None:
+            self.component_infos  # type: ignore
+        return self._attributes_index  # type: ignore
+
     @property
     def component_names(self) -> typing.Iterable[str]:
 
         return self.components_index.keys()
 
+    @property
+    def manifest_path(self) -> typing.Optional[str]:
+
+        if not self._manifest_dir:
+            return None
+
+        from kiara_streamlit import get_version
+
+        version = get_version().replace(os.path.sep, "_")
+        source_hash = _calculate_components_source_hash()
+        return os.path.join(
+            self._manifest_dir, f"components_{version}_{source_hash[0:16]}.json"
+        )
+
+    def _load_manifest(self) -> typing.Optional[typing.Dict[str, typing.Any]]:
+
+        path = self.manifest_path
+        if not path or not os.path.isfile(path):
+            return None
+
+        try:
+            with open(path, "r") as f:
+                manifest = json.load(f)
+            if "collections" not in manifest.keys() or "attributes" not in manifest:
+                raise Exception("invalid manifest format")
+            return manifest
+        except Exception as e:
+            log.warning(f"Can't load component manifest '{path}', ignoring it: {e}")
+            return None
+
+    def _write_manifest(self, manifest: typing.Mapping[str, typing.Any]) -> None:
+
+        path = self.manifest_path
+        if not path:
+            return
+
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            # write to a temporary file first, so concurrently starting processes never see a half-written manifest
+            temp_path = f"{path}.{uuid.uuid4()}.tmp"
+            with open(temp_path, "wt") as f:
+                json.dump(manifest, f)
+            os.replace(temp_path, path)
+        except Exception as e:
+            log.warning(f"Can't write component manifest '{path}': {e}")
+
+    def _create_component_infos(
+        self,
+    ) -> typing.Dict[str, typing.Dict[str, typing.Dict[str, typing.Any]]]:
+
+        result: typing.Dict[str, typing.Dict[str, typing.Dict[str, typing.Any]]] = {}
+        for (
+            component_collection,
+            components,
+        ) in self.all_components_by_collection.items():
+            for component_name, model in components.items():
+                func = self.get_component_from_collection(
+                    component_collection=component_collection,
+                    component_name=component_name,
+                )
+                doc = func.__doc__
+                if not doc:
+                    doc = DEFAULT_NO_DESC_VALUE
+                doc = inspect.cleandoc(doc)  # type: ignore
+
+                result.setdefault(component_collection, {})[component_name] = {
+                    "doc": doc,
+                    "is_input": "key" in model.__fields__.keys(),
+                    "args": self._create_component_args_info(model),
+                }
+
+        return result
+
+    def _create_attributes_index(self) -> typing.Dict[str, str]:
+
+        base_attrs = set(dir(KiaraComponentMixin))
+
+        result: typing.Dict[str, str] = {}
+        for component_collection in self.component_collections:
+            cls = get_component_collection_class(component_collection)
+            for attr_name in dir(cls):
+                if attr_name.startswith("_") or attr_name in base_attrs:
+                    continue
+                if attr_name in result.keys():
+                    raise Exception(
+                        f"Duplicate attribute name in component collections '{result[attr_name]}' and '{component_collection}': {attr_name}"
+                    )
+                result[attr_name] = component_collection
+
+        return result
+
+    def _create_component_args_info(
+        self, model: BaseModel
+    ) -> typing.List[typing.Dict[str, typing.Any]]:
+
+        fields_required = {}
+        fields_optional = {}
+        for field_name in sorted(model.__fields__.keys()):
+
+            if field_name in IGNORE_ARG_FIELDS:
+                continue
+            details = model.__fields__[field_name]
+            if details.required:
+                if details.type_ == typing.Any:
+                    fields_optional[field_name] = details
+                else:
+                    fields_required[field_name] = details
+            else:
+                fields_optional[field_name] = details
+
+        fields_required.update(fields_optional)
+
+        result = []
+        for field_name, details in fields_required.items():
+
+            default = details.default
+            if default is None:
+                default = ""
+
+            result.append(
+                {
+                    "name": field_name,
+                    "type": extract_type_name(details.type_),
+                    "required": details.required and details.type_ != typing.Any,
+                    "default": str(default),
+                    "desc": details.field_info.description,
+                }
+            )
+
+        return result
+
+    def get_component_info(
+        self, component_collection: str, component_name: str
+    ) -> typing.Mapping[str, typing.Any]:
+
+        collection = self.component_infos.get(component_collection, None)
+        if collection is None:
+            raise Exception(
+                f"No component collection '{component_collection}' available."
+            )
+
+        info = collection.get(component_name, None)
+        if info is None:
+            raise Exception(
+                f"No component '{component_name}' in collection '{component_collection}' available."
+            )
+        return info
+
     @property
     def examples(self) -> typing.Mapping[str, typing.Mapping[str, ExampleCode]]:
 
@@ -322,9 +595,9 @@ class ComponentMgmt(object):
 
     def get_components_of_collection(
         self, component_collection: str
-    ) -> typing.Mapping[str, BaseModel]:
+    ) -> typing.Mapping[str, typing.Mapping[str, typing.Any]]:
 
-        return self.all_components_by_collection[component_collection]
+        return self.component_infos[component_collection]
 
     def get_examples_for_category(
         self, example_category: str
@@ -378,11 +651,7 @@ class ComponentMgmt(object):
         self, component_collection: str, component_name: str
     ) -> typing.Callable:
 
-        cat = self._all_mixin_classes.get(component_collection, None)
-        if not cat:
-            raise Exception(
-                f"No component collection '{component_collection}' available."
-            )
+        cat = get_component_collection_class(component_collection)
 
         if not hasattr(cat, component_name):
             raise Exception(
@@ -406,11 +675,7 @@ class ComponentMgmt(object):
         self, component_collection: str, func_name: str
     ) -> BaseModel:
 
-        cat = self._all_mixin_classes.get(component_collection, None)
-        if not cat:
-            raise Exception(
-                f"No component category '{component_collection}' available."
-            )
+        cat = get_component_collection_class(component_collection)
 
         if not hasattr(cat, func_name):
             raise Exception(
@@ -425,25 +690,20 @@ class ComponentMgmt(object):
 
         if not self._docs.get(component_collection, {}).get(component_name, None):
 
-            func = self.get_component_from_collection(
+            info = self.get_component_info(
                 component_collection=component_collection, component_name=component_name
             )
-            doc = func.__doc__
-            if not doc:
-                doc = DEFAULT_NO_DESC_VALUE
-            doc = inspect.cleandoc(doc)  # type: ignore
-
-            _doc = DocumentationMetadataModel.from_string(doc)
+            _doc = DocumentationMetadataModel.from_string(info["doc"])
             self._docs.setdefault(component_collection, {})[component_name] = _doc
 
         return self._docs[component_collection][component_name]
 
     def is_input_component(self, component_collection: str, component_name: str):
 
-        model = self._get_component_model(
-            component_collection=component_collection, func_name=component_name
+        info = self.get_component_info(
+            component_collection=component_collection, component_name=component_name
         )
-        return "key" in model.__fields__.keys()
+        return info["is_input"]
 
     def render_component_description(
         self,
@@ -469,40 +729,18 @@ class ComponentMgmt(object):
         container: DeltaGenerator = st,
     ):
 
-        model = self._get_component_model(
-            component_collection=component_collection, func_name=component_name
+        info = self.get_component_info(
+            component_collection=component_collection, component_name=component_name
         )
 
         md = "| field | type | required | default | desc |"
         md = f"{md}\n| --- | --- | --- | --- | --- |"
 
-        fields_required = {}
-        fields_optional = {}
-        for field_name in sorted(model.__fields__.keys()):
+        for arg in info["args"]:
 
-            if field_name in [
-                "v__duplicate_kwargs",
-                "self",
-                "args",
-                "kwargs",
-                "container",
-            ]:
-                continue
-            details = model.__fields__[field_name]
-            if details.required:
-                if details.type_ == typing.Any:
-                    fields_optional[field_name] = details
-                else:
-                    fields_required[field_name] = details
-            else:
-                fields_optional[field_name] = details
-
-        fields_required.update(fields_optional)
-        for field_name, details in fields_required.items():
-
-            _type = extract_type_name(details.type_)
-
-            desc = details.field_info.description
+            field_name = arg["name"]
+            _type = arg["type"]
+            desc = arg["desc"]
 
             if not desc:
                 desc = DEFAULT_NO_DESC_VALUE
@@ -514,17 +752,8 @@ class ComponentMgmt(object):
             elif field_name == "key" and desc == DEFAULT_NO_DESC_VALUE:
                 desc = "Will be forwarded to underlying streamlit component(s): an optional string to use as the unique key for the widget. If this is omitted, a key will be generated for the widget based on its content. Multiple widgets of the same type may not share the same key."
 
-            if details.required:
-                if details.type_ == typing.Any:
-                    req = "no"
-                else:
-                    req = "yes"
-            else:
-                req = "no"
-
-            default = details.default
-            if default is None:
-                default = ""
+            req = "yes" if arg["required"] else "no"
+            default = arg["default"]
             md = f"{md}\n| {field_name} | {_type} | {req} | {default} | {desc} |"
 
         container.markdown(md)
@@ -563,10 +792,9 @@ class ComponentMgmt(object):
         )
         if not examples:
             container.markdown("###### How to use")
-            model = self._get_component_model(
-                component_collection=component_collection, func_name=component_name
-            )
-            if "key" in model.__fields__.keys():
+            if self.is_input_component(
+                component_collection=component_collection, component_name=component_name
+            ):
                 container.markdown(
                     f"``` python\nresult = st.kiara.{component_name}(...)\nst.write(result)\n```"
                 )
@@ -624,6 +852,8 @@ class ComponentMgmt(object):
                 )
             else:
                 template = os.path.join(TEMPLATES_BASE_DIR, "component_example.py.j2")
+        from kiara_streamlit.utils import render_example_template
+
         content = render_example_template(
             component_name=component_name,
             example_doc=example_doc,
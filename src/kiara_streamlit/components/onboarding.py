@@ -77,7 +77,7 @@ class KiaraOnboardingComponentsMixin(KiaraComponentMixin):
         if store_table is False:
             return table_obj
         else:
-            stored = table_obj.save(aliases=aliases)
+            stored = self.save_value(table_obj, aliases=aliases)
             if not aliases:
                 return stored.id
             else:
@@ -140,7 +140,7 @@ class KiaraOnboardingComponentsMixin(KiaraComponentMixin):
         if store_table is False:
             return table_obj
         else:
-            stored = table_obj.save(aliases=aliases)
+            stored = self.save_value(table_obj, aliases=aliases)
             if not aliases:
                 return stored.id
             else:
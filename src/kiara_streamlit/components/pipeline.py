@@ -10,6 +10,47 @@ from kiara.processing import Job, JobStatus
 from streamlit.delta_generator import DeltaGenerator
 
 from kiara_streamlit.components import KiaraComponentMixin
+from kiara_streamlit.defaults import PIPELINE_STAGE_POLL_INTERVAL
+from kiara_streamlit.pipeline_processing import (
+    STEP_STATUS_LABELS,
+    CachedJobId,
+    StageProcessingJob,
+    get_stage_runtimes,
+    set_pipeline_max_workers,
+)
+
+
+def _is_same_input(last: typing.Any, new: typing.Any) -> bool:
+    """Cheap check whether a raw pipeline input is the same as the one that was set last time.
+
+    Only simple (widget-type) data is compared by equality, everything else (e.g. tables) only by identity.
+    """
+
+    if type(last) is not type(new):
+        return False
+    if last is None or isinstance(last, (str, int, float, bool, bytes)):
+        return last == new
+    if isinstance(last, (list, tuple)):
+        return len(last) == len(new) and all(
+            _is_same_input(a, b) for a, b in zip(last, new)
+        )
+    if isinstance(last, dict):
+        return last.keys() == new.keys() and all(
+            _is_same_input(last[key], new[key]) for key in last.keys()
+        )
+    return last is new
+
+
+def _copy_input(data: typing.Any) -> typing.Any:
+    """Copy the containers in a raw input, so changes to them can be detected (the items themselves are not copied)."""
+
+    if type(data) is list:
+        return [_copy_input(item) for item in data]
+    if type(data) is tuple:
+        return tuple(_copy_input(item) for item in data)
+    if type(data) is dict:
+        return {key: _copy_input(item) for key, item in data.items()}
+    return data
 
 
 class KiaraPipelineComponentsMixin(KiaraComponentMixin):
@@ -59,27 +100,57 @@ class KiaraPipelineComponentsMixin(KiaraComponentMixin):
 
         If 'render_results' is set to True, an informational component about the status of each of the just set
         inputs will be rendered.
+
+        Inputs that did not change are not set again. For Value objects, this is determined by comparing value ids,
+        for raw data by comparing it to what was set for this field last time (by identity, or equality for simple
+        types), so value data never needs to be loaded for this check.
         """
 
+        # field name -> (id of the value that was created, raw input)
+        last_inputs_key = f"__pipeline_inputs_{pipeline.id}__"
+        last_inputs: typing.Optional[
+            typing.Dict[str, typing.Tuple[str, typing.Any]]
+        ] = st.session_state.get(last_inputs_key, None)
+        if last_inputs is None:
+            last_inputs = {}
+            st.session_state[last_inputs_key] = last_inputs
+
         cleaned_inputs: typing.Dict[str, typing.Any] = {}
         result: typing.Dict[str, typing.Union[Value, Exception]] = {}
         for k, v in inputs.items():
-            if isinstance(v, Value):
-                cleaned_inputs[k] = v
 
             current = pipeline.inputs.get(k)
             assert isinstance(current, Value)
-            if not current.is_set:
-                cleaned_inputs[k] = v
-            else:
-                if current.get_value_data() != v:
-                    cleaned_inputs[k] = v
-                else:
+
+            if isinstance(v, Value):
+                if current.is_set and current.id == v.id:
                     result[k] = current
+                else:
+                    cleaned_inputs[k] = v
+                continue
+
+            last = last_inputs.get(k, None)
+            if (
+                current.is_set
+                and last is not None
+                and last[0] == current.id
+                and _is_same_input(last[1], v)
+            ):
+                result[k] = current
+            else:
+                cleaned_inputs[k] = v
 
         if cleaned_inputs:
             _set_result = pipeline.inputs.set_values(**cleaned_inputs)
             result.update(_set_result)
+            for k, v in cleaned_inputs.items():
+                if isinstance(v, Value) or isinstance(result.get(k), Exception):
+                    last_inputs.pop(k, None)
+                else:
+                    last_inputs[k] = (
+                        pipeline.inputs.get_value_obj(k).id,
+                        _copy_input(v),
+                    )
 
         if render_errors:
 
@@ -182,12 +253,25 @@ class KiaraPipelineComponentsMixin(KiaraComponentMixin):
         pipeline: Pipeline,
         stage_nr: int,
         render_result: bool = False,
+        background: bool = False,
+        max_workers: typing.Optional[int] = None,
         container: DeltaGenerator = st,
-    ) -> typing.Mapping[int, typing.Mapping[str, typing.Union[None, str, Exception]]]:
+    ) -> typing.Union[
+        typing.Mapping[int, typing.Mapping[str, typing.Union[None, str, Exception]]],
+        StageProcessingJob,
+    ]:
         """Process all steps within the pipeline that are part of the specified stage (or a required stage below).
 
         Returns a dict with the stage id as key, and another dict with step_id as key and processing result as value.
         TODO: explain result dict structure
+
+        If 'background' is set to True, processing happens in a background thread, and the (already started)
+        job is returned immediately instead. The job is kept in the session state, so it can be retrieved in later
+        reruns via 'get_pipeline_stage_job', and its progress can be displayed with 'pipeline_stage_processing_status'.
+        If 'render_result' is set as well, the status is displayed (and polled until the job is done) right away.
+
+        If 'max_workers' is set, the steps within each stage are processed concurrently (in a thread pool with that
+        many workers, or one after the other if it is 1). This setting is kept by the pipeline controller.
         """
 
         if not isinstance(pipeline.controller, BatchControllerManual):
@@ -195,6 +279,27 @@ class KiaraPipelineComponentsMixin(KiaraComponentMixin):
                 "Invalid pipeline controller type: only 'BatchControllerManual' supported at the moment."
             )
 
+        if max_workers is not None:
+            set_pipeline_max_workers(pipeline=pipeline, max_workers=max_workers)
+
+        if background:
+            job = self.get_pipeline_stage_job(pipeline=pipeline)
+            if job is not None and not job.done:
+                if job.stage_nr != stage_nr:
+                    raise Exception(
+                        f"Can't process stage '{stage_nr}': pipeline is still processing stage '{job.stage_nr}'."
+                    )
+            else:
+                job = StageProcessingJob(pipeline=pipeline, stage_nr=stage_nr)
+                st.session_state[f"__pipeline_stage_job_{pipeline.id}__"] = job
+                job.start()
+
+            if render_result:
+                self.pipeline_stage_processing_status(
+                    pipeline=pipeline, job=job, container=container
+                )
+            return job
+
         process_result: typing.Mapping[
             int, typing.Mapping[str, typing.Union[None, str, Exception]]
         ] = pipeline.controller.process_stage(stage_nr=stage_nr)
@@ -208,6 +313,76 @@ class KiaraPipelineComponentsMixin(KiaraComponentMixin):
 
         return process_result
 
+    def get_pipeline_stage_job(
+        self, pipeline: Pipeline, stage_nr: typing.Optional[int] = None
+    ) -> typing.Optional[StageProcessingJob]:
+        """Return the last background processing job of a pipeline (optionally: only if it is for the specified stage)."""
+
+        job: typing.Optional[StageProcessingJob] = st.session_state.get(
+            f"__pipeline_stage_job_{pipeline.id}__", None
+        )
+        if job is None or (stage_nr is not None and job.stage_nr != stage_nr):
+            return None
+        return job
+
+    def pipeline_stage_processing_status(
+        self,
+        pipeline: Pipeline,
+        job: typing.Optional[StageProcessingJob] = None,
+        poll: bool = True,
+        container: DeltaGenerator = st,
+    ) -> typing.Optional[
+        typing.Mapping[int, typing.Mapping[str, typing.Union[None, str, Exception]]]
+    ]:
+        """Display the progress of a pipeline stage that is processed in the background.
+
+        If no job is provided, the last one that was started for this pipeline is used. If 'poll' is set to True, the
+        status is updated until the job is done (widget interactions still work in the meantime, they just restart the
+        script run, while processing continues). Once the job is done, the processing result is rendered and returned.
+        """
+
+        if job is None:
+            job = self.get_pipeline_stage_job(pipeline=pipeline)
+            if job is None:
+                return None
+
+        progress_placeholder = container.empty()
+        status_placeholder = container.empty()
+
+        while True:
+            if not job.done:
+                progress_placeholder.progress(int(job.progress() * 100))
+
+            md = f"#### Processing stage {job.stage_nr}"
+            if not job.done:
+                md = f"{md} ({job.elapsed:.1f} seconds)"
+            for stage, steps in job.step_status().items():
+                for step_id, status in steps.items():
+                    md = f"{md}\n  - step '{step_id}' (stage {stage}): *{STEP_STATUS_LABELS[status]}*"
+            status_placeholder.markdown(md)
+
+            if job.done or not poll:
+                break
+            job.wait(timeout=PIPELINE_STAGE_POLL_INTERVAL)
+
+        if not job.done:
+            return None
+
+        progress_placeholder.empty()
+        status_placeholder.empty()
+        if job.error is not None:
+            container.error(f"Processing stage {job.stage_nr} failed: {job.error}")
+            return None
+
+        result = job.result()
+        self.render_pipeline_stage_processing_result(
+            pipeline=pipeline,
+            result=result,
+            only_stage=job.stage_nr,
+            container=container,
+        )
+        return result
+
     def get_pipeline_processing_job_details(
         self, pipeline: Pipeline, job_or_step_id: str
     ) -> Job:
@@ -284,6 +459,8 @@ class KiaraPipelineComponentsMixin(KiaraComponentMixin):
             md = f"{md}\n  - step '{step_id}'"
             if job_id is None:
                 md = f"{md} (skipped)"
+            elif isinstance(job_id, CachedJobId):
+                md = f"{md} (cached): inputs unchanged, not processed again"
             elif isinstance(job_id, Exception):
                 md = f"{md} (failed):"
                 md = f"{md}\n    - {str(job_id)}"
@@ -308,6 +485,11 @@ class KiaraPipelineComponentsMixin(KiaraComponentMixin):
                 outputs = pipeline.get_step_outputs(step_id=step_id)
                 results[step_id] = outputs
 
+        runtimes = get_stage_runtimes(pipeline=pipeline, stage_result=details)
+        if runtimes is not None and len(details) > 1:
+            wall_clock, total = runtimes
+            md = f"{md}\n\nProcessing time: {wall_clock:.2f} sec (sum of step runtimes: {total:.2f} sec, saved by concurrent processing: {max(total - wall_clock, 0.0):.2f} sec)"
+
         if failed:
             container.error(md)
         else:
@@ -1,16 +1,173 @@
 # -*- coding: utf-8 -*-
 import typing
+import uuid
 
-import pyarrow as pa
 import streamlit as st
-from kiara.data import ValueSet
+from kiara.data import Value, ValueSet
+from kiara.data.values import ValueSchema
 from streamlit.delta_generator import DeltaGenerator
 from streamlit_ace import st_ace
 
+from kiara_streamlit.caching import estimate_size
 from kiara_streamlit.components import KiaraComponentMixin
+from kiara_streamlit.defaults import (
+    SQL_QUERY_POLL_INTERVAL,
+    SQL_QUERY_PREVIEW_ROWS,
+    SQL_QUERY_TIMEOUT,
+)
+from kiara_streamlit.sql import (
+    SqlQueryCancelled,
+    SqlQueryJob,
+    SqlQueryProfile,
+    find_referenced_relations,
+    get_sql_engine,
+    normalize_sql_query,
+)
+
+
+def create_table_schema_markdown(value: Value) -> str:
+    """Create a markdown table with the columns (and their types) of a table value, using only its metadata."""
+
+    md = value.get_metadata("table").get("table", {})
+    column_names = md.get("column_names", [])
+    column_schema = md.get("column_schema", {})
+
+    result = "| column | type |\n| --- | --- |"
+    for column_name in column_names:
+        schema = column_schema.get(column_name, {})
+        type_name = schema.get("arrow_type_name", schema.get("type_name", ""))
+        result = f"{result}\n| {column_name} | {type_name} |"
+
+    rows = md.get("rows", None)
+    if rows is not None:
+        result = f"{result}\n\n{rows} rows"
+    return result
+
+
+def write_sql_query_profile(profile: SqlQueryProfile, container: DeltaGenerator = st):
+    """Render the execution plan and statistics of a profiled query."""
+
+    import pandas as pd
+
+    info = []
+    if profile.total_time is not None:
+        info.append(f"total time: {profile.total_time * 1000:.1f} ms")
+    if profile.result_rows is not None:
+        info.append(f"result rows: {profile.result_rows}")
+    if info:
+        container.caption(f"Profiled query ({', '.join(info)}).")
+
+    if profile.inputs:
+        container.markdown("**Inputs**")
+        inputs = pd.DataFrame.from_dict(profile.inputs, orient="index")
+        inputs.index.name = "relation"
+        container.dataframe(inputs)
+
+    if profile.operators:
+        container.markdown("**Operators**")
+        operators = pd.DataFrame(profile.operators)
+        operators["operator"] = [
+            f"{'  ' * depth}{op}"
+            for depth, op in zip(operators["depth"], operators["operator"])
+        ]
+        container.dataframe(operators.drop(columns=["depth"]))
+
+    container.markdown("**Execution plan**")
+    container.code(profile.analyzed_plan if profile.analyzed_plan else profile.plan)
 
 
 class TableComponentsMixin(KiaraComponentMixin):
+    def run_sql_query(
+        self,
+        query: str,
+        tables: typing.Mapping[str, Value],
+        limit: typing.Optional[int] = None,
+        query_id: typing.Optional[str] = None,
+    ) -> Value:
+        """Run a sql query against one or several table values, and return the result as (not yet saved) value.
+
+        The keys of the 'tables' argument are the relation names to use in the query. If duckdb is available, the query
+        is run by the embedded sql engine of the current kiara context (which registers the tables without copying them),
+        otherwise the 'table.query.sql' operation is used (which only supports a single table, as relation 'data', and
+        ignores 'limit').
+
+        If 'limit' is set, the engine only computes (at most) that many rows of the result. A 'query_id' can be used to
+        cancel the query while it runs (see 'SqlEngine.cancel').
+        """
+
+        engine = get_sql_engine(self.kiara)
+        if engine is None:
+            if list(tables.keys()) != ["data"]:
+                raise Exception(
+                    "Can't run sql query: multiple tables are only supported with the embedded sql engine (duckdb)."
+                )
+            op_outputs: ValueSet = self.run_operation(  # type: ignore
+                "table.query.sql", inputs={"table": tables["data"], "query": query}
+            )
+            return op_outputs.get_value_obj("query_result")
+
+        _tables = {}
+        for relation_name, value in tables.items():
+            _tables[relation_name] = self.get_cached_value_data(value)
+        result = engine.query(query, tables=_tables, limit=limit, query_id=query_id)
+
+        with self.write_lock:
+            return self.data_registry.register_data(
+                result, value_schema=ValueSchema(type="table", doc="The query result.")
+            )
+
+    def profile_sql_query(
+        self,
+        query: str,
+        tables: typing.Mapping[str, Value],
+        limit: typing.Optional[int] = None,
+        query_id: typing.Optional[str] = None,
+    ) -> SqlQueryProfile:
+        """Run a sql query with profiling enabled, and return its execution plan and statistics.
+
+        Arguments are the same as for 'run_sql_query'. This needs the embedded sql engine (duckdb).
+        """
+
+        engine = get_sql_engine(self.kiara)
+        if engine is None:
+            raise Exception(
+                "Can't profile sql query: profiling is only supported with the embedded sql engine (duckdb)."
+            )
+
+        _tables = {}
+        for relation_name, value in tables.items():
+            _tables[relation_name] = self.get_cached_value_data(value)
+        return engine.profile(query, tables=_tables, limit=limit, query_id=query_id)
+
+    def create_sql_query_job(
+        self,
+        query: str,
+        tables: typing.Mapping[str, Value],
+        limit: typing.Optional[int] = None,
+        timeout: typing.Optional[float] = None,
+        profile: bool = False,
+        key: typing.Hashable = None,
+    ) -> SqlQueryJob:
+        """Create a (not yet started) job that runs a sql query in a background thread, see 'run_sql_query'.
+
+        If 'profile' is set, the job result is the profile of the query instead (see 'profile_sql_query'). If the
+        embedded sql engine is used, cancelling the job (or a timeout) interrupts the query.
+        """
+
+        query_id = str(uuid.uuid4())
+        tables = dict(tables)
+        engine = get_sql_engine(self.kiara)
+
+        def run():
+            func = self.profile_sql_query if profile else self.run_sql_query
+            return func(query, tables=tables, limit=limit, query_id=query_id)
+
+        def cancel():
+            if engine is not None:
+                engine.cancel(query_id)
+
+        return SqlQueryJob(run, cancel=cancel, timeout=timeout, key=key)
+
     def sql_query(
         self,
         table_name: typing.Optional[str] = None,
@@ -21,6 +178,12 @@ class TableComponentsMixin(KiaraComponentMixin):
         show_metadata_option_default: bool = False,
         show_sampling_option: bool = False,
         show_save_option: bool = False,
+        relations: typing.Optional[typing.Mapping[str, str]] = None,
+        show_relations_option: bool = False,
+        show_schema_option: bool = False,
+        preview_rows: typing.Optional[int] = SQL_QUERY_PREVIEW_ROWS,
+        timeout: typing.Optional[float] = SQL_QUERY_TIMEOUT,
+        show_profile_option: bool = False,
         editor_height: typing.Optional[int] = None,
         key: typing.Optional[str] = None,
         container: DeltaGenerator = st,
@@ -30,6 +193,21 @@ class TableComponentsMixin(KiaraComponentMixin):
         This component has a few configuration options (to be documented). If you don't provide a 'table_name' argument, a selectbox will be rendered
         that lets the user choose one of the tables in the kiara data store.
         There are also options to show/hide other usability helpers like a source table preview, sampling option, etc.
+
+        The selected table is available as relation 'data'. Additional tables can be bound via the 'relations' argument
+        (relation name -> alias), or, if 'show_relations_option' is set, selected by the user (in which case the alias is
+        used as relation name). Tables are only loaded (and registered with the sql engine) if the query references
+        them. 'show_schema_option' renders a panel with the schemas of all bound relations (using value metadata, so
+        no table data needs to be loaded for it).
+
+        While editing, only the first 'preview_rows' rows of a query result are computed (and displayed). The full
+        result is only computed when it is saved. Set 'preview_rows' to 'None' to always compute the full result.
+
+        Queries run in a background thread, while the component displays the elapsed time and a button to cancel the
+        query. Queries that take longer than 'timeout' seconds are cancelled automatically ('None' to disable).
+
+        'show_profile_option' renders an option to profile the current query, which shows its execution plan, the
+        time and output row count of every operator, and the sizes of the input tables (this needs duckdb).
         """
 
         if not table_name:
@@ -64,36 +242,61 @@ class TableComponentsMixin(KiaraComponentMixin):
                 )
 
         sample_size = 100
+        sample_method = "random"
+        sample_seed = 0
+        stratify_by: typing.Optional[str] = None
         sampled = False
         if show_sampling_option:
-            if use_sidebar:
-                show_sampling = st.sidebar.checkbox("Sample data", value=False)
-            else:
-                show_sampling = container.checkbox("Sample data", value=False)
+            sidebar_or_container = st.sidebar if use_sidebar else container
+            show_sampling = sidebar_or_container.checkbox("Sample data", value=False)
 
             if show_sampling:
-                if use_sidebar:
-                    sample_size = st.sidebar.slider(
-                        "Sample size (in %)", min_value=0, max_value=100, value=100
+                sample_size = sidebar_or_container.slider(
+                    "Sample size (in %)", min_value=0, max_value=100, value=100
+                )
+                sample_method = sidebar_or_container.selectbox(
+                    "Sample method", options=["random", "head", "stratified"]
+                )
+                if sample_method != "head":
+                    sample_seed = int(
+                        sidebar_or_container.number_input(
+                            "Sample seed", min_value=0, value=0, step=1
+                        )
                     )
-                else:
-                    sample_size = container.slider(
-                        "Sample size (in %)", min_value=0, max_value=100, value=100
+                if sample_method == "stratified" and table_name:
+                    table_value = self.data_store.get_value_obj(
+                        table_name, raise_exception=True
+                    )
+                    assert table_value is not None
+                    column_names = (
+                        table_value.get_metadata("table")
+                        .get("table", {})
+                        .get("column_names", [])
+                    )
+                    stratify_by = sidebar_or_container.selectbox(
+                        "Stratify by column", options=column_names
                     )
 
                 if sample_size < 100:
                     sampled = True
 
+        sample_key = None
+        if sampled:
+            sample_key = (sample_method, sample_size, sample_seed, stratify_by)
+
         def get_source_table():
             source_table = self.data_store.get_value_obj(table_name)
             # size = source_table.get_metadata('table')['table']['size']
 
             if sampled:
-                result = self.run_operation(  # type: ignore
-                    "table.sample.percent",
-                    inputs={"value_item": source_table, "sample_size": sample_size},
+                # samples are cached, and always the same for the same seed
+                source_table = self.sample_value(
+                    source_table,
+                    method=sample_method,
+                    size=sample_size,
+                    seed=sample_seed,
+                    stratify_by=stratify_by,
                 )
-                source_table = result.get_value_obj("sampled_value")
 
             return source_table
 
@@ -112,8 +315,11 @@ class TableComponentsMixin(KiaraComponentMixin):
                     if source_table is None:
                         source_table = get_source_table()
 
-                    source_table_data: pa.Table = source_table.get_value_data()
-                    container.dataframe(source_table_data.to_pandas())
+                    self.write_table(  # type: ignore
+                        source_table,
+                        key=f"{key}_source_table" if key else "sql_query_source_table",
+                        container=container,
+                    )
 
         if show_table_metadata_option:
 
@@ -126,10 +332,50 @@ class TableComponentsMixin(KiaraComponentMixin):
                         source_table = get_source_table()
                     container.write(source_table.get_metadata("table"))
 
+        bound_relations: typing.Dict[str, str] = {}
+        if table_name:
+            bound_relations["data"] = table_name
+        if relations:
+            bound_relations.update(relations)
+        if show_relations_option:
+            sidebar_or_container = st.sidebar if use_sidebar else container
+            additional = sidebar_or_container.multiselect(
+                "Additional tables",
+                options=[
+                    a
+                    for a in self.alias_index.get_aliases("table")
+                    if a not in bound_relations.values()
+                ],
+                key=f"{key}_additional_tables" if key else None,
+            )
+            for alias in additional:
+                bound_relations[alias] = alias
+
+        if show_schema_option:
+            show_schema = container.checkbox(
+                "Show relation schemas",
+                value=False,
+                key=f"{key}_show_schemas" if key else None,
+            )
+            if show_schema:
+                exp = container.expander("Relation schemas", expanded=True)
+                for relation_name, alias in bound_relations.items():
+                    exp.markdown(f"**{relation_name}** (alias: *{alias}*)")
+                    value = self.data_store.get_value_obj(alias)
+                    if value is None:
+                        exp.write("-- table not available --")
+                        continue
+                    exp.markdown(create_table_schema_markdown(value))
+
         container.subheader("SQL query")
-        container.caption(
-            "Create your sql query, use 'data' as the relation name. E.g 'SELECT * FROM data'."
-        )
+        if len(bound_relations) > 1:
+            container.caption(
+                f"Create your sql query, available relation names: {', '.join(bound_relations.keys())}. Relation names that contain a '-' need to be quoted."
+            )
+        else:
+            container.caption(
+                "Create your sql query, use 'data' as the relation name. E.g 'SELECT * FROM data'."
+            )
         sql_query = st_ace(
             height=editor_height,
             language="sql",
@@ -139,27 +385,155 @@ class TableComponentsMixin(KiaraComponentMixin):
             key=f"{key}_sql_editor" if key else None,
         )
 
-        op_outputs: typing.Optional[ValueSet] = None
+        query_result: typing.Optional[Value] = None
+        query_info: typing.Optional[str] = None
+        # whether the query result is only a preview of the full result
+        truncated = False
+        referenced_values: typing.Dict[str, Value] = {}
+        job_key = f"__sql_query_job_{key}__" if key else "__sql_query_job__"
 
-        if table_name and sql_query:
+        if bound_relations and sql_query:
             try:
-                if source_table is None:
-                    source_table = get_source_table()
+                # only tables that are used in the query are loaded and registered
+                referenced = find_referenced_relations(
+                    sql_query, bound_relations.keys()
+                )
+                for relation_name in referenced:
+                    value = self.data_store.get_value_obj(
+                        bound_relations[relation_name], raise_exception=True
+                    )
+                    assert value is not None
+                    referenced_values[relation_name] = value
 
-                op_outputs = self.run_operation(  # type: ignore
-                    "table.query.sql",
-                    inputs={"table": source_table, "query": sql_query},
+                # results are cached in the session value cache, so reruns that are triggered by other widgets don't
+                # run the query again
+                cache_key = (
+                    "sql_query",
+                    tuple(sorted((k, v.id) for k, v in referenced_values.items())),
+                    sample_key,
+                    normalize_sql_query(sql_query),
+                    preview_rows,
                 )
+                cached = self.value_cache.get(cache_key, None)
+                if "data" in referenced_values.keys() and sampled:
+                    if source_table is None and cached is None:
+                        source_table = get_source_table()
+                    if source_table is not None:
+                        referenced_values["data"] = source_table
+
+                if cached is not None:
+                    query_result, duration, truncated = cached
+                    query_info = f"Cached result (executed in {duration:.0f} ms)."
+                else:
+                    # the job is kept in the session state, so it survives reruns (e.g. the one triggered by the cancel
+                    # button), and so failed or cancelled queries are not re-run until something changes
+                    job: typing.Optional[SqlQueryJob] = st.session_state.get(
+                        job_key, None
+                    )
+                    if job is not None and job.key != cache_key:
+                        job.cancel()
+                        job = None
+                    if job is None:
+                        job = self.create_sql_query_job(
+                            sql_query,
+                            tables=referenced_values,
+                            # one more row than necessary, so we know whether there are more
+                            limit=preview_rows + 1 if preview_rows else None,
+                            timeout=timeout,
+                            key=cache_key,
+                        )
+                        st.session_state[job_key] = job
+                        job.start()
+
+                    if not job.done:
+                        cancel_placeholder = container.empty()
+                        if cancel_placeholder.button(
+                            "Cancel query", key=f"{job_key}_cancel"
+                        ):
+                            job.cancel()
+                        status = container.empty()
+                        while not job.wait(timeout=SQL_QUERY_POLL_INTERVAL):
+                            status.caption(
+                                f"Running query... ({job.elapsed:.1f} seconds)"
+                            )
+                        status.empty()
+                        cancel_placeholder.empty()
+
+                    duration = job.elapsed * 1000
+                    query_result = job.result()
+                    st.session_state.pop(job_key, None)
+                    query_info = f"Executed in {duration:.0f} ms."
+                    if query_result.item_is_valid():
+                        result_table = query_result.get_value_data()
+                        if preview_rows and result_table.num_rows > preview_rows:
+                            truncated = True
+                        self.value_cache.put(
+                            cache_key,
+                            (query_result, duration, truncated),
+                            size=estimate_size(result_table),
+                        )
+            except SqlQueryCancelled as sqc:
+                container.warning(str(sqc))
+                if container.button("Run query again", key=f"{job_key}_rerun"):
+                    st.session_state.pop(job_key, None)
+                    st.experimental_rerun()
             except Exception as e:
                 container.error(str(e))
                 # container.write(e)
 
         container.subheader("Query result")
+        if query_info:
+            container.caption(query_info)
 
-        if op_outputs and op_outputs.items_are_valid():
-            self.write_valueset(op_outputs, container=container)  # type: ignore
-        else:
+        if query_result is None or not query_result.item_is_valid():
             container.write("-- no result --")
+        elif truncated:
+            container.caption(
+                f"Preview: only the first {preview_rows} rows of the result were computed. The full result will be computed when it is saved."
+            )
+            self.write_table(  # type: ignore
+                query_result.get_value_data().slice(0, preview_rows),
+                key=f"{key}_query_result" if key else "sql_query_result",
+                container=container,
+            )
+        else:
+            self.write_valueset(  # type: ignore
+                {"query_result": query_result}, container=container
+            )
+
+        if show_profile_option:
+            show_profile = container.checkbox(
+                "Show query profile",
+                value=False,
+                key=f"{key}_show_profile" if key else None,
+            )
+            if show_profile and query_result is not None:
+                exp = container.expander("Query profile", expanded=True)
+                profile_key = ("sql_query_profile",) + cache_key[1:]
+                profile = self.value_cache.get(profile_key, None)
+                try:
+                    if profile is None:
+                        # the profile has to be created against the same (sampled) table the query ran on
+                        if "data" in referenced_values.keys() and sampled:
+                            if source_table is None:
+                                source_table = get_source_table()
+                            referenced_values["data"] = source_table
+                        job = self.create_sql_query_job(
+                            sql_query,
+                            tables=referenced_values,
+                            limit=preview_rows + 1 if preview_rows else None,
+                            timeout=timeout,
+                            profile=True,
+                        )
+                        with exp.spinner("Profiling query..."):
+                            job.start().wait()
+                        profile = job.result()
+                        self.value_cache.put(
+                            profile_key, profile, size=profile.memory_size
+                        )
+                    write_sql_query_profile(profile, container=exp)
+                except Exception as e:
+                    exp.error(str(e))
 
         if show_save_option:
             exp = container.expander("Save result")
@@ -169,9 +543,24 @@ class TableComponentsMixin(KiaraComponentMixin):
             if save_button:
                 if not alias:
                     exp.write("No alias provided.")
-                elif op_outputs is None or not op_outputs.items_are_valid():
+                elif query_result is None or not query_result.item_is_valid():
                     exp.write("No query result.")
                 else:
-                    q_result = op_outputs.get_value_obj("query_result")
-                    q_result.save([alias])
-                    st.experimental_rerun()
+                    if truncated:
+                        if "data" in referenced_values.keys() and sampled:
+                            if source_table is None:
+                                source_table = get_source_table()
+                            referenced_values["data"] = source_table
+                        job = self.create_sql_query_job(
+                            sql_query, tables=referenced_values, timeout=timeout
+                        )
+                        with exp.spinner("Computing full query result..."):
+                            job.start().wait()
+                    try:
+                        if truncated:
+                            query_result = job.result()
+                        self.save_value(query_result, [alias])
+                    except Exception as e:
+                        exp.error(str(e))
+                    else:
+                        st.experimental_rerun()
@@ -1,6 +1,7 @@
 # -*- coding: utf-8 -*-
 import typing
 
+import pyarrow as pa
 import streamlit as st
 from kiara.data import Value, ValueSet
 from kiara.data.values import ValueSchema
@@ -9,7 +10,25 @@ from networkx import Graph
 from streamlit.delta_generator import DeltaGenerator
 from streamlit_observable import observable
 
+from kiara_streamlit.arrow_transport import with_display_metadata
 from kiara_streamlit.components import KiaraComponentMixin
+from kiara_streamlit.defaults import (
+    GRAPH_LAYOUT_MAX_NODES,
+    GRAPH_OPTION_MAX_NODES,
+    GRAPH_PREVIEW_MAX_NODES,
+    WRITE_TABLE_PAGE_SIZE,
+    WRITE_TABLE_PREVIEW_MAX_STR_LEN,
+    WRITE_TABLE_PREVIEW_ROWS,
+)
+from kiara_streamlit.network_graphs import (
+    GRAPH_REDUCE_METHODS,
+    GraphEdgeList,
+    GraphPayload,
+    ReducedGraph,
+    format_size,
+    spring_layout,
+)
+from kiara_streamlit.table_utils import prepare_table_window
 
 
 class KiaraValueInfoComponentsMixin(KiaraComponentMixin):
@@ -25,6 +44,14 @@ class KiaraValueInfoComponentsMixin(KiaraComponentMixin):
         This auto-selects the appropriate component, based on the values 'type_name' attribute.
         Currently supported types: 'array', 'table', 'network_graph', 'dict'. All other types will be written using the
         generic `st.write(...)` method.
+
+        Tables (and arrays) are written with the 'write_table' component, and support the following 'write_config' keys:
+        'page_size', 'columns' (list of columns to display), 'max_str_len' (either a number, or a map of column name to
+        number, to truncate long strings) and 'elide_binary' (only display the size of binary values). In preview mode,
+        strings are truncated to 'WRITE_TABLE_PREVIEW_MAX_STR_LEN' characters, and binary values are elided by default.
+
+        Network graphs are written with the 'write_network_graph' component, and support the 'write_config' keys
+        'max_nodes', 'reduce_method', 'layout' and 'seed'.
         """
 
         if write_config is None:
@@ -40,51 +67,282 @@ class KiaraValueInfoComponentsMixin(KiaraComponentMixin):
         ):
             container.error("No value")
         else:
-            data = value.get_value_data()
-            if value.type_name == "table":
-                data = data.to_pandas()
-                if preview:
-                    data = data.head(50)
-            elif value.type_name == "array":
-                data = data.to_pandas()
+            if value.type_name in ["table", "array"]:
                 if preview:
-                    data = data.head(50)
+                    page_size = WRITE_TABLE_PREVIEW_ROWS
+                    max_str_len = write_config.get(
+                        "max_str_len", WRITE_TABLE_PREVIEW_MAX_STR_LEN
+                    )
+                    elide_binary = write_config.get("elide_binary", True)
+                else:
+                    page_size = write_config.get("page_size", None)
+                    max_str_len = write_config.get("max_str_len", None)
+                    elide_binary = write_config.get("elide_binary", False)
+                self.write_table(
+                    value,
+                    page_size=page_size,
+                    columns=write_config.get("columns", None),
+                    max_str_len=max_str_len,
+                    elide_binary=elide_binary,
+                    show_navigation=not preview,
+                    key=key if key else f"write_value_{value.id}",
+                    container=container,
+                )
+                return
 
             elif value.type_name == "network_graph":
+                self.write_network_graph(
+                    value,
+                    max_nodes=write_config.get("max_nodes", GRAPH_PREVIEW_MAX_NODES),
+                    reduce_method=write_config.get("reduce_method", "top_degree"),
+                    layout=write_config.get("layout", False),
+                    seed=write_config.get("seed", 0),
+                    show_options=not preview,
+                    key=key,
+                    container=container,
+                )
+                return
 
-                graph: Graph = value.get_value_data()
+            data = self.get_cached_value_data(value)
+            if hasattr(data, "dict"):
+                data = data.dict()
 
-                # nodes = [Node(id=i, label=str(i), size=200) for i in range(len(graph.nodes))]
-                # edges = [Edge(source=i, target=j, type="CURVE_SMOOTH") for (i,j) in graph.edges]
+            container.write(data)
 
-                nodes: typing.Dict[str, typing.Dict[str, typing.Any]] = {}
-                edges: typing.List[typing.Mapping[str, typing.Any]] = []
-                for (s, t) in graph.edges:
-                    if s not in nodes.keys():
-                        nodes[s] = {"id": str(s), "group": 1}
-                    if t not in nodes.keys():
-                        nodes[t] = {"id": str(t), "group": 1}
+    def write_table(
+        self,
+        table: typing.Union[Value, pa.Table, pa.Array, pa.ChunkedArray],
+        page_size: typing.Optional[int] = None,
+        columns: typing.Optional[typing.Iterable[str]] = None,
+        max_str_len: typing.Union[None, int, typing.Mapping[str, int]] = None,
+        elide_binary: bool = False,
+        show_navigation: bool = True,
+        key: typing.Optional[str] = None,
+        container: DeltaGenerator = st,
+    ):
+        """Write a (potentially very large) table, one page at a time.
 
-                    edges.append({"source": str(s), "target": str(t), "value": 1})
+        Only the rows of the current page are sliced out of the Arrow table (which does not copy any data), and converted
+        for display. Navigation buttons let the user move to the previous/next page, or jump to a specific one. Arrays are
+        displayed as single-column tables.
 
-                cleaned_data = {"nodes": list(nodes.values()), "links": edges}
+        To further reduce the amount of data that is sent to the browser, only a subset of 'columns' can be displayed,
+        strings can be truncated to 'max_str_len' characters (either for all, or for specific columns), and binary
+        columns can be replaced with the size of their values ('elide_binary').
 
-                observable(
-                    notebook="@d3/force-directed-graph",
-                    targets=["chart"],
-                    redefine={
-                        "miserables": cleaned_data,
-                    },
-                    key=key,
-                    observe=[],
-                )
-                return
-            elif hasattr(data, "dict"):
-                data = data.dict()
+        Pages are sent to the browser as Arrow data, without converting them to pandas first. If a value (instead of a
+        table object) is provided, the prepared page is cached in the session value cache.
+        """
+
+        value_id: typing.Optional[str] = None
+        if isinstance(table, Value):
+            value_id = table.id
+            if not key:
+                key = f"write_table_{value_id}"
+            table = self.get_cached_value_data(table)
+        if isinstance(table, (pa.Array, pa.ChunkedArray)):
+            table = pa.Table.from_arrays([table], names=["value"])
+
+        if not key:
+            key = "write_table"
+        if page_size is None:
+            page_size = WRITE_TABLE_PAGE_SIZE
+
+        num_rows = table.num_rows
+        num_pages = max(1, -(-num_rows // page_size))
+        page_key = f"{key}_page"
+
+        if show_navigation and num_pages > 1:
+            prev_col, page_col, next_col, info_col = container.columns([1, 2, 1, 4])
+            prev_page = prev_col.button("Previous", key=f"{key}_prev_page")
+            next_page = next_col.button("Next", key=f"{key}_next_page")
+
+            page = st.session_state.get(page_key, 1)
+            if prev_page:
+                page = page - 1
+            elif next_page:
+                page = page + 1
+            # the table might have changed since the last run
+            st.session_state[page_key] = min(max(page, 1), num_pages)
+
+            page = page_col.number_input(
+                "Page",
+                min_value=1,
+                max_value=num_pages,
+                step=1,
+                key=page_key,
+            )
+        else:
+            info_col = container
+            page = 1
+
+        offset = (page - 1) * page_size
+
+        def convert_window():
+            window = prepare_table_window(
+                table,
+                offset=offset,
+                length=page_size,
+                columns=columns,
+                max_str_len=max_str_len,
+                elide_binary=elide_binary,
+            )
+            # streamlit sends Arrow tables to the browser as they are, there's no need to convert them to pandas
+            return with_display_metadata(window, offset=offset)
+
+        if value_id is None:
+            window = convert_window()
+        else:
+            if isinstance(max_str_len, typing.Mapping):
+                _max_str_len: typing.Any = tuple(sorted(max_str_len.items()))
             else:
-                data = value.get_value_data()
+                _max_str_len = max_str_len
+            cache_key = (
+                value_id,
+                "table_window",
+                offset,
+                page_size,
+                tuple(columns) if columns else None,
+                _max_str_len,
+                elide_binary,
+            )
+            window = self.value_cache.get_or_create(cache_key, convert_window)
+
+        num_columns = window.num_columns
+        if num_columns != table.num_columns:
+            cols = f"{num_columns} of {table.num_columns}"
+        else:
+            cols = str(table.num_columns)
+        if num_rows:
+            info_col.caption(
+                f"Rows {offset + 1} - {offset + window.num_rows} of {num_rows} (columns: {cols})"
+            )
+        else:
+            info_col.caption(f"No rows (columns: {cols})")
 
-            container.write(data)
+        container.dataframe(window)
+
+    def write_network_graph(
+        self,
+        graph: typing.Union[Value, Graph],
+        max_nodes: typing.Optional[int] = GRAPH_PREVIEW_MAX_NODES,
+        reduce_method: str = "top_degree",
+        layout: bool = False,
+        seed: typing.Optional[int] = 0,
+        show_options: bool = False,
+        key: typing.Optional[str] = None,
+        container: DeltaGenerator = st,
+    ):
+        """Write a network graph, as force-directed graph.
+
+        Browsers can't render graphs with more than a few thousand nodes this way, so graphs that have more than
+        'max_nodes' nodes are reduced before they are sent. 'reduce_method' can be 'top_degree' (the nodes with the
+        highest degree), 'k_core' (the densest k-core that fits) or 'components' (a random, seeded, sample of connected
+        components). Set 'max_nodes' to 'None' to always send the whole graph.
+
+        If 'layout' is set, node positions are computed on the server, and fixed in the browser (otherwise the force
+        simulation in the browser computes them). That is only done for graphs with up to 'GRAPH_LAYOUT_MAX_NODES'
+        nodes (after reduction). 'show_options' renders controls for all of those settings.
+
+        If a value (instead of a graph object) is provided, the reduced graph and the payload are cached in the
+        session value cache.
+        """
+
+        value_id: typing.Optional[str] = None
+        if isinstance(graph, Value):
+            value_id = graph.id
+            if not key:
+                key = f"write_network_graph_{value_id}"
+        if not key:
+            key = "write_network_graph"
+
+        if show_options:
+            exp = container.expander("Graph display options")
+            reduce_method = exp.selectbox(
+                "Reduce large graphs to",
+                options=GRAPH_REDUCE_METHODS,
+                index=GRAPH_REDUCE_METHODS.index(reduce_method),
+                format_func=lambda m: {
+                    "top_degree": "nodes with highest degree",
+                    "k_core": "densest k-core",
+                    "components": "sample of connected components",
+                }[m],
+                key=f"{key}_reduce_method",
+            )
+            max_nodes = int(
+                exp.number_input(
+                    "Max. number of nodes",
+                    min_value=1,
+                    max_value=GRAPH_OPTION_MAX_NODES,
+                    value=min(
+                        max_nodes if max_nodes else GRAPH_PREVIEW_MAX_NODES,
+                        GRAPH_OPTION_MAX_NODES,
+                    ),
+                    step=100,
+                    key=f"{key}_max_nodes",
+                )
+            )
+            layout = exp.checkbox(
+                "Compute layout on server", value=layout, key=f"{key}_layout"
+            )
+
+        def create_edge_list() -> GraphEdgeList:
+            _graph = graph
+            if isinstance(_graph, Value):
+                _graph = self.get_cached_value_data(_graph)
+            return GraphEdgeList.from_graph(_graph)
+
+        def create_reduced() -> ReducedGraph:
+            if value_id is None:
+                edge_list = create_edge_list()
+            else:
+                # the edge list is expensive to create for large graphs, but a lot smaller than the graph itself
+                edge_list = self.value_cache.get_or_create(
+                    (value_id, "graph_edge_list"),
+                    create=create_edge_list,
+                    size=lambda e: e.memory_size,
+                )
+            return ReducedGraph(
+                edge_list, max_nodes=max_nodes, method=reduce_method, seed=seed
+            )
+
+        def create_payload() -> typing.Tuple[GraphPayload, ReducedGraph]:
+            reduced = create_reduced()
+            positions = None
+            if layout and reduced.edge_list.num_nodes <= GRAPH_LAYOUT_MAX_NODES:
+                positions = spring_layout(reduced.edge_list, seed=seed)
+            return GraphPayload(reduced.edge_list, positions=positions), reduced
+
+        if value_id is None:
+            payload, reduced = create_payload()
+        else:
+            payload, reduced = self.value_cache.get_or_create(
+                (value_id, "graph_payload", max_nodes, reduce_method, seed, layout),
+                create=create_payload,
+                size=lambda p: p[0].memory_size + p[1].memory_size,
+            )
+
+        container.caption(
+            f"{reduced.describe()} (payload size: {format_size(payload.size)})."
+        )
+        if reduced.is_reduced:
+            container.info(
+                f"The graph is too large to be displayed as a whole, so only a reduced version of it is shown (max. {max_nodes} nodes)."
+            )
+        if layout and reduced.edge_list.num_nodes > GRAPH_LAYOUT_MAX_NODES:
+            container.warning(
+                f"The layout is only computed on the server for graphs with up to {GRAPH_LAYOUT_MAX_NODES} nodes, it is computed in the browser instead."
+            )
+
+        observable(
+            notebook="@d3/force-directed-graph",
+            targets=["chart"],
+            redefine={
+                "miserables": payload.data,
+            },
+            key=key,
+            observe=[],
+        )
 
     # def value_type_specific_metadata(self, value_id: str, container: DeltaGenerator = st):
     #     """Display value-type specific metadata for a value.
@@ -169,8 +427,7 @@ class KiaraValueInfoComponentsMixin(KiaraComponentMixin):
                         elif value is None or not value.item_is_valid():
                             exp.write("No value to save.")
                         else:
-                            print("SAVE")
-                            value.save([alias])
+                            self.save_value(value, [alias])
                             # st.experimental_rerun()
 
     def valueset_schema_info(
@@ -11,7 +11,26 @@ from kiara.defaults import SpecialValue
 from streamlit.delta_generator import DeltaGenerator
 
 from kiara_streamlit.components import KiaraComponentMixin
-from kiara_streamlit.defaults import ONBOARD_MAKER_KEY
+from kiara_streamlit.defaults import (
+    ONBOARD_MAKER_KEY,
+    VALUE_SEARCH_BOX_PAGE_SIZE,
+    VALUE_SELECT_BOX_MAX_OPTIONS,
+)
+
+
+def _start_onboarding(
+    onboard_options: typing.Mapping[str, typing.Any],
+    value_type: str,
+    key: typing.Optional[str],
+) -> None:
+
+    # not a method, because the components object only resolves public attributes of the component collections
+    onboard_config = dict(onboard_options)
+    onboard_config["enabled"] = True
+    onboard_config["value_type"] = value_type
+    onboard_config["store_key"] = key
+    st.session_state[ONBOARD_MAKER_KEY] = onboard_config
+    st.experimental_rerun()
 
 
 class KiaraInputComponentsMixin(KiaraComponentMixin):
@@ -93,9 +112,15 @@ class KiaraInputComponentsMixin(KiaraComponentMixin):
         default: typing.Optional[str] = None,
         add_no_value_option: bool = False,
         onboard_options: typing.Optional[typing.Mapping[str, typing.Any]] = None,
+        max_options: typing.Optional[int] = None,
         key: typing.Optional[str] = None,
         container: DeltaGenerator = st,
     ):
+        """Render a selectbox with all aliases of values of a certain type in the kiara data store.
+
+        If there are more than 'max_options' aliases (default: 'VALUE_SELECT_BOX_MAX_OPTIONS') to choose from, a
+        searchable, paginated picker is rendered instead (see 'value_search_box').
+        """
 
         if onboard_options is None:
             onboard_options = {}
@@ -110,16 +135,20 @@ class KiaraInputComponentsMixin(KiaraComponentMixin):
             else:
                 label = f"Select {value_type}"
 
-        if value_type == "any":
-            aliases = set(self.data_store.alias_names)
-        else:
-            all_values = self.data_store.find_all_values_of_type(value_type)
-            aliases = set()
-            for v_id, value in all_values.items():
-                _aliases = self.data_store.find_aliases_for_value(value_item=value)
-                aliases.update((a.alias for a in _aliases))
-
-        sorted_aliases = sorted(aliases)
+        sorted_aliases = self.alias_index.get_aliases(value_type)
+
+        if max_options is None:
+            max_options = VALUE_SELECT_BOX_MAX_OPTIONS
+        if len(sorted_aliases) > max_options:
+            return self.value_search_box(
+                value_type=value_type,
+                label=label,
+                default=default,
+                add_no_value_option=add_no_value_option,
+                onboard_options=onboard_options,
+                key=key,
+                container=container,
+            )
 
         if value_type == "any":
             _vt = "dataset"
@@ -133,12 +162,12 @@ class KiaraInputComponentsMixin(KiaraComponentMixin):
             pre_options = [no_selection_option]
             if add_onboard_option:
                 pre_options.append(onboard_select_option)
-            selection = pre_options + sorted(aliases)
+            selection = pre_options + list(sorted_aliases)
         else:
             if add_onboard_option:
-                selection = [onboard_select_option] + sorted(aliases)
+                selection = [onboard_select_option] + list(sorted_aliases)
             else:
-                selection = sorted(aliases)
+                selection = list(sorted_aliases)
 
         if default and default in sorted_aliases:
             raise NotImplementedError()
@@ -154,13 +183,105 @@ class KiaraInputComponentsMixin(KiaraComponentMixin):
         if user_sel == no_selection_option:
             user_sel = None
         elif user_sel == onboard_select_option:
-            onboard_config = dict(onboard_options)
-            onboard_config["enabled"] = True
-            onboard_config["value_type"] = value_type
-            onboard_config["store_key"] = key
-            st.session_state[ONBOARD_MAKER_KEY] = onboard_config
-            st.experimental_rerun()
+            _start_onboarding(
+                onboard_options=onboard_options, value_type=value_type, key=key
+            )
+
+        return user_sel
+
+    def value_search_box(
+        self,
+        value_type: str,
+        label: typing.Optional[str] = None,
+        default: typing.Optional[str] = None,
+        add_no_value_option: bool = False,
+        onboard_options: typing.Optional[typing.Mapping[str, typing.Any]] = None,
+        page_size: typing.Optional[int] = None,
+        key: typing.Optional[str] = None,
+        container: DeltaGenerator = st,
+    ) -> typing.Optional[str]:
+        """Render a searchable, paginated picker for aliases of values of a certain type in the kiara data store.
+
+        Only the aliases of the current page of search results are sent to the browser, which makes this component
+        usable for data stores with tens of thousands of values (where a selectbox with all of them would not be).
+        Search is case-insensitive, and matches prefixes first, then substrings, then 'fuzzy' (in-order characters).
+        If 'default' is among the matches, the picker opens on the page that contains it, with it selected.
+        """
+
+        if onboard_options is None:
+            onboard_options = {}
+        add_onboard_option = onboard_options.get("enabled", False)
+
+        if add_onboard_option and not key:
+            raise Exception("When using the onboard option, 'key' must be specified.")
+
+        if page_size is None:
+            page_size = VALUE_SEARCH_BOX_PAGE_SIZE
+
+        if label is None:
+            if value_type == "any":
+                label = "Select value"
+            else:
+                label = f"Select {value_type}"
+
+        if value_type == "any":
+            _vt = "dataset"
+        else:
+            _vt = value_type
+
+        if not key:
+            key = f"value_search_box_{value_type}_{label}"
+
+        search_col, page_col = container.columns([4, 1])
+        query = search_col.text_input(f"Search {_vt}", key=f"{key}_search")
 
+        matches = self.alias_index.search(query, value_type=value_type)
+
+        num_pages = max(1, -(-len(matches) // page_size))
+        page_key = f"{key}_page"
+        last_query_key = f"{key}_last_query"
+        if st.session_state.get(last_query_key, None) != query:
+            # new search, so we go back to the first page (or the one that contains the default)
+            st.session_state[last_query_key] = query
+            if default and default in matches:
+                st.session_state[page_key] = matches.index(default) // page_size + 1
+            else:
+                st.session_state[page_key] = 1
+        if st.session_state.get(page_key, 1) > num_pages:
+            st.session_state[page_key] = num_pages
+
+        page = page_col.number_input(
+            "Page", min_value=1, max_value=num_pages, step=1, key=page_key
+        )
+        start = (int(page) - 1) * page_size
+        page_aliases = list(matches[start : start + page_size])  # noqa
+
+        no_selection_option = f"-- no {_vt} --"
+        onboard_select_option = f"-- onboard new {_vt} --"
+        pre_options = []
+        if add_no_value_option or not page_aliases:
+            pre_options.append(no_selection_option)
+        if add_onboard_option:
+            pre_options.append(onboard_select_option)
+        options = pre_options + page_aliases
+
+        index = options.index(default) if default in options else 0
+        user_sel = container.selectbox(
+            label=label, options=options, index=index, key=key
+        )
+        if matches:
+            container.caption(
+                f"{len(matches)} matching {_vt}(s), showing {start + 1} - {start + len(page_aliases)}."
+            )
+        else:
+            container.caption(f"No matching {_vt}.")
+
+        if user_sel == no_selection_option:
+            return None
+        elif user_sel == onboard_select_option:
+            _start_onboarding(
+                onboard_options=onboard_options, value_type=value_type, key=key
+            )
         return user_sel
 
     def valueset_input(
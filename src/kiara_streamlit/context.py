@@ -0,0 +1,175 @@
+# -*- coding: utf-8 -*-
+import logging
+import queue
+import threading
+import time
+import typing
+import weakref
+
+from kiara import Kiara
+from kiara.config import KiaraConfig
+
+log = logging.getLogger("kiara.streamlit")
+
+_WRITE_LOCKS: "weakref.WeakKeyDictionary[Kiara, threading.RLock]" = (
+    weakref.WeakKeyDictionary()
+)
+_WRITE_LOCKS_LOCK = threading.Lock()
+
+
+def get_write_lock(kiara: Kiara) -> threading.RLock:
+    """Return the lock that serializes writes (registering and saving values, aliases) to a kiara context.
+
+    This only matters for contexts that are shared between sessions (see 'SharedKiaraContext'), but is used for all of
+    them, since an uncontested lock is cheap.
+    """
+
+    lock = _WRITE_LOCKS.get(kiara, None)
+    if lock is None:
+        with _WRITE_LOCKS_LOCK:
+            lock = _WRITE_LOCKS.get(kiara, None)
+            if lock is None:
+                lock = threading.RLock()
+                _WRITE_LOCKS[kiara] = lock
+    return lock
+
+
+class SharedKiaraContext(object):
+    """A kiara context that is created once per server process, and shared between all browser sessions.
+
+    Module discovery, operation profiles and the data store index are only built once this way. Any state that
+    is specific to a single session (components object, temp files, pipeline apps, ...) is kept in that sessions
+    'st.session_state', not in the shared kiara object.
+
+    Note that the kiara object itself is not isolated per session: the data registry (including aliases) is the same
+    object for all sessions, which run in their own script threads, so values saved in one session are visible in all
+    others. kiara does not lock its internal state, which is why components register and save values while holding
+    the contexts write lock (see 'get_write_lock'). Values that are registered by kiara itself (e.g. the outputs of
+    pipeline steps that are processed in the background) are not covered by that lock, so a shared context is best
+    used for apps that mostly read data.
+    """
+
+    def __init__(self, kiara_config: KiaraConfig):
+
+        self._kiara_config: KiaraConfig = kiara_config
+        self._kiara: typing.Optional[Kiara] = None
+        self._lock = threading.Lock()
+
+    @property
+    def is_initialized(self) -> bool:
+        return self._kiara is not None
+
+    @property
+    def kiara(self) -> Kiara:
+
+        if self._kiara is None:
+            # sessions run in their own script threads, so we need to make sure only one of them creates the context
+            with self._lock:
+                if self._kiara is None:
+                    self._kiara = Kiara(config=self._kiara_config.copy())
+        return self._kiara
+
+
+class KiaraContextPool(object):
+    """A pool of pre-created kiara contexts, to be handed out to new browser sessions.
+
+    A background thread makes sure there are always (up to) 'size' contexts ready to use, so the first script run of a
+    new session does not have to wait for a kiara context to be created. If the pool is empty when a context is
+    requested, one is created synchronously (and counted as a miss).
+    """
+
+    def __init__(self, kiara_config: KiaraConfig, size: int = 2):
+
+        if size < 1:
+            raise ValueError(f"Invalid kiara context pool size '{size}': must be > 0.")
+
+        self._kiara_config: KiaraConfig = kiara_config
+        self._size: int = size
+
+        self._contexts: "queue.Queue[Kiara]" = queue.Queue(maxsize=size)
+        self._wanted = threading.Event()
+        self._stats_lock = threading.Lock()
+
+        self._hits: int = 0
+        self._misses: int = 0
+        self._contexts_created: int = 0
+        self._construction_time_total: float = 0.0
+        self._construction_time_last: typing.Optional[float] = None
+
+        self._worker = threading.Thread(
+            target=self._fill_pool, name="kiara-context-pool", daemon=True
+        )
+        self._wanted.set()
+        self._worker.start()
+
+    @property
+    def size(self) -> int:
+        return self._size
+
+    def _create_context(self) -> Kiara:
+
+        start = time.time()
+        kiara = Kiara(config=self._kiara_config.copy())
+        duration = time.time() - start
+
+        with self._stats_lock:
+            self._contexts_created = self._contexts_created + 1
+            self._construction_time_total = self._construction_time_total + duration
+            self._construction_time_last = duration
+
+        return kiara
+
+    def _fill_pool(self):
+
+        while True:
+            self._wanted.wait()
+            self._wanted.clear()
+            while not self._contexts.full():
+                try:
+                    kiara = self._create_context()
+                except Exception as e:
+                    log.error(f"Can't create kiara context for pool: {e}")
+                    break
+                self._contexts.put(kiara)
+
+    def get_context(self) -> Kiara:
+        """Return a kiara context, either from the pool, or a newly created one if the pool is empty."""
+
+        try:
+            kiara = self._contexts.get_nowait()
+            hit = True
+        except queue.Empty:
+            kiara = None
+            hit = False
+
+        with self._stats_lock:
+            if hit:
+                self._hits = self._hits + 1
+            else:
+                self._misses = self._misses + 1
+
+        # in any case, the pool needs to be re-filled now
+        self._wanted.set()
+
+        if kiara is None:
+            kiara = self._create_context()
+        return kiara
+
+    @property
+    def stats(self) -> typing.Mapping[str, typing.Any]:
+        """Usage statistics for this pool (hits, misses, context construction times in seconds)."""
+
+        with self._stats_lock:
+            if self._contexts_created:
+                avg = self._construction_time_total / self._contexts_created
+            else:
+                avg = None
+            return {
+                "size": self._size,
+                "available": self._contexts.qsize(),
+                "hits": self._hits,
+                "misses": self._misses,
+                "contexts_created": self._contexts_created,
+                "construction_time_avg": avg,
+                "construction_time_last": self._construction_time_last,
+            }
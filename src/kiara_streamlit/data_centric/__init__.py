@@ -429,7 +429,7 @@ class DataCentricApp(object):
                 )
                 save = st.button("Save", key=f"value_save_button_{last_page.page_id}")
                 if save:
-                    s = selected_value.save(aliases=[alias])
+                    s = st.kiara.components.save_value(selected_value, aliases=[alias])
                     st.info(f"Value saved using alias '{alias}', saved id: {s.id}")
 
         next_operation = self.ask_for_next_operation(value=selected_value)
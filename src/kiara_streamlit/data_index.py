@@ -0,0 +1,200 @@
+# -*- coding: utf-8 -*-
+import bisect
+import threading
+import time
+import typing
+import weakref
+
+from kiara.data import Value
+from kiara.data.registry import DataRegistry
+
+from kiara_streamlit.defaults import (
+    ALIAS_INDEX_RESCAN_INTERVAL,
+    ALIAS_INDEX_SEARCH_CACHE_SIZE,
+)
+
+_ALIAS_INDEXES: "weakref.WeakKeyDictionary[DataRegistry, AliasIndex]" = (
+    weakref.WeakKeyDictionary()
+)
+_ALIAS_INDEXES_LOCK = threading.Lock()
+
+
+def get_alias_index(data_store: DataRegistry) -> "AliasIndex":
+    """Return the (process-wide) alias index for a data store, creating it if necessary."""
+
+    index = _ALIAS_INDEXES.get(data_store, None)
+    if index is None:
+        with _ALIAS_INDEXES_LOCK:
+            index = _ALIAS_INDEXES.get(data_store, None)
+            if index is None:
+                index = AliasIndex(data_store=data_store)
+                _ALIAS_INDEXES[data_store] = index
+    return index
+
+
+class AliasIndex(object):
+    """An index of value type -> sorted alias names, for a single data store.
+
+    Finding all aliases of a value type via the data store means loading every value, and then looking up the aliases
+    for each one of them. This index only ever looks up the type of an alias once, and is updated incrementally: either
+    explicitly, when a value is saved via 'value_saved' (which is what 'KiaraComponentMixin.save_value' does), or by
+    comparing the current alias names with the indexed ones, at most every 'rescan_interval' seconds (to pick up values
+    that were saved in other sessions, or outside of streamlit).
+
+    Alias lists are replaced, never modified, so the sequences returned by 'get_aliases' can be used without copying.
+    """
+
+    def __init__(
+        self,
+        data_store: DataRegistry,
+        rescan_interval: float = ALIAS_INDEX_RESCAN_INTERVAL,
+    ):
+
+        self._data_store: DataRegistry = data_store
+        self._rescan_interval: float = rescan_interval
+
+        self._lock = threading.RLock()
+        self._alias_types: typing.Dict[str, str] = {}
+        self._aliases_by_type: typing.Dict[str, typing.Tuple[str, ...]] = {}
+        self._all_aliases: typing.Tuple[str, ...] = ()
+        self._last_scan: typing.Optional[float] = None
+
+        self._search_cache: typing.Dict[
+            typing.Tuple[str, str],
+            typing.Tuple[typing.Sequence[str], typing.Tuple[str, ...]],
+        ] = {}
+
+    @property
+    def value_types(self) -> typing.Iterable[str]:
+
+        self._ensure_current()
+        return sorted(self._aliases_by_type.keys())
+
+    def get_aliases(self, value_type: str = "any") -> typing.Sequence[str]:
+        """Return the sorted list of aliases that point to values of the specified type ('any' for all aliases)."""
+
+        self._ensure_current()
+        if value_type == "any":
+            return self._all_aliases
+        return self._aliases_by_type.get(value_type, ())
+
+    def search(
+        self, query: typing.Optional[str], value_type: str = "any"
+    ) -> typing.Sequence[str]:
+        """Return all aliases of the specified type that match the query.
+
+        Matching is case-insensitive. Aliases that start with the query come first, then aliases that contain it, then
+        aliases that contain all characters of the query in the same order (e.g. 'ntwk' matches 'my_network'). Results
+        for recent queries are cached, until the alias list for the value type changes.
+        """
+
+        aliases = self.get_aliases(value_type)
+        if not query:
+            return aliases
+
+        cache_key = (value_type, query.lower())
+        cached = self._search_cache.get(cache_key, None)
+        if cached is not None and cached[0] is aliases:
+            return cached[1]
+
+        q = cache_key[1]
+        prefix = []
+        substring = []
+        fuzzy = []
+        for alias in aliases:
+            _alias = alias.lower()
+            if _alias.startswith(q):
+                prefix.append(alias)
+            elif q in _alias:
+                substring.append(alias)
+            else:
+                chars = iter(_alias)
+                if all(c in chars for c in q):
+                    fuzzy.append(alias)
+
+        result = tuple(prefix + substring + fuzzy)
+
+        with self._lock:
+            if len(self._search_cache) >= ALIAS_INDEX_SEARCH_CACHE_SIZE:
+                self._search_cache.pop(next(iter(self._search_cache)))
+            self._search_cache[cache_key] = (aliases, result)
+        return result
+
+    def get_alias_type(self, alias: str) -> typing.Optional[str]:
+
+        self._ensure_current()
+        return self._alias_types.get(alias, None)
+
+    def rescan(self) -> None:
+        """Sync this index with the aliases that currently exist in the data store."""
+
+        with self._lock:
+            current = set(self._data_store.alias_names)
+            indexed = set(self._alias_types.keys())
+
+            changed_types = set()
+            for alias in indexed - current:
+                changed_types.add(self._alias_types.pop(alias))
+            for alias in current - indexed:
+                value_type = self._lookup_alias_type(alias)
+                if value_type is not None:
+                    self._alias_types[alias] = value_type
+                    changed_types.add(value_type)
+
+            if changed_types:
+                # the sorted sequences are rebuilt in one go, inserting aliases one by one would be quadratic for the
+                # initial scan; sequences of types that did not change are kept, so their cached searches stay valid
+                aliases_by_type: typing.Dict[str, typing.List[str]] = {
+                    value_type: [] for value_type in changed_types
+                }
+                for alias, value_type in self._alias_types.items():
+                    if value_type in changed_types:
+                        aliases_by_type[value_type].append(alias)
+                for value_type, aliases in aliases_by_type.items():
+                    if aliases:
+                        self._aliases_by_type[value_type] = tuple(sorted(aliases))
+                    else:
+                        self._aliases_by_type.pop(value_type, None)
+                self._all_aliases = tuple(sorted(self._alias_types.keys()))
+
+            self._last_scan = time.time()
+
+    def value_saved(self, value: Value, aliases: typing.Iterable[str]) -> None:
+        """Add the aliases of a newly saved value to the index."""
+
+        with self._lock:
+            for alias in aliases:
+                if alias not in self._alias_types.keys():
+                    self._add_alias(alias, value.type_name)
+
+    def _ensure_current(self) -> None:
+
+        if (
+            self._last_scan is None
+            or time.time() - self._last_scan > self._rescan_interval
+        ):
+            self.rescan()
+
+    def _lookup_alias_type(self, alias: str) -> typing.Optional[str]:
+
+        # all versions of an alias share the same schema, so we only need to look this up once per alias
+        try:
+            value_slot = self._data_store._get_value_slot_for_alias(alias_name=alias)
+            return value_slot.get_latest_value().type_name
+        except Exception:
+            return None
+
+    def _add_alias(self, alias: str, value_type: str) -> None:
+
+        self._alias_types[alias] = value_type
+        self._all_aliases = self._insert(self._all_aliases, alias)
+        self._aliases_by_type[value_type] = self._insert(
+            self._aliases_by_type.get(value_type, ()), alias
+        )
+
+    def _insert(
+        self, aliases: typing.Tuple[str, ...], alias: str
+    ) -> typing.Tuple[str, ...]:
+
+        idx = bisect.bisect_left(aliases, alias)
+        return aliases[:idx] + (alias,) + aliases[idx:]
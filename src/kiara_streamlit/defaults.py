@@ -26,4 +26,60 @@ MODULE_INFO_UI_STREAMLIT_FILE = os.path.join(
 EXAMPLE_BASE_DIR = os.path.join(KIARA_STREAMLIT_RESOURCES_FOLDER, "examples")
 TEMPLATES_BASE_DIR = os.path.join(KIARA_STREAMLIT_RESOURCES_FOLDER, "templates")
 
+COMPONENT_MANIFEST_DIR = os.path.join(
+    kiara_stremalit_app_dirs.user_cache_dir, "component_manifests"
+)
+"""Default folder to cache the index of available components in."""
+
+ALIAS_INDEX_RESCAN_INTERVAL = 10.0
+"""Max. number of seconds before the alias index checks the data store for aliases that were added elsewhere."""
+
+ALIAS_INDEX_SEARCH_CACHE_SIZE = 64
+"""Number of search results the alias index keeps around (per data store)."""
+
+VALUE_SELECT_BOX_MAX_OPTIONS = 1000
+"""Max. number of aliases 'value_select_box' puts into a single selectbox, before switching to a searchable, paginated picker."""
+
+VALUE_SEARCH_BOX_PAGE_SIZE = 20
+"""Default number of aliases per page in the 'value_search_box' component."""
+
+WRITE_TABLE_PAGE_SIZE = 100
+"""Default number of rows per page in the 'write_table' component."""
+
+WRITE_TABLE_PREVIEW_ROWS = 50
+"""Number of rows that are displayed when writing a table in preview mode."""
+
+WRITE_TABLE_PREVIEW_MAX_STR_LEN = 200
+"""Max. length of strings in table previews, longer ones are truncated."""
+
+VALUE_CACHE_MAX_BYTES = 256 * 1024 * 1024
+"""Default memory budget (in bytes) of the per-session cache for value data and conversions."""
+
+SHARED_VALUE_CACHE_MAX_BYTES = 1024 * 1024 * 1024
+"""Default memory budget (in bytes) of the process-wide cache for Arrow value data that is shared between sessions."""
+
+SQL_QUERY_PREVIEW_ROWS = 1000
+"""Default max. number of rows that are computed for query result previews in the 'sql_query' component."""
+
+SQL_QUERY_TIMEOUT = 60.0
+"""Default timeout (in seconds) for queries in the 'sql_query' component."""
+
+SQL_QUERY_POLL_INTERVAL = 0.2
+"""Interval (in seconds) in which the 'sql_query' component updates the status of a running query."""
+
+GRAPH_PREVIEW_MAX_NODES = 1000
+"""Default max. number of nodes that are sent to the browser when displaying a network graph (larger graphs are reduced)."""
+
+GRAPH_OPTION_MAX_NODES = 10000
+"""The largest value users can choose for the max. number of nodes of a displayed network graph."""
+
+GRAPH_LAYOUT_MAX_NODES = 2000
+"""Max. number of nodes of a graph whose layout is computed on the server (memory use grows quadratically with it)."""
+
+GRAPH_LAYOUT_SCALE = 300.0
+"""Node positions of precomputed network graph layouts are scaled to [-GRAPH_LAYOUT_SCALE, GRAPH_LAYOUT_SCALE]."""
+
+PIPELINE_STAGE_POLL_INTERVAL = 0.5
+"""Interval (in seconds) in which the status of a pipeline stage that is processed in the background is updated."""
+
 ONBOARD_MAKER_KEY = "__ONBOARD__"
@@ -0,0 +1,358 @@
+# -*- coding: utf-8 -*-
+import itertools
+import sys
+import typing
+
+import numpy as np
+
+from kiara_streamlit.defaults import GRAPH_LAYOUT_MAX_NODES, GRAPH_LAYOUT_SCALE
+
+if typing.TYPE_CHECKING:
+    from networkx import Graph
+
+GRAPH_REDUCE_METHODS = ("top_degree", "k_core", "components")
+
+# the (compact) json overhead of a single node and link, without the node ids
+_NODE_JSON_OVERHEAD = len('{"id":"","group":1},')
+_LINK_JSON_OVERHEAD = len('{"source":"","target":"","value":1},')
+_PAYLOAD_JSON_OVERHEAD = len('{"nodes":[],"links":[]}')
+_RECORD_MEMORY_SIZE = sys.getsizeof({"source": "", "target": "", "value": 1})
+
+
+class GraphEdgeList(object):
+    """The edges of a graph, as arrays of node indexes into an array of (string) node ids.
+
+    Only nodes that are part of at least one edge are included.
+    """
+
+    def __init__(self, node_ids: np.ndarray, sources: np.ndarray, targets: np.ndarray):
+
+        self.node_ids: np.ndarray = node_ids
+        self.sources: np.ndarray = sources
+        self.targets: np.ndarray = targets
+
+    @classmethod
+    def from_graph(cls, graph: "Graph") -> "GraphEdgeList":
+        """Extract the edge list of a networkx graph.
+
+        The edges are read in a single pass, everything else (de-duplicating nodes, converting node ids to strings) is
+        done on arrays, and only once per node.
+        """
+
+        import pandas as pd
+
+        # assigned to a pre-allocated array, because 'np.array' would turn tuple node ids into an extra dimension
+        flat = np.empty(graph.number_of_edges() * 2, dtype=object)
+        flat[:] = list(itertools.chain.from_iterable(graph.edges()))
+        codes, nodes = pd.factorize(flat)
+        node_ids = np.array([str(n) for n in nodes], dtype=object)
+        return GraphEdgeList(
+            node_ids=node_ids, sources=codes[0::2], targets=codes[1::2]
+        )
+
+    @property
+    def num_nodes(self) -> int:
+        return len(self.node_ids)
+
+    @property
+    def num_edges(self) -> int:
+        return len(self.sources)
+
+    @property
+    def memory_size(self) -> int:
+        """A rough estimate of the memory this edge list uses (in bytes), for cache accounting."""
+
+        return (
+            self.sources.nbytes
+            + self.targets.nbytes
+            + sum(sys.getsizeof(n) for n in self.node_ids)
+        )
+
+    def node_degrees(self) -> np.ndarray:
+        """The degree of every node (self-loops count twice)."""
+
+        return np.bincount(
+            np.concatenate([self.sources, self.targets]), minlength=self.num_nodes
+        )
+
+    def subgraph(self, nodes: np.ndarray) -> "GraphEdgeList":
+        """Return the subgraph induced by a subset of nodes (boolean mask or node indexes), with re-indexed nodes."""
+
+        if nodes.dtype != np.bool_:
+            mask = np.zeros(self.num_nodes, dtype=np.bool_)
+            mask[nodes] = True
+            nodes = mask
+
+        new_index = np.cumsum(nodes) - 1
+        edges = nodes[self.sources] & nodes[self.targets]
+        return GraphEdgeList(
+            node_ids=self.node_ids[nodes],
+            sources=new_index[self.sources[edges]],
+            targets=new_index[self.targets[edges]],
+        )
+
+    def connected_components(self) -> np.ndarray:
+        """Return the component label of every node (the smallest node index in its component)."""
+
+        labels = np.arange(self.num_nodes)
+        while True:
+            # hook every node to the smallest label of its neighbours, then shortcut label chains
+            new_labels = labels.copy()
+            smallest = np.minimum(labels[self.sources], labels[self.targets])
+            np.minimum.at(new_labels, self.sources, smallest)
+            np.minimum.at(new_labels, self.targets, smallest)
+            while True:
+                jumped = new_labels[new_labels]
+                if np.array_equal(jumped, new_labels):
+                    break
+                new_labels = jumped
+            if np.array_equal(new_labels, labels):
+                return labels
+            labels = new_labels
+
+    def k_core(self, k: int) -> np.ndarray:
+        """Return a mask of the nodes that are part of the k-core of this graph (self-loops are ignored)."""
+
+        alive = np.ones(self.num_nodes, dtype=np.bool_)
+        edges = self.sources != self.targets
+        while True:
+            degrees = np.bincount(
+                np.concatenate([self.sources[edges], self.targets[edges]]),
+                minlength=self.num_nodes,
+            )
+            remove = alive & (degrees < k)
+            if not remove.any():
+                return alive
+            alive = alive & ~remove
+            edges = edges & alive[self.sources] & alive[self.targets]
+
+
+class ReducedGraph(object):
+    """A graph, reduced to at most 'max_nodes' nodes (if necessary), for display.
+
+    Supported methods:
+
+    - 'top_degree': the nodes with the highest degree
+    - 'k_core': the densest k-core that has at most 'max_nodes' nodes (further reduced by degree, if even the densest
+      core is too large)
+    - 'components': whole connected components: the largest one, and a random selection of the others that still fit
+      (if the largest component is larger than 'max_nodes' on its own, it is reduced by degree)
+    """
+
+    def __init__(
+        self,
+        edge_list: GraphEdgeList,
+        max_nodes: typing.Optional[int] = None,
+        method: str = "top_degree",
+        seed: typing.Optional[int] = None,
+    ):
+
+        if method not in GRAPH_REDUCE_METHODS:
+            raise ValueError(
+                f"Invalid graph reduce method '{method}', available: {', '.join(GRAPH_REDUCE_METHODS)}."
+            )
+
+        self.total_nodes: int = edge_list.num_nodes
+        self.total_edges: int = edge_list.num_edges
+        self.method: typing.Optional[str] = None
+        self.details: typing.Optional[str] = None
+
+        if max_nodes is None or edge_list.num_nodes <= max_nodes:
+            self.edge_list: GraphEdgeList = edge_list
+            return
+
+        self.method = method
+        if method == "k_core":
+            k = 1
+            core = edge_list.k_core(k)
+            while core.sum() > max_nodes:
+                next_core = edge_list.k_core(k + 1)
+                if not next_core.any():
+                    break
+                core = next_core
+                k = k + 1
+            edge_list = edge_list.subgraph(core)
+            self.details = f"{k}-core"
+        elif method == "components":
+            labels = edge_list.connected_components()
+            components, sizes = np.unique(labels, return_counts=True)
+            # the largest component is always part of the result (reduced by degree below, if it is too large on its
+            # own), otherwise graphs with one giant component would only ever show some of the small fragments
+            largest = int(np.argmax(sizes))
+            selected = [components[largest]]
+            remaining = max_nodes - sizes[largest]
+            rng = np.random.default_rng(seed)
+            for idx in rng.permutation(len(components)):
+                if remaining <= 0:
+                    break
+                if idx != largest and sizes[idx] <= remaining:
+                    selected.append(components[idx])
+                    remaining = remaining - sizes[idx]
+            edge_list = edge_list.subgraph(np.isin(labels, selected))
+            self.details = f"{len(selected)} of {len(components)} connected components"
+
+        if edge_list.num_nodes > max_nodes:
+            degrees = edge_list.node_degrees()
+            top = np.argpartition(-degrees, max_nodes - 1)[:max_nodes]
+            edge_list = edge_list.subgraph(top)
+            if self.details:
+                self.details = f"{self.details}, top {max_nodes} nodes by degree"
+            else:
+                self.details = f"top {max_nodes} nodes by degree"
+
+        self.edge_list = edge_list
+
+    @property
+    def is_reduced(self) -> bool:
+        return self.method is not None
+
+    @property
+    def memory_size(self) -> int:
+        return self.edge_list.memory_size
+
+    def describe(self) -> str:
+        """A description of how much of the original graph this graph contains."""
+
+        num_nodes = self.edge_list.num_nodes
+        num_edges = self.edge_list.num_edges
+        if not self.is_reduced:
+            return f"{num_nodes} nodes, {num_edges} links"
+
+        node_pct = num_nodes / self.total_nodes * 100 if self.total_nodes else 0
+        edge_pct = num_edges / self.total_edges * 100 if self.total_edges else 0
+        return (
+            f"Showing {num_nodes} of {self.total_nodes} nodes ({node_pct:.1f}%) and {num_edges} of {self.total_edges} "
+            f"links ({edge_pct:.1f}%), reduced to: {self.details}"
+        )
+
+
+def spring_layout(
+    edge_list: GraphEdgeList,
+    iterations: int = 50,
+    seed: typing.Optional[int] = None,
+    scale: float = GRAPH_LAYOUT_SCALE,
+    max_nodes: int = GRAPH_LAYOUT_MAX_NODES,
+) -> np.ndarray:
+    """Compute (Fruchterman-Reingold) node positions, centered on (0, 0) and scaled to [-scale, scale].
+
+    This computes all pairwise forces in every iteration, which needs memory quadratic in the number of nodes, so
+    graphs with more than 'max_nodes' nodes are refused (with a 'ValueError').
+    """
+
+    num_nodes = edge_list.num_nodes
+    if num_nodes > max_nodes:
+        raise ValueError(
+            f"Can't compute layout for graph with {num_nodes} nodes: only graphs with up to {max_nodes} nodes are supported."
+        )
+    if num_nodes == 0:
+        return np.zeros((0, 2))
+
+    rng = np.random.default_rng(seed)
+    pos = rng.random((num_nodes, 2))
+    adjacency = np.zeros((num_nodes, num_nodes))
+    adjacency[edge_list.sources, edge_list.targets] = 1
+    adjacency[edge_list.targets, edge_list.sources] = 1
+
+    # optimal distance between nodes, and the max. distance a node can move in an iteration (which decreases)
+    k = np.sqrt(1.0 / num_nodes)
+    temperature = 0.1
+    dt = temperature / (iterations + 1)
+    for _ in range(iterations):
+        delta = pos[:, np.newaxis, :] - pos[np.newaxis, :, :]
+        distance = np.linalg.norm(delta, axis=-1)
+        np.clip(distance, 0.01, None, out=distance)
+        displacement = np.einsum(
+            "ijk,ij->ik", delta, k * k / distance**2 - adjacency * distance / k
+        )
+        length = np.linalg.norm(displacement, axis=-1)
+        length = np.where(length < 0.01, 0.1, length)
+        pos = pos + displacement * (temperature / length)[:, np.newaxis]
+        temperature = temperature - dt
+
+    pos = pos - pos.mean(axis=0)
+    extent = np.abs(pos).max()
+    if extent > 0:
+        pos = pos * (scale / extent)
+    return pos
+
+
+class GraphPayload(object):
+    """The nodes/links data for the force-directed graph notebook, created from a graph edge list.
+
+    If 'positions' are provided, they are used as fixed node positions (instead of the ones the force simulation in the
+    browser would compute).
+    """
+
+    def __init__(
+        self, edge_list: GraphEdgeList, positions: typing.Optional[np.ndarray] = None
+    ):
+
+        node_ids = edge_list.node_ids
+        sources = node_ids[edge_list.sources].tolist()
+        targets = node_ids[edge_list.targets].tolist()
+
+        if positions is None:
+            self.nodes: typing.List[typing.Dict[str, typing.Any]] = [
+                {"id": node_id, "group": 1} for node_id in node_ids.tolist()
+            ]
+        else:
+            self.nodes = [
+                {"id": node_id, "group": 1, "fx": x, "fy": y}
+                for node_id, (x, y) in zip(
+                    node_ids.tolist(), positions.round(1).tolist()
+                )
+            ]
+        self.links: typing.List[typing.Dict[str, typing.Any]] = [
+            {"source": s, "target": t, "value": 1} for s, t in zip(sources, targets)
+        ]
+
+        # estimated from the node id lengths, so we don't have to serialize the payload
+        id_lengths = np.array([len(n) for n in node_ids], dtype=np.int64)
+        self.size: int = int(
+            id_lengths.sum()
+            + id_lengths[edge_list.sources].sum()
+            + id_lengths[edge_list.targets].sum()
+            + len(self.nodes) * _NODE_JSON_OVERHEAD
+            + len(self.links) * _LINK_JSON_OVERHEAD
+            + _PAYLOAD_JSON_OVERHEAD
+            # the last node and link don't have a trailing comma
+            - min(len(self.nodes), 1)
+            - min(len(self.links), 1)
+        )
+        if positions is not None:
+            self.size = self.size + sum(
+                len(',"fx":,"fy":') + len(str(n["fx"])) + len(str(n["fy"]))
+                for n in self.nodes
+            )
+
+    @property
+    def num_nodes(self) -> int:
+        return len(self.nodes)
+
+    @property
+    def num_links(self) -> int:
+        return len(self.links)
+
+    @property
+    def data(self) -> typing.Mapping[str, typing.Any]:
+        return {"nodes": self.nodes, "links": self.links}
+
+    @property
+    def memory_size(self) -> int:
+        """A rough estimate of the memory this payload uses (in bytes), for cache accounting."""
+
+        # node id strings are shared between the records, and are accounted for by the edge list
+        return (len(self.nodes) + len(self.links)) * _RECORD_MEMORY_SIZE
+
+
+def format_size(num_bytes: int) -> str:
+    """Format a number of bytes in a human readable way."""
+
+    size = float(num_bytes)
+    for unit in ["bytes", "KB", "MB", "GB"]:
+        if size < 1024 or unit == "GB":
+            break
+        size = size / 1024
+    if unit == "bytes":
+        return f"{num_bytes} bytes"
+    return f"{size:.1f} {unit}"
@@ -0,0 +1,397 @@
+# -*- coding: utf-8 -*-
+import hashlib
+import json
+import logging
+import threading
+import time
+import typing
+from concurrent.futures import Future
+
+from kiara.data import Value
+from kiara.pipeline.controller.batch import BatchControllerManual
+from kiara.processing import Job, JobStatus
+from kiara.processing.parallel import ThreadPoolProcessor
+from kiara.processing.processor import ModuleProcessor
+from kiara.processing.synchronous import SynchronousProcessor
+
+if typing.TYPE_CHECKING:
+    from kiara import Kiara, Pipeline
+
+log = logging.getLogger("kiara.streamlit")
+
+STEP_STATUS_LABELS: typing.Mapping[str, str] = {
+    "waiting": "waiting",
+    "processing": "processing...",
+    "success": "success",
+    "failed": "failed",
+    "skipped": "skipped",
+    "cached": "cached (inputs unchanged, not processed again)",
+    "unchanged": "not re-processed (up to date)",
+}
+
+
+def create_module_processor(
+    max_workers: typing.Optional[int] = None, kiara: typing.Optional["Kiara"] = None
+) -> ModuleProcessor:
+    """Create the processor a pipeline controller uses to run the modules of its steps.
+
+    If 'max_workers' is larger than 1, the steps of a stage (which are independent of each other, by construction) are
+    processed concurrently, by a thread pool with that many workers. Otherwise they are processed one after the other.
+    """
+
+    if max_workers is not None and max_workers < 1:
+        raise ValueError(
+            f"Invalid max. number of workers '{max_workers}': must be >= 1."
+        )
+
+    if max_workers is None or max_workers == 1:
+        return SynchronousProcessor(kiara=kiara)
+    return ThreadPoolProcessor(max_workers=max_workers, kiara=kiara)
+
+
+def get_processor_max_workers(processor: ModuleProcessor) -> int:
+    """Return the max. number of steps a module processor runs concurrently."""
+
+    if isinstance(processor, ThreadPoolProcessor):
+        return processor._executor._max_workers  # type: ignore
+    return 1
+
+
+def set_pipeline_max_workers(pipeline: "Pipeline", max_workers: int) -> None:
+    """Change the max. number of steps of a stage that are processed concurrently, by replacing the processor of the pipeline controller.
+
+    Details about jobs that were run by the previous processor are retained.
+    """
+
+    controller = pipeline.controller
+    current: ModuleProcessor = controller._processor
+    if get_processor_max_workers(current) == max_workers:
+        return
+
+    if getattr(controller, "_is_running", False):
+        raise Exception(
+            "Can't change the number of workers while the pipeline is processed."
+        )
+
+    processor = create_module_processor(max_workers=max_workers, kiara=current._kiara)
+    processor._finished_jobs.update(current._finished_jobs)
+    processor._inputs.update(current._inputs)
+    processor._outputs.update(current._outputs)
+    if isinstance(processor, ThreadPoolProcessor):
+        # memoized steps return the ids of previous jobs, which the controller waits for
+        for job_id in current._finished_jobs.keys():
+            future: Future = Future()
+            future.set_result(None)
+            processor._futures[job_id] = future
+    controller._processor = processor
+
+    if isinstance(current, ThreadPoolProcessor):
+        current._executor.shutdown(wait=False)
+
+
+class CachedJobId(str):
+    """The id of a previous job, returned for a step that was not processed again because nothing changed."""
+
+
+def get_value_fingerprint(value: Value) -> str:
+    """Return a string that identifies the data of a value: one of its hashes, or its id if its type can't be hashed."""
+
+    if not value.is_set:
+        return "__not_set__"
+
+    try:
+        hashes = sorted(value.get_hashes(), key=lambda h: h.hash_type)
+    except Exception as e:
+        log.debug(f"Can't calculate hash for value '{value.id}': {e}")
+        hashes = []
+
+    if hashes:
+        return f"{hashes[0].hash_type}:{hashes[0].hash}"
+    return f"id:{value.id}"
+
+
+def get_step_fingerprint(controller: BatchControllerManual, step_id: str) -> str:
+    """Return a hash of the module type, module config and input values of a pipeline step."""
+
+    step = controller.get_step(step_id)
+    inputs = controller.get_step_inputs(step_id)
+    data = {
+        "module_type": step.module_type,
+        "module_config": step.module_config,
+        "inputs": {k: get_value_fingerprint(v) for k, v in inputs.items()},
+    }
+    return hashlib.sha256(
+        json.dumps(data, sort_keys=True, default=str).encode("utf-8")
+    ).hexdigest()
+
+
+class MemoizingBatchController(BatchControllerManual):
+    """A batch controller that does not process a step again if its module and input values did not change.
+
+    Steps are only skipped if their last processing run succeeded, and their outputs are still valid. In that case,
+    'process_step' returns the id of the job of that run (as 'CachedJobId').
+    """
+
+    def __init__(
+        self,
+        pipeline: typing.Optional["Pipeline"] = None,
+        processor: typing.Optional[ModuleProcessor] = None,
+        kiara: typing.Optional["Kiara"] = None,
+    ):
+
+        # step_id -> (fingerprint, job id)
+        self._step_memo: typing.Dict[str, typing.Tuple[str, str]] = {}
+        super().__init__(pipeline=pipeline, processor=processor, kiara=kiara)
+
+    def process_step(
+        self, step_id: str, raise_exception: bool = False, wait: bool = False
+    ) -> str:
+
+        fingerprint = get_step_fingerprint(self, step_id)
+        memo = self._step_memo.get(step_id, None)
+        if memo is not None and memo[0] == fingerprint:
+            job = self.get_job_details(memo[1])
+            if (
+                job is not None
+                and job.status == JobStatus.SUCCESS
+                and self.get_step_outputs(step_id).items_are_valid()
+            ):
+                return CachedJobId(memo[1])
+
+        job_id = super().process_step(
+            step_id, raise_exception=raise_exception, wait=wait
+        )
+        self._step_memo[step_id] = (fingerprint, job_id)
+        return job_id
+
+
+def get_stage_runtimes(
+    pipeline: "Pipeline",
+    stage_result: typing.Mapping[str, typing.Union[None, str, Exception]],
+) -> typing.Optional[typing.Tuple[float, float]]:
+    """Return the wall-clock time it took to process the steps of a stage, and the sum of their runtimes (in seconds).
+
+    The difference is the time that was saved by processing steps concurrently. Returns 'None' if no step was run.
+    """
+
+    started = []
+    finished = []
+    total = 0.0
+    for job_id in stage_result.values():
+        if job_id is None or isinstance(job_id, (Exception, CachedJobId)):
+            continue
+        job = pipeline.controller.get_job_details(job_id)
+        if job is None or job.started is None or job.finished is None:
+            continue
+        started.append(job.started)
+        finished.append(job.finished)
+        total = total + (job.finished - job.started).total_seconds()
+
+    if not started:
+        return None
+
+    wall_clock = (max(finished) - min(started)).total_seconds()
+    return wall_clock, total
+
+
+class StageProcessingJob(object):
+    """Processes a pipeline stage (incl. all required stages below) in a background thread.
+
+    This way the streamlit script thread is not blocked while processing happens. The job object is meant to be
+    kept in the session state, where it survives reruns, so its status can be polled (see 'step_status' and
+    'progress') until it is done.
+    """
+
+    def __init__(self, pipeline: "Pipeline", stage_nr: int):
+
+        self._pipeline: "Pipeline" = pipeline
+        self.stage_nr: int = stage_nr
+
+        self._steps: typing.Dict[int, typing.List[str]] = {
+            stage: list(steps.keys())
+            for stage, steps in pipeline.get_steps_by_stage().items()
+            if stage <= stage_nr
+        }
+        # the ids of the jobs that ran for each step before, so we can tell which steps this job processed already
+        self._previous_job_ids: typing.Dict[str, typing.Optional[str]] = {}
+        for step_ids in self._steps.values():
+            for step_id in step_ids:
+                job = pipeline.controller.get_job_details(step_id)
+                self._previous_job_ids[step_id] = job.id if job is not None else None
+        # the controller does not process stages again that were finished already (and whose inputs didn't change)
+        finished_until = getattr(pipeline.controller, "_finished_until", None)
+        self._finished_stages: int = (
+            finished_until + 1 if finished_until is not None else 0
+        )
+
+        self._lock = threading.Lock()
+        self._finished = threading.Event()
+        self._thread: typing.Optional[threading.Thread] = None
+        self._started: typing.Optional[float] = None
+        self._ended: typing.Optional[float] = None
+        self._result: typing.Optional[
+            typing.Mapping[int, typing.Mapping[str, typing.Union[None, str, Exception]]]
+        ] = None
+        self._error: typing.Optional[Exception] = None
+
+    @property
+    def pipeline(self) -> "Pipeline":
+        return self._pipeline
+
+    def start(self) -> "StageProcessingJob":
+
+        with self._lock:
+            if self._thread is not None:
+                raise Exception("Job already started.")
+            self._started = time.perf_counter()
+            self._thread = threading.Thread(target=self._run, daemon=True)
+            self._thread.start()
+        return self
+
+    @property
+    def done(self) -> bool:
+        return self._finished.is_set()
+
+    @property
+    def elapsed(self) -> float:
+        """The runtime of this job (so far), in seconds."""
+
+        if self._started is None:
+            return 0.0
+        end = self._ended if self._ended is not None else time.perf_counter()
+        return end - self._started
+
+    @property
+    def error(self) -> typing.Optional[Exception]:
+        return self._error
+
+    def wait(self, timeout: typing.Optional[float] = None) -> bool:
+        """Wait for the job to finish, return whether it did."""
+
+        return self._finished.wait(timeout=timeout)
+
+    def result(
+        self,
+    ) -> typing.Mapping[int, typing.Mapping[str, typing.Union[None, str, Exception]]]:
+        """Return the processing result (as returned by 'BatchControllerManual.process_stage'), or raise the exception the job failed with."""
+
+        if not self.done:
+            raise Exception("Job not finished yet.")
+        if self._error is not None:
+            raise self._error
+        assert self._result is not None
+        return self._result
+
+    def step_status(self) -> typing.Mapping[int, typing.Mapping[str, str]]:
+        """Return the current status of every step this job is concerned with, by stage.
+
+        Possible values: 'waiting', 'processing', 'success', 'failed', 'skipped', 'unchanged'.
+        """
+
+        result = self._result if self.done else None
+
+        status: typing.Dict[int, typing.Dict[str, str]] = {}
+        processing_stage: typing.Optional[int] = None
+        for stage, step_ids in self._steps.items():
+            stage_status = status.setdefault(stage, {})
+            for step_id in step_ids:
+                if stage <= self._finished_stages:
+                    stage_status[step_id] = "unchanged"
+                elif result is not None:
+                    stage_status[step_id] = self._status_from_result(
+                        result, stage, step_id
+                    )
+                else:
+                    stage_status[step_id] = self._status_from_job(step_id)
+
+                # stages are processed one after the other, so waiting steps in the first unfinished stage are being
+                # processed right now (their job details are only available once the module is submitted)
+                if stage_status[step_id] == "waiting" and not self.done:
+                    if processing_stage is None:
+                        processing_stage = stage
+                    if processing_stage == stage:
+                        stage_status[step_id] = "processing"
+
+        return status
+
+    def progress(self) -> float:
+        """Return the ratio (0.0-1.0) of the steps this job has to process that are finished."""
+
+        if self.done:
+            return 1.0
+
+        total = 0
+        finished = 0.0
+        for stage, steps in self.step_status().items():
+            for step_id, status in steps.items():
+                if status == "unchanged":
+                    continue
+                total = total + 1
+                if status in ["success", "failed", "skipped"]:
+                    finished = finished + 1
+                elif status == "processing":
+                    # some modules report their progress
+                    job = self._current_job(step_id)
+                    if job is not None and job.job_log.percent_finished > 0:
+                        finished = finished + job.job_log.percent_finished / 100
+
+        if not total:
+            return 0.0
+        return min(finished / total, 1.0)
+
+    def _current_job(self, step_id: str) -> typing.Optional[Job]:
+
+        job = self._pipeline.controller.get_job_details(step_id)
+        if job is None or job.id == self._previous_job_ids.get(step_id, None):
+            return None
+        return job
+
+    def _status_from_job(self, step_id: str) -> str:
+
+        job = self._current_job(step_id)
+        if job is None:
+            return "waiting"
+        if job.status == JobStatus.SUCCESS:
+            return "success"
+        if job.status == JobStatus.FAILED:
+            return "failed"
+        return "processing"
+
+    def _status_from_result(
+        self,
+        result: typing.Mapping[
+            int, typing.Mapping[str, typing.Union[None, str, Exception]]
+        ],
+        stage: int,
+        step_id: str,
+    ) -> str:
+
+        if step_id not in result.get(stage, {}).keys():
+            return "unchanged"
+        job_id = result[stage][step_id]
+        if job_id is None:
+            return "skipped"
+        if isinstance(job_id, Exception):
+            return "failed"
+        if isinstance(job_id, CachedJobId):
+            return "cached"
+        status = self._status_from_job(step_id)
+        return status if status != "waiting" else "success"
+
+    def _run(self) -> None:
+
+        # only batch controllers can process single stages, callers make sure the pipeline uses one
+        controller: BatchControllerManual = self._pipeline.controller  # type: ignore
+        try:
+            result = controller.process_stage(stage_nr=self.stage_nr)
+            error = None
+        except Exception as e:
+            log.debug(f"Error processing pipeline stage {self.stage_nr}: {e}")
+            result = None
+            error = e
+
+        with self._lock:
+            self._ended = time.perf_counter()
+            self._result = result
+            self._error = error
+            self._finished.set()
@@ -10,6 +10,11 @@ from kiara.pipeline.config import PipelineConfig
 from kiara.pipeline.controller.batch import BatchControllerManual
 from kiara.utils import log_message
 
+from kiara_streamlit.pipeline_processing import (
+    MemoizingBatchController,
+    create_module_processor,
+)
+
 if typing.TYPE_CHECKING:
     from kiara_streamlit.pipelines.pages import PipelinePage
 
@@ -51,20 +56,28 @@ class PipelineApp(object):
         config: typing.Optional[typing.Mapping[str, typing.Any]] = None,
     ):
 
+        if config is None:
+            config = {}
+
+        self._config: typing.Mapping[str, typing.Any] = config
+
         self._pipeline_config: PipelineConfig = PipelineConfig.create_pipeline_config(
             config=pipeline, kiara=st.kiara
         )
-        self._pipeline_controller = BatchControllerManual(kiara=st.kiara)
+        # steps within a stage are processed concurrently if 'max_workers' is set (> 1)
+        processor = create_module_processor(
+            max_workers=self._config.get("max_workers", None), kiara=st.kiara
+        )
+        # steps whose inputs didn't change are not processed again, unless 'memoize_steps' is disabled
+        controller_cls: typing.Type[BatchControllerManual] = BatchControllerManual
+        if self._config.get("memoize_steps", True):
+            controller_cls = MemoizingBatchController
+        self._pipeline_controller = controller_cls(processor=processor, kiara=st.kiara)
         self._pipeline: Pipeline = self._pipeline_config.create_pipeline(
             controller=self._pipeline_controller, kiara=st.kiara
         )
         self._pages: typing.Dict[int, PipelinePage] = {}
 
-        if config is None:
-            config = {}
-
-        self._config: typing.Mapping[str, typing.Any] = config
-
         self._current_page: int = -1
         self._previous_page: bool = False
         self._next_page: bool = False
@@ -176,6 +189,13 @@ class PipelineApp(object):
 
         self._current_page = page_nr
 
+        # background processing continues while the user navigates between pages
+        job = st.kiara.components.get_pipeline_stage_job(pipeline=self._pipeline)
+        if job is not None and not job.done:
+            st.sidebar.info(
+                f"Processing stage {job.stage_nr} in the background (started {job.elapsed:.0f} seconds ago)."
+            )
+
         st.experimental_set_query_params(page=self._pages[page_nr].id)
         print(f"Run page: {page_nr} - {self._pages[page_nr].id}")
 
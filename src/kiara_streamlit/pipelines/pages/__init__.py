@@ -10,6 +10,7 @@ from kiara.pipeline.controller.batch import BatchControllerManual
 from kiara.processing import Job
 from streamlit.delta_generator import DeltaGenerator
 
+from kiara_streamlit.pipeline_processing import StageProcessingJob
 from kiara_streamlit.pipelines import PipelineApp
 
 
@@ -40,6 +41,15 @@ class PipelinePage(abc.ABC):
     def page_config(self) -> typing.Mapping[str, typing.Any]:
         return self._config
 
+    @property
+    def background_processing(self) -> bool:
+        """Whether stages are processed in the background ('background_processing' page or app config, default: False)."""
+
+        return self.page_config.get(
+            "background_processing",
+            self.app._config.get("background_processing", False),
+        )
+
     def get_page_key(self, sub_key: typing.Optional[str] = None) -> str:
         if sub_key:
             return f"_pipeline_page_{self.id}_{sub_key}"
@@ -155,7 +165,13 @@ class PipelinePage(abc.ABC):
         render_errors: bool = True,
         container: DeltaGenerator = st,
     ) -> typing.Mapping[str, typing.Union[bool, Exception]]:
-        """Set one or several pipeline inputs."""
+        """Set one or several pipeline inputs.
+
+        Inputs are not set while the pipeline is processed in the background, in which case an empty dict is returned.
+        """
+
+        if self.is_processing():
+            return {}
 
         return st.kiara.set_pipeline_inputs(
             pipeline=self.pipeline,
@@ -227,20 +243,60 @@ class PipelinePage(abc.ABC):
         return self.pipeline.get_step_outputs(step_id)
 
     def process_stage(
-        self, stage_nr: int, render_result: bool = False, container: DeltaGenerator = st
-    ) -> typing.Mapping[int, typing.Mapping[str, typing.Union[None, str, Exception]]]:
-        """Process all steps within the pipeline that are part of the specified stage (or a required stage below)."""
+        self,
+        stage_nr: int,
+        render_result: bool = False,
+        background: bool = False,
+        container: DeltaGenerator = st,
+    ) -> typing.Union[
+        typing.Mapping[int, typing.Mapping[str, typing.Union[None, str, Exception]]],
+        StageProcessingJob,
+    ]:
+        """Process all steps within the pipeline that are part of the specified stage (or a required stage below).
+
+        If 'background' is set to True, the stage is processed in a background thread, and the job is returned.
+        """
 
         return st.kiara.process_pipeline_stage(
             pipeline=self.pipeline,
             stage_nr=stage_nr,
             render_result=render_result,
+            background=background,
             container=container,
         )
 
+    def get_stage_job(
+        self, stage_nr: typing.Optional[int] = None
+    ) -> typing.Optional[StageProcessingJob]:
+        """Return the last job that processed (or still processes) a stage of this pipeline in the background."""
+
+        return st.kiara.components.get_pipeline_stage_job(
+            pipeline=self.pipeline, stage_nr=stage_nr
+        )
+
+    def is_processing(self) -> bool:
+        """Whether a stage of this pipeline is currently processed in the background."""
+
+        job = self.get_stage_job()
+        return job is not None and not job.done
+
+    def render_stage_processing_status(
+        self,
+        job: typing.Optional[StageProcessingJob] = None,
+        poll: bool = True,
+        container: DeltaGenerator = st,
+    ) -> typing.Optional[
+        typing.Mapping[int, typing.Mapping[str, typing.Union[None, str, Exception]]]
+    ]:
+        """Render the progress of a background processing job, and its result once it is done."""
+
+        return st.kiara.pipeline_stage_processing_status(
+            pipeline=self.pipeline, job=job, poll=poll, container=container
+        )
+
     def get_processing_job_details(self, job_or_step_id: str) -> Job:
 
-        return st.kiara.get_pipeline_processing_job_details(
+        return st.kiara.components.get_pipeline_processing_job_details(
             pipeline=self.pipeline, job_or_step_id=job_or_step_id
         )
 
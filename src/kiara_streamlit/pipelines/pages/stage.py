@@ -23,7 +23,7 @@ class StagePage(PipelinePage):
                 "Invalid config for pipeline page of type 'stage': 'stage' configuration must be an integer."
             )
 
-        super().__init__(id=id)
+        super().__init__(id=id, config=config)
 
     def run_page(self, st: DeltaGenerator):
 
@@ -39,10 +39,20 @@ class StagePage(PipelinePage):
             stage_inputs, key=self.get_page_key("stage_inputs"), defaults=stage_inputs
         )
 
+        # stage jobs are processed in the background, if configured, so the page stays responsive while they run
+        background = self.background_processing
+        processing = self.is_processing()
+        if processing:
+            st.info("Inputs can't be changed while the pipeline is processed.")
+
         # set the inputs we got from the user
         self.set_pipeline_inputs(inputs=stage_input_data, render_errors=True)
 
-        process_btn = st.button("Process", key=self.get_page_key("process_button"))
+        # the button is hidden while processing, instead of disabled, since older streamlit versions don't support that
+        if processing:
+            process_btn = False
+        else:
+            process_btn = st.button("Process", key=self.get_page_key("process_button"))
 
         # check if the process button was clicked
         if process_btn:
@@ -55,19 +65,27 @@ class StagePage(PipelinePage):
             )
             if not invalid:
                 # process all steps in this stage
-                self._cache["last_processing_results"] = self.process_stage(
-                    self._stage, render_result=False, container=st
+                if background:
+                    self.process_stage(self._stage, background=True)
+                else:
+                    self._cache["last_processing_results"] = self.process_stage(
+                        self._stage, render_result=False, container=st
+                    )
+
+        job = self.get_stage_job(self._stage) if background else None
+        # the status of a background job is rendered here, but only at the end of the page (since it's updated
+        # until the job is done), so the rest of the page doesn't have to wait for it
+        status_container = st.container()
+        if job is None:
+            last_processing_results = self._cache.get("last_processing_results", None)
+            if last_processing_results is not None:
+                # here we print the results of the processing (if there are any)
+                # the reason this is stored in the object is to be able to display the results if the user
+                # navigated away and back from/to this page
+                self.render_stage_processing_result(
+                    last_processing_results, only_stage=self._stage, container=st
                 )
 
-        last_processing_results = self._cache.get("last_processing_results", None)
-        if last_processing_results is not None:
-            # here we print the results of the processing (if there are any)
-            # the reason this is stored in the object is to be able to display the results if the user
-            # navigated away and back from/to this page
-            self.render_stage_processing_result(
-                last_processing_results, only_stage=self._stage, container=st
-            )
-
         # let the user choose whether they want to see all step outputs
         show_step_outputs = st.checkbox("Show step outputs", value=False)
         if show_step_outputs:
@@ -91,3 +109,11 @@ class StagePage(PipelinePage):
                     key=self.get_page_key("pipeline_output_preview"),
                     container=st,
                 )
+
+        if job is not None:
+            # the job is kept in the session state, so this picks up the progress (or the results) of processing
+            # that was started in a previous run, or before the user navigated away from this page
+            self.render_stage_processing_status(job, container=status_container)
+            if processing and job.done:
+                # show the inputs and the process button again
+                st.experimental_rerun()
@@ -0,0 +1,20 @@
+# -*- coding: utf-8 -*-
+
+"""Render a searchable, paginated picker for table values.
+"""
+
+import streamlit as st
+from kiara.data import Value
+
+import kiara_streamlit
+
+kiara_streamlit.init()
+
+table_alias = st.kiara.value_search_box(
+    value_type="table", add_no_value_option=True, page_size=10
+)
+if not table_alias:
+    st.write("No table selected.")
+else:
+    table_value: Value = st.kiara.get_value(table_alias)
+    st.write(table_value.get_value_data().to_pandas())
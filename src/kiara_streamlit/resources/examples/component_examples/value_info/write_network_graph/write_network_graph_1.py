@@ -0,0 +1,16 @@
+# -*- coding: utf-8 -*-
+
+"""Ask the user to select a network graph, then display (a reduced version of) it, with a precomputed layout.
+"""
+
+import streamlit as st
+
+import kiara_streamlit
+
+kiara_streamlit.init()
+
+graph_value = st.kiara.value_input_network_graph(label="Select a network graph")
+if graph_value is not None:
+    st.kiara.write_network_graph(
+        graph_value, max_nodes=500, reduce_method="k_core", layout=True
+    )
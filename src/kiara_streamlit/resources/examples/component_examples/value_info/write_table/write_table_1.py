@@ -0,0 +1,14 @@
+# -*- coding: utf-8 -*-
+
+"""Ask the user to select a table, then display it one page at a time.
+"""
+
+import streamlit as st
+
+import kiara_streamlit
+
+kiara_streamlit.init()
+
+table_value = st.kiara.value_input_table(label="Select a table")
+if table_value is not None:
+    st.kiara.write_table(table_value, page_size=20)
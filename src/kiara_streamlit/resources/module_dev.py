@@ -4,6 +4,7 @@ import os
 import typing
 
 import streamlit as st
+from kiara.data import Value
 from kiara.data.values.value_set import SlottedValueSet
 from kiara.operations import OperationType
 from kiara.operations.sample import SampleValueOperationType
@@ -129,17 +130,37 @@ for field_name, slot in input_slots.items():
                 "sample", value=False, key=f"sample_check_{field_name}"
             )
             if sample_field:
-                sample_map_input[field_name] = inputs_sidebar.slider(
+                sample_size = inputs_sidebar.slider(
                     "percent",
                     min_value=0,
                     max_value=100,
                     value=10,
                     key=f"sample_{field_name}",
                 )
+                sample_seed = inputs_sidebar.number_input(
+                    "seed",
+                    min_value=0,
+                    value=0,
+                    step=1,
+                    key=f"sample_seed_{field_name}",
+                )
+                sample_map_input[field_name] = (sample_size, sample_seed)
 
 if sample_map_input:
 
-    for field, sample_size in sample_map_input.items():
+    for field, (sample_size, sample_seed) in sample_map_input.items():
+        value_item = op_inputs[field]
+        if isinstance(value_item, str):
+            value_item = st.kiara.data_store.get_value_obj(
+                value_item, raise_exception=True
+            )
+        if isinstance(value_item, Value):
+            # samples are cached, so they are only created once (and are always the same for the same seed)
+            op_inputs[field] = st.kiara.components.sample_value(
+                value_item, size=sample_size, seed=sample_seed
+            )
+            continue
+
         sample_op: typing.Optional[
             OperationType
         ] = st.kiara.operation_mgmt.operation_types.get("sample")
@@ -150,7 +171,7 @@ if sample_map_input:
             "percent"  # type: ignore
         ]  # type: ignore
         result = perc_op.module.run(
-            _attach_lineage=False, value_item=op_inputs[field], sample_size=sample_size
+            _attach_lineage=False, value_item=value_item, sample_size=sample_size
         )
         op_inputs[field] = result.get_value_obj("sampled_value")
 
@@ -0,0 +1,563 @@
+# -*- coding: utf-8 -*-
+import json
+import logging
+import re
+import sys
+import threading
+import time
+import typing
+import uuid
+import weakref
+
+import pyarrow as pa
+
+if typing.TYPE_CHECKING:
+    from kiara import Kiara
+
+log = logging.getLogger("kiara.streamlit")
+
+_SQL_ENGINES: "weakref.WeakKeyDictionary[Kiara, SqlEngine]" = (
+    weakref.WeakKeyDictionary()
+)
+_SQL_ENGINES_LOCK = threading.Lock()
+
+# how often (in seconds) a cancelled query is interrupted again, until it stopped
+_INTERRUPT_INTERVAL = 0.05
+
+
+def normalize_sql_query(query: str) -> str:
+    """Normalize a sql query, so that queries that only differ in formatting can share cached results.
+
+    Comments are removed, and all whitespace outside of quoted strings and identifiers is collapsed to a single space
+    (a comment counts as whitespace, since a line comment ends the line), then leading/trailing whitespace and trailing
+    semicolons are removed. Case is not changed, since that might be significant within quotes.
+    """
+
+    result: typing.List[str] = []
+    quote: typing.Optional[str] = None
+    whitespace = False
+
+    idx = 0
+    length = len(query)
+    while idx < length:
+        char = query[idx]
+        if quote is not None:
+            result.append(char)
+            if char == quote:
+                quote = None
+            idx = idx + 1
+            continue
+
+        if query.startswith("--", idx):
+            end = query.find("\n", idx)
+            idx = length if end < 0 else end
+            whitespace = True
+            continue
+        if query.startswith("/*", idx):
+            end = query.find("*/", idx + 2)
+            idx = length if end < 0 else end + 2
+            whitespace = True
+            continue
+
+        idx = idx + 1
+        if char.isspace():
+            whitespace = True
+            continue
+
+        if whitespace:
+            result.append(" ")
+            whitespace = False
+
+        if char in ("'", '"'):
+            quote = char
+        result.append(char)
+
+    return "".join(result).strip().rstrip(";").strip()
+
+
+def limit_sql_query(query: str, limit: int) -> str:
+    """Wrap a query, so it returns at most 'limit' rows."""
+
+    # the line breaks make sure a trailing '--' comment in the query can't swallow the closing bracket
+    query = query.strip().rstrip(";")
+    return f"SELECT * FROM (\n{query}\n) AS __limited LIMIT {int(limit)}"
+
+
+def find_referenced_relations(
+    query: str, relation_names: typing.Iterable[str]
+) -> typing.List[str]:
+    """Return the relation names that are referenced in a query.
+
+    This only does (case-insensitive) token matching, not proper parsing, so it might return relations that are not
+    actually used (e.g. if the name appears in a string literal), but it won't miss any.
+    """
+
+    lowered = query.lower()
+    result = []
+    for name in relation_names:
+        pattern = r"(?<![\w$])" + re.escape(name.lower()) + r"(?![\w$])"
+        if re.search(pattern, lowered):
+            result.append(name)
+    return result
+
+
+def get_sql_engine(kiara: "Kiara") -> typing.Optional["SqlEngine"]:
+    """Return the embedded sql engine for a kiara context, or 'None' if duckdb is not available.
+
+    There is one engine per kiara context, so if the context is shared between sessions, so is the engine (their
+    queries still run concurrently, see 'SqlEngine').
+    """
+
+    engine = _SQL_ENGINES.get(kiara, None)
+    if engine is None:
+        with _SQL_ENGINES_LOCK:
+            engine = _SQL_ENGINES.get(kiara, None)
+            if engine is None:
+                try:
+                    engine = SqlEngine()
+                except ImportError as ie:
+                    log.warning(f"Can't create embedded sql engine: {ie}")
+                    return None
+                _SQL_ENGINES[kiara] = engine
+    return engine
+
+
+def fetch_arrow_table(result: typing.Any) -> pa.Table:
+    """Return the result of a duckdb query as Arrow table (older duckdb versions return a table, newer ones a reader)."""
+
+    arrow = result.arrow()
+    if isinstance(arrow, pa.RecordBatchReader):
+        arrow = arrow.read_all()
+    return arrow
+
+
+class SqlQueryCancelled(Exception):
+    """Raised when a query was cancelled, either by the user, or because it timed out."""
+
+    def __init__(self, msg: str, reason: str = "cancelled"):
+
+        self.reason: str = reason
+        super().__init__(msg)
+
+
+class SqlEngine(object):
+    """An embedded (in-memory) duckdb database, used to run sql queries against Arrow tables.
+
+    Every query runs on its own cursor (a separate connection to the same database), so queries from several threads
+    (e.g. sessions that share a kiara context, and with it the engine) run concurrently, instead of waiting for each
+    other. The tables a query needs are registered on its cursor only, which does not copy them (duckdb reads the Arrow
+    buffers directly). This way queries can never see tables they did not ask for, and tables are not kept in memory
+    once the query is finished.
+    """
+
+    def __init__(self):
+
+        import duckdb
+
+        self._connection = duckdb.connect(database=":memory:")
+        # only guards the creation of cursors, queries don't use the connection itself
+        self._lock = threading.Lock()
+
+        self._state_lock = threading.Lock()
+        self._pending: typing.Set[str] = set()
+        # query id -> cursor
+        self._running: typing.Dict[str, typing.Any] = {}
+        # query id -> reason
+        self._cancelled: typing.Dict[str, str] = {}
+
+    def query(
+        self,
+        query: str,
+        tables: typing.Optional[typing.Mapping[str, pa.Table]] = None,
+        limit: typing.Optional[int] = None,
+        query_id: typing.Optional[str] = None,
+    ) -> pa.Table:
+        """Run a query against the provided tables (relation name -> table).
+
+        If 'limit' is set, the query is wrapped in a 'SELECT * FROM (...) LIMIT <limit>' query, so the engine only
+        computes as many rows as necessary. If a 'query_id' is provided, the query can be cancelled with it (see
+        'cancel'), in which case a 'SqlQueryCancelled' exception is raised. Returns the query result as Arrow table.
+        """
+
+        return self._run(
+            lambda cursor, query_id: self._execute(
+                cursor, query, limit=limit, query_id=query_id
+            ),
+            tables=tables,
+            query_id=query_id,
+        )
+
+    def profile(
+        self,
+        query: str,
+        tables: typing.Optional[typing.Mapping[str, pa.Table]] = None,
+        limit: typing.Optional[int] = None,
+        query_id: typing.Optional[str] = None,
+    ) -> "SqlQueryProfile":
+        """Run a query with profiling enabled, and return its execution plan and statistics.
+
+        Arguments are the same as for 'query'. The query result itself is not returned.
+        """
+
+        def run(cursor: typing.Any, query_id: str) -> SqlQueryProfile:
+
+            _query = query.strip().rstrip(";")
+            if limit is not None:
+                _query = limit_sql_query(_query, limit=limit)
+
+            try:
+                plan = cursor.execute(f"EXPLAIN {_query}").fetchall()
+            except Exception:
+                if limit is None:
+                    raise
+                with self._state_lock:
+                    self._check_cancelled(query_id)
+                # not every statement can be used as a sub-query
+                _query = query.strip().rstrip(";")
+                plan = cursor.execute(f"EXPLAIN {_query}").fetchall()
+
+            try:
+                analyzed = cursor.execute(
+                    f"EXPLAIN (ANALYZE, FORMAT JSON) {_query}"
+                ).fetchall()
+                operator_tree = json.loads(analyzed[0][1])
+                analyzed_plan = None
+            except Exception:
+                with self._state_lock:
+                    self._check_cancelled(query_id)
+                # older duckdb versions only support text output
+                analyzed = cursor.execute(f"EXPLAIN ANALYZE {_query}").fetchall()
+                operator_tree = None
+                analyzed_plan = analyzed[0][1]
+
+            return SqlQueryProfile(
+                plan="\n".join(row[1] for row in plan),
+                operator_tree=operator_tree,
+                analyzed_plan=analyzed_plan,
+                inputs=tables or {},
+            )
+
+        return self._run(run, tables=tables, query_id=query_id)
+
+    def cancel(self, query_id: str, reason: str = "cancelled") -> bool:
+        """Cancel a query that is either running, or about to run.
+
+        Returns whether there was a query to cancel.
+        """
+
+        with self._state_lock:
+            cursor = self._running.get(query_id, None)
+            if cursor is None:
+                if query_id not in self._pending:
+                    return False
+                self._cancelled[query_id] = reason
+                return True
+            self._cancelled[query_id] = reason
+            cursor.interrupt()
+
+        # an interrupt is lost if the query had not started executing yet, so we repeat it until the query stopped
+        thread = threading.Thread(
+            target=self._interrupt, args=(query_id, cursor), daemon=True
+        )
+        thread.start()
+        return True
+
+    def _run(
+        self,
+        func: typing.Callable[[typing.Any, str], typing.Any],
+        tables: typing.Optional[typing.Mapping[str, pa.Table]],
+        query_id: typing.Optional[str],
+    ) -> typing.Any:
+
+        if tables is None:
+            tables = {}
+        if query_id is None:
+            query_id = str(uuid.uuid4())
+
+        with self._state_lock:
+            self._pending.add(query_id)
+
+        try:
+            with self._lock:
+                cursor = self._connection.cursor()
+            try:
+                with self._state_lock:
+                    self._pending.discard(query_id)
+                    self._check_cancelled(query_id)
+                    self._running[query_id] = cursor
+                for relation_name, table in tables.items():
+                    cursor.register(relation_name, table)
+                return func(cursor, query_id)
+            except SqlQueryCancelled:
+                raise
+            except Exception:
+                # an interrupted query raises a duckdb exception, which we translate here
+                with self._state_lock:
+                    self._check_cancelled(query_id)
+                raise
+            finally:
+                with self._state_lock:
+                    self._running.pop(query_id, None)
+                cursor.close()
+        finally:
+            with self._state_lock:
+                self._pending.discard(query_id)
+                self._cancelled.pop(query_id, None)
+
+    def _interrupt(self, query_id: str, cursor: typing.Any) -> None:
+
+        while True:
+            time.sleep(_INTERRUPT_INTERVAL)
+            with self._state_lock:
+                # the cursor is removed before it is closed, so it is safe to use while it's still registered
+                running = self._running.get(query_id, None)
+                if running is None or running is not cursor:
+                    return
+                running.interrupt()
+
+    def _check_cancelled(self, query_id: str) -> None:
+
+        reason = self._cancelled.pop(query_id, None)
+        if reason is not None:
+            raise SqlQueryCancelled(f"Query {reason}.", reason=reason)
+
+    def _execute(
+        self, cursor: typing.Any, query: str, limit: typing.Optional[int], query_id: str
+    ) -> pa.Table:
+
+        if limit is None:
+            return fetch_arrow_table(cursor.execute(query))
+
+        try:
+            result = cursor.execute(limit_sql_query(query, limit=limit))
+        except Exception:
+            with self._state_lock:
+                self._check_cancelled(query_id)
+            # not every statement can be used as a sub-query (e.g. 'PRAGMA ...')
+            result = cursor.execute(query)
+        return fetch_arrow_table(result).slice(0, limit)
+
+
+class SqlQueryProfile(object):
+    """The execution plan and statistics of a profiled query (see 'SqlEngine.profile').
+
+    'operators' lists every operator of the executed plan (depth-first, with its depth in the plan tree), and the time
+    it took, and how many rows it produced. 'inputs' lists the row counts and sizes of all input tables, and an
+    estimate of the bytes that were scanned, based on the columns the scan operators projected. Operator statistics
+    are only available for duckdb versions that support JSON profiling output, for older ones only the (text) analyzed
+    plan is available.
+    """
+
+    def __init__(
+        self,
+        plan: str,
+        operator_tree: typing.Optional[typing.Mapping[str, typing.Any]],
+        analyzed_plan: typing.Optional[str],
+        inputs: typing.Mapping[str, pa.Table],
+    ):
+
+        self.plan: str = plan
+        self.analyzed_plan: typing.Optional[str] = analyzed_plan
+        self.operators: typing.List[typing.Dict[str, typing.Any]] = []
+        self.total_time: typing.Optional[float] = None
+        self.result_rows: typing.Optional[int] = None
+
+        self._scanned_columns: typing.Set[str] = set()
+        self._scanned_all = operator_tree is None
+        if operator_tree is not None:
+            self.total_time = operator_tree.get("latency", None)
+            self._add_operators(operator_tree.get("children", []), depth=0)
+
+        self.inputs: typing.Dict[str, typing.Dict[str, typing.Any]] = {}
+        for relation_name, table in inputs.items():
+            if self._scanned_all:
+                bytes_scanned = table.nbytes
+            else:
+                bytes_scanned = sum(
+                    column.nbytes
+                    for name, column in zip(table.column_names, table.columns)
+                    if name in self._scanned_columns
+                )
+            self.inputs[relation_name] = {
+                "rows": table.num_rows,
+                "columns": table.num_columns,
+                "bytes": table.nbytes,
+                "bytes_scanned": bytes_scanned,
+            }
+
+    @property
+    def memory_size(self) -> int:
+        """A rough estimate of the memory this profile uses (in bytes), for cache accounting."""
+
+        return (
+            sys.getsizeof(self.plan)
+            + sys.getsizeof(self.analyzed_plan)
+            + sum(sys.getsizeof(op["details"]) + 500 for op in self.operators)
+            + len(self.inputs) * 500
+        )
+
+    def _add_operators(
+        self, nodes: typing.Iterable[typing.Mapping[str, typing.Any]], depth: int
+    ) -> None:
+
+        for node in nodes:
+            # key names differ between duckdb versions
+            name = node.get("operator_name", node.get("name", ""))
+            if name.strip() == "EXPLAIN_ANALYZE":
+                self._add_operators(node.get("children", []), depth=depth)
+                continue
+
+            rows = node.get("operator_cardinality", node.get("cardinality", None))
+            if self.result_rows is None:
+                self.result_rows = rows
+            timing = node.get("operator_timing", node.get("timing", None))
+            extra_info = node.get("extra_info", {})
+            if not isinstance(extra_info, typing.Mapping):
+                extra_info = {}
+
+            self.operators.append(
+                {
+                    "depth": depth,
+                    "operator": name.strip(),
+                    "rows": rows,
+                    "time_ms": timing * 1000 if timing is not None else None,
+                    "details": "; ".join(
+                        f"{k}: {', '.join(v) if isinstance(v, list) else v}"
+                        for k, v in extra_info.items()
+                    ),
+                }
+            )
+            if name.strip().endswith("SCAN"):
+                projections = extra_info.get("Projections", None)
+                if not projections:
+                    self._scanned_all = True
+                elif isinstance(projections, str):
+                    self._scanned_columns.update(projections.split("\n"))
+                else:
+                    self._scanned_columns.update(projections)
+            self._add_operators(node.get("children", []), depth=depth + 1)
+
+
+class SqlQueryJob(object):
+    """A (sql query) function, executed in a background thread, so it doesn't block the streamlit script thread.
+
+    If a 'timeout' (in seconds) is set, the job is cancelled automatically once it's exceeded, counted from when the
+    background thread starts running the query. Cancelling a job calls the 'cancel' callback (which is expected to
+    stop the computation, e.g. via 'SqlEngine.cancel'), if provided. Without one, the computation keeps running in
+    the background, but its result is discarded.
+    """
+
+    def __init__(
+        self,
+        func: typing.Callable[[], typing.Any],
+        cancel: typing.Optional[typing.Callable[[], typing.Any]] = None,
+        timeout: typing.Optional[float] = None,
+        key: typing.Hashable = None,
+    ):
+
+        self._func: typing.Callable[[], typing.Any] = func
+        self._cancel: typing.Optional[typing.Callable[[], typing.Any]] = cancel
+        self._timeout: typing.Optional[float] = timeout
+        self.key: typing.Hashable = key
+
+        self._lock = threading.Lock()
+        self._finished = threading.Event()
+        self._thread: typing.Optional[threading.Thread] = None
+        self._timer: typing.Optional[threading.Timer] = None
+        self._started: typing.Optional[float] = None
+        self._ended: typing.Optional[float] = None
+        self._result: typing.Any = None
+        self._error: typing.Optional[Exception] = None
+
+    def start(self) -> "SqlQueryJob":
+
+        with self._lock:
+            if self._thread is not None:
+                raise Exception("Job already started.")
+            self._started = time.perf_counter()
+            self._thread = threading.Thread(target=self._run, daemon=True)
+            self._thread.start()
+        return self
+
+    @property
+    def done(self) -> bool:
+        return self._finished.is_set()
+
+    @property
+    def elapsed(self) -> float:
+        """The runtime of this job (so far), in seconds."""
+
+        if self._started is None:
+            return 0.0
+        end = self._ended if self._ended is not None else time.perf_counter()
+        return end - self._started
+
+    @property
+    def error(self) -> typing.Optional[Exception]:
+        return self._error
+
+    def wait(self, timeout: typing.Optional[float] = None) -> bool:
+        """Wait for the job to finish, return whether it did."""
+
+        return self._finished.wait(timeout=timeout)
+
+    def result(self) -> typing.Any:
+        """Return the result of this job, or raise the exception it failed with."""
+
+        if not self.done:
+            raise Exception("Job not finished yet.")
+        if self._error is not None:
+            raise self._error
+        return self._result
+
+    def cancel(self, reason: str = "cancelled") -> None:
+
+        with self._lock:
+            if self.done:
+                return
+            self._finish(
+                error=SqlQueryCancelled(
+                    f"Query {reason} after {self.elapsed:.1f} seconds.", reason=reason
+                )
+            )
+        if self._cancel is not None:
+            try:
+                self._cancel()
+            except Exception as e:
+                log.debug(f"Error cancelling query: {e}")
+
+    def _run(self) -> None:
+
+        # the timeout only starts once the query is about to run (not when the job is submitted)
+        with self._lock:
+            if self.done:
+                return
+            if self._timeout:
+                self._timer = threading.Timer(
+                    self._timeout, self.cancel, kwargs={"reason": "timed out"}
+                )
+                self._timer.daemon = True
+                self._timer.start()
+
+        try:
+            result = self._func()
+            error = None
+        except Exception as e:
+            result = None
+            error = e
+
+        with self._lock:
+            # if the job was cancelled already, the outcome is discarded
+            if not self.done:
+                self._finish(result=result, error=error)
+
+    def _finish(
+        self, result: typing.Any = None, error: typing.Optional[Exception] = None
+    ) -> None:
+
+        self._ended = time.perf_counter()
+        self._result = result
+        self._error = error
+        if self._timer is not None:
+            self._timer.cancel()
+        self._finished.set()
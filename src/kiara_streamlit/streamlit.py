@@ -1,23 +1,98 @@
 # -*- coding: utf-8 -*-
 import atexit
 import copy
+import importlib
+import logging
 import os
 import shutil
 import typing
 import uuid
-from functools import partial
 
 import streamlit as st
 from kiara import Kiara
 from kiara.config import KiaraConfig
 
-from kiara_streamlit.components.mgmt import AllComponentsMixin, ComponentMgmt
+from kiara_streamlit.caching import LRUCache, SharedValueCache
+from kiara_streamlit.components.mgmt import ComponentMgmt, KiaraComponents
+from kiara_streamlit.context import KiaraContextPool, SharedKiaraContext
 from kiara_streamlit.defaults import (
     EXAMPLE_BASE_DIR,
     ONBOARD_MAKER_KEY,
+    SHARED_VALUE_CACHE_MAX_BYTES,
+    VALUE_CACHE_MAX_BYTES,
     kiara_stremalit_app_dirs,
 )
 
+log = logging.getLogger("kiara.streamlit")
+
+
+# where streamlit keeps the script run context (with the session id), depending on its version (newest first)
+_SCRIPT_RUN_CTX_FUNCS = (
+    ("streamlit.runtime.scriptrunner", "get_script_run_ctx"),
+    ("streamlit.scriptrunner", "get_script_run_ctx"),
+    ("streamlit.script_run_context", "get_script_run_ctx"),
+    ("streamlit.report_thread", "get_report_ctx"),
+)
+
+_UNTRACKED_SESSION_ID = "__untracked_session__"
+"""The session id that is used for the shared value cache if sessions can't be tracked."""
+
+_session_tracking_warned = False
+
+
+def _import_attribute(module_name: str, attr_name: str) -> typing.Any:
+
+    try:
+        module = importlib.import_module(module_name)
+    except ImportError:
+        return None
+    return getattr(module, attr_name, None)
+
+
+def get_session_id() -> typing.Optional[str]:
+    """Return the id of the current streamlit session, or 'None' if not running within a streamlit server."""
+
+    for module_name, func_name in _SCRIPT_RUN_CTX_FUNCS:
+        func = _import_attribute(module_name, func_name)
+        if func is not None:
+            ctx = func()
+            return getattr(ctx, "session_id", None) if ctx is not None else None
+    return None
+
+
+def get_active_session_ids() -> typing.Optional[typing.Iterable[str]]:
+    """Return the ids of all sessions that are connected to the streamlit server, or 'None' if that is not possible."""
+
+    try:
+        # newer streamlit versions
+        runtime_cls = _import_attribute("streamlit.runtime", "Runtime")
+        if runtime_cls is not None and runtime_cls.exists():
+            runtime = runtime_cls.instance()
+            session_mgr = getattr(runtime, "_session_mgr", None)
+            if session_mgr is not None:
+                return [s.session.id for s in session_mgr.list_active_sessions()]
+            return list(runtime._session_info_by_id.keys())
+
+        # older ones
+        server_cls = _import_attribute("streamlit.server.server", "Server")
+        if server_cls is not None:
+            return list(server_cls.get_current()._session_info_by_id.keys())
+    except Exception as e:
+        log.debug(f"Can't list active streamlit sessions: {e}")
+    return None
+
+
+def _warn_session_tracking_unavailable() -> None:
+
+    global _session_tracking_warned
+    if _session_tracking_warned:
+        return
+    _session_tracking_warned = True
+    log.warning(
+        f"Can't track streamlit sessions with this streamlit version ({st.__version__}): entries of the value cache "
+        "that is shared between sessions are not released when sessions end, it only evicts least recently used ones."
+    )
+
 
 class KiaraStreamlit(object):
     def __init__(
@@ -25,6 +100,10 @@ class KiaraStreamlit(object):
         kiara_config: typing.Union[
             None, KiaraConfig, typing.Mapping[str, typing.Any]
         ] = None,
+        shared_context: bool = False,
+        context_pool_size: int = 0,
+        value_cache_size: int = VALUE_CACHE_MAX_BYTES,
+        shared_value_cache_size: int = SHARED_VALUE_CACHE_MAX_BYTES,
     ):
 
         if not kiara_config:
@@ -38,6 +117,23 @@ class KiaraStreamlit(object):
 
         self._kiara_config: KiaraConfig = kiara_config
 
+        self._shared_context: typing.Optional[SharedKiaraContext] = None
+        if shared_context:
+            self._shared_context = SharedKiaraContext(kiara_config=self._kiara_config)
+
+        self._context_pool: typing.Optional[KiaraContextPool] = None
+        if context_pool_size > 0 and not shared_context:
+            self._context_pool = KiaraContextPool(
+                kiara_config=self._kiara_config, size=context_pool_size
+            )
+
+        self._value_cache_size: int = value_cache_size
+        self._shared_value_cache: typing.Optional[SharedValueCache] = None
+        if shared_value_cache_size > 0:
+            self._shared_value_cache = SharedValueCache(
+                max_bytes=shared_value_cache_size
+            )
+
         self._component_mgmt = ComponentMgmt(example_base_dir=EXAMPLE_BASE_DIR)
 
         self._avail_kiara_methods: typing.Set[str] = set((x for x in dir(Kiara)))
@@ -69,23 +165,74 @@ class KiaraStreamlit(object):
 
         return AttributeError(f"Kiara context object does not have attribute '{item}'.")
 
+    @property
+    def uses_shared_context(self) -> bool:
+        return self._shared_context is not None
+
     @property
     def kiara(self) -> Kiara:
 
+        if self._shared_context is not None:
+            return self._shared_context.kiara
+
         if "__kiara__" not in st.session_state.keys():
-            kiara = Kiara(config=self._kiara_config.copy())
+            if self._context_pool is not None:
+                kiara = self._context_pool.get_context()
+            else:
+                kiara = Kiara(config=self._kiara_config.copy())
             print(f"KIARA CREATED: {kiara._id}")
             st.session_state["__kiara__"] = kiara
         return st.session_state.__kiara__
 
     @property
-    def components(self) -> AllComponentsMixin:
+    def context_pool_stats(self) -> typing.Optional[typing.Mapping[str, typing.Any]]:
+        """Return usage statistics of the kiara context pool, or 'None' if no pool is used."""
 
-        if "__kiara_components__" not in st.session_state.keys():
-            comps = AllComponentsMixin(temp_dir=self._temp_dir)
+        if self._context_pool is None:
+            return None
+        return self._context_pool.stats
+
+    @property
+    def value_cache_stats(self) -> typing.Mapping[str, typing.Any]:
+        """Return usage statistics of the value cache of the current session."""
+
+        return self.components.value_cache.stats
+
+    @property
+    def shared_value_cache_stats(
+        self,
+    ) -> typing.Optional[typing.Mapping[str, typing.Any]]:
+        """Return usage statistics of the value cache that is shared between sessions, or 'None' if it is disabled."""
+
+        if self._shared_value_cache is None:
+            return None
+        return self._shared_value_cache.stats
+
+    @property
+    def components(self) -> KiaraComponents:
+
+        comps = st.session_state.get("__kiara_components__", None)
+        if comps is None:
+            session_id = get_session_id()
+            if self._shared_value_cache is not None:
+                # a new session is a good point in time to release the shared cache entries of the ones that ended
+                active = get_active_session_ids()
+                if active is not None and session_id is not None:
+                    self._shared_value_cache.release_inactive_sessions(active)
+                else:
+                    # all sessions share one id, so untracked sessions don't pile up in the cache
+                    _warn_session_tracking_unavailable()
+                    session_id = _UNTRACKED_SESSION_ID
+            comps = KiaraComponents(
+                component_mgmt=self._component_mgmt,
+                temp_dir=self._temp_dir,
+                value_cache=LRUCache(max_bytes=self._value_cache_size),
+                shared_value_cache=self._shared_value_cache,
+                session_id=session_id,
+            )
             comps._kiara = self.kiara
             st.session_state["__kiara_components__"] = comps
-        return st.session_state.__kiara_components__
+        return comps
 
     def wants_onboarding(self) -> bool:
         onboarding = st.session_state.get(ONBOARD_MAKER_KEY, None)
@@ -97,10 +244,9 @@ class KiaraStreamlit(object):
 
     def _get_component(self, component_name) -> typing.Callable:
 
-        ga_func = self._component_mgmt.get_component(component_name)
-        comp_func = partial(ga_func, self.components)
-
-        return comp_func
+        # bound components are cached on the (session-specific) components object, which means the cache is
+        # invalidated automatically whenever that object is replaced
+        return self.components.get_component(component_name)
 
     def __dir__(self) -> typing.Iterable[str]:
 
@@ -0,0 +1,174 @@
+# -*- coding: utf-8 -*-
+import typing
+
+import pyarrow as pa
+import pyarrow.compute as pc
+
+
+def project_columns(
+    table: pa.Table, columns: typing.Optional[typing.Iterable[str]] = None
+) -> pa.Table:
+    """Select a subset of columns (in the provided order), without copying any data.
+
+    Column names that don't exist in the table are ignored.
+    """
+
+    if not columns:
+        return table
+
+    names = set(table.column_names)
+    return table.select([c for c in columns if c in names])
+
+
+def truncate_strings(
+    table: pa.Table,
+    max_str_len: typing.Union[None, int, typing.Mapping[str, int]] = None,
+) -> pa.Table:
+    """Truncate the values of string columns to a maximum length.
+
+    'max_str_len' can either be a single number (which applies to all string columns), or a mapping of column name to max
+    length. Truncated values get a '…' appended.
+    """
+
+    if not max_str_len:
+        return table
+
+    for idx, field in enumerate(table.schema):
+        if not (pa.types.is_string(field.type) or pa.types.is_large_string(field.type)):
+            continue
+
+        if isinstance(max_str_len, typing.Mapping):
+            max_len = max_str_len.get(field.name, None)
+            if not max_len:
+                continue
+        else:
+            max_len = max_str_len
+
+        column = table.column(idx)
+        too_long = pc.greater(pc.utf8_length(column), max_len)
+        if not pc.any(too_long).as_py():
+            continue
+
+        truncated = pc.binary_join_element_wise(
+            pc.utf8_slice_codeunits(column, 0, max_len), "…", ""
+        )
+        column = pc.if_else(too_long, truncated, column)
+        table = table.set_column(idx, field, column)
+
+    return table
+
+
+def elide_binary_columns(table: pa.Table) -> pa.Table:
+    """Replace binary columns with the lengths (in bytes) of their values.
+
+    The replaced columns are renamed to '<column_name> (bytes)'.
+    """
+
+    for idx, field in enumerate(table.schema):
+        if not (
+            pa.types.is_binary(field.type)
+            or pa.types.is_large_binary(field.type)
+            or pa.types.is_fixed_size_binary(field.type)
+        ):
+            continue
+
+        lengths = pc.binary_length(table.column(idx))
+        table = table.set_column(
+            idx, pa.field(f"{field.name} (bytes)", lengths.type), lengths
+        )
+
+    return table
+
+
+def prepare_table_window(
+    table: pa.Table,
+    offset: int = 0,
+    length: typing.Optional[int] = None,
+    columns: typing.Optional[typing.Iterable[str]] = None,
+    max_str_len: typing.Union[None, int, typing.Mapping[str, int]] = None,
+    elide_binary: bool = False,
+) -> pa.Table:
+    """Prepare a part of a table for display.
+
+    Column projection and slicing are zero-copy. String truncation and binary elision are only computed for the rows
+    of the resulting window, so the cost of this does not depend on the size of the full table.
+    """
+
+    table = project_columns(table, columns=columns)
+    window = table.slice(offset, length)
+    window = truncate_strings(window, max_str_len=max_str_len)
+    if elide_binary:
+        window = elide_binary_columns(window)
+    return window
+
+
+def sample_table(
+    table: typing.Union[pa.Table, pa.Array, pa.ChunkedArray],
+    method: str = "random",
+    size: float = 10,
+    seed: typing.Optional[int] = None,
+    stratify_by: typing.Optional[str] = None,
+) -> typing.Union[pa.Table, pa.Array, pa.ChunkedArray]:
+    """Sample a percentage ('size', 0-100) of the rows of a table (or the items of an array).
+
+    Supported methods:
+
+    - 'head': the first rows (zero-copy)
+    - 'random': randomly selected rows, in their original order
+    - 'stratified': randomly selected rows, the same percentage of every group of equal values in column 'stratify_by'
+      (tables only)
+
+    Only the selected rows are copied. If a 'seed' is provided, the result for a table is always the same.
+    """
+
+    import numpy as np
+
+    if size < 0 or size > 100:
+        raise ValueError(f"Invalid sample size '{size}': must be between 0 and 100.")
+
+    num_rows = len(table)
+    sample_rows = int(round(num_rows * size / 100))
+
+    if method == "head":
+        return table.slice(0, sample_rows)
+
+    rng = np.random.default_rng(seed)
+
+    if method == "random":
+        indices = rng.choice(num_rows, size=sample_rows, replace=False)
+        indices.sort()
+    elif method == "stratified":
+        if not isinstance(table, pa.Table):
+            raise ValueError("Stratified sampling is only supported for tables.")
+        if not stratify_by:
+            raise ValueError("Stratified sampling needs a column to stratify by.")
+
+        # all chunks need to share the same dictionary, so the group codes are comparable
+        column = table.column(stratify_by)
+        if pa.types.is_dictionary(column.type):
+            column = column.unify_dictionaries()
+        else:
+            column = pc.dictionary_encode(column)
+        codes = np.concatenate(
+            [
+                chunk.indices.fill_null(-1).to_numpy(zero_copy_only=False)
+                for chunk in column.chunks
+            ]
+            or [np.empty(0, dtype=np.int64)]
+        ).astype(np.int64)
+
+        # sort rows by group, and randomly within each group, then take the first rows of every group
+        order = np.lexsort((rng.random(num_rows), codes))
+        _, starts, counts = np.unique(
+            codes[order], return_index=True, return_counts=True
+        )
+        take = np.round(counts * size / 100).astype(np.int64)
+        positions = np.arange(num_rows) - np.repeat(starts, counts)
+        indices = order[positions < np.repeat(take, counts)]
+        indices.sort()
+    else:
+        raise ValueError(
+            f"Invalid sample method '{method}', available: head, random, stratified."
+        )
+
+    return table.take(pa.array(indices, type=pa.int64()))
@@ -1,10 +1,34 @@
 #!/usr/bin/env python
 # -*- coding: utf-8 -*-
 """
-    Dummy conftest.py for kiara_modules.language_processing.
+Dummy conftest.py for kiara_modules.language_processing.
 
-    If you don't know what this is for, just leave it empty.
-    Read more about conftest.py under:
-    https://pytest.org/latest/plugins.html
+If you don't know what this is for, just leave it empty.
+Read more about conftest.py under:
+https://pytest.org/latest/plugins.html
 """
-# import pytest
+
+import pytest
+import streamlit as st
+
+from kiara_streamlit.streamlit import KiaraStreamlit
+
+
+class DummySessionState(dict):
+    """A session state that (unlike the real one) works without 'streamlit run'."""
+
+    def __getattr__(self, item):
+        try:
+            return self[item]
+        except KeyError:
+            raise AttributeError(item)
+
+
+@pytest.fixture
+def st_kiara(monkeypatch) -> KiaraStreamlit:
+    """Attach a kiara streamlit context to 'st.kiara', like 'kiara_streamlit.init' does."""
+
+    monkeypatch.setattr(st, "session_state", DummySessionState(), raising=False)
+    ktx = KiaraStreamlit(shared_value_cache_size=0)
+    monkeypatch.setattr(st, "kiara", ktx, raising=False)
+    return ktx
@@ -0,0 +1,146 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""Tests for `kiara_streamlit.caching`."""
+
+import pyarrow as pa
+import pytest
+
+from kiara_streamlit.caching import LRUCache, SharedValueCache, estimate_size
+
+
+def test_estimate_size():
+
+    table = pa.table({"a": list(range(1000))})
+    assert estimate_size(table) == table.nbytes
+    assert estimate_size(table.to_pandas()) >= 8000
+
+
+def test_estimate_size_graph():
+
+    nx = pytest.importorskip("networkx")
+
+    graph = nx.path_graph(1000)
+    # a lot more than the (shallow) size of the graph object itself
+    assert estimate_size(graph) > 100000
+
+
+def test_lru_cache_unknown_size():
+
+    cache = LRUCache(max_bytes=1000000)
+
+    # containers would only be counted shallowly, so they are not cached without an explicit size
+    assert estimate_size({"a": list(range(1000))}) is None
+    assert not cache.put("a", {"a": list(range(1000))})
+    assert "a" not in cache
+    assert cache.put("a", {"a": list(range(1000))}, size=10000)
+
+
+def test_lru_cache_eviction():
+
+    cache = LRUCache(max_bytes=100)
+
+    assert cache.put("a", "a", size=40)
+    assert cache.put("b", "b", size=40)
+    # 'a' is now the most recently used item
+    assert cache.get("a") == "a"
+    assert cache.put("c", "c", size=40)
+
+    assert "a" in cache
+    assert "b" not in cache
+    assert "c" in cache
+    assert cache.stats["size"] == 80
+    assert cache.stats["evictions"] == 1
+
+
+def test_lru_cache_item_too_large():
+
+    cache = LRUCache(max_bytes=100)
+    cache.put("a", "a", size=40)
+
+    assert not cache.put("b", "b", size=101)
+    assert "b" not in cache
+    # nothing was evicted for it
+    assert "a" in cache
+
+
+def test_lru_cache_replace():
+
+    cache = LRUCache(max_bytes=100)
+    cache.put("a", "a", size=40)
+    cache.put("a", "aa", size=60)
+
+    assert cache.get("a") == "aa"
+    assert len(cache) == 1
+    assert cache.stats["size"] == 60
+
+
+def test_lru_cache_get_or_create():
+
+    cache = LRUCache(max_bytes=100)
+    created = []
+
+    def create():
+        created.append(True)
+        return "item"
+
+    assert cache.get_or_create("a", create, size=lambda x: 10) == "item"
+    assert cache.get_or_create("a", create, size=lambda x: 10) == "item"
+    assert len(created) == 1
+
+    stats = cache.stats
+    assert stats["hits"] == 1
+    assert stats["misses"] == 1
+
+
+def test_lru_cache_invalid_size():
+
+    with pytest.raises(ValueError):
+        LRUCache(max_bytes=-1)
+
+
+def test_shared_value_cache_only_arrow_data():
+
+    cache = SharedValueCache(max_bytes=1000)
+    session_id = cache.register_session()
+
+    assert not cache.put("value_1", {"a": 1}, session_id=session_id)
+    assert cache.put("value_2", pa.array([1, 2, 3]), session_id=session_id)
+    assert "value_1" not in cache
+    assert cache.get("value_2", session_id=session_id).to_pylist() == [1, 2, 3]
+
+
+def test_shared_value_cache_evicts_unused_first():
+
+    cache = SharedValueCache(max_bytes=100)
+    session_1 = cache.register_session("session_1")
+    session_2 = cache.register_session("session_2")
+
+    data = pa.array([1])
+    cache.put("value_1", data, session_id=session_1, size=40)
+    cache.put("value_2", data, session_id=session_2, size=40)
+    cache.release_session(session_2)
+    assert cache.stats["items_in_use"] == 1
+
+    # 'value_1' is the least recently used entry, but still in use
+    cache.put("value_3", data, session_id=session_1, size=40)
+    assert "value_1" in cache
+    assert "value_2" not in cache
+    assert "value_3" in cache
+
+    # if there are no unused entries anymore, the least recently used ones are evicted
+    cache.put("value_4", data, session_id=session_1, size=40)
+    assert "value_1" not in cache
+    assert cache.stats["size"] == 80
+
+
+def test_shared_value_cache_release_inactive_sessions():
+
+    cache = SharedValueCache(max_bytes=100)
+    for session_id in ["session_1", "session_2", "session_3"]:
+        cache.register_session(session_id)
+        cache.put(session_id, pa.array([1]), session_id=session_id, size=10)
+
+    assert cache.release_inactive_sessions(["session_2"]) == 2
+    assert cache.stats["sessions"] == 1
+    assert cache.stats["items_in_use"] == 1
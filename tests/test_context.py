@@ -0,0 +1,48 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""Tests for `kiara_streamlit.context`."""
+
+import streamlit as st
+
+import kiara_streamlit.streamlit
+
+from kiara_streamlit.streamlit import _UNTRACKED_SESSION_ID, KiaraStreamlit
+
+
+def test_shared_context_write_lock(st_kiara, monkeypatch):
+
+    ktx = KiaraStreamlit(shared_context=True, shared_value_cache_size=0)
+
+    components_1 = ktx.components
+    # a new session
+    monkeypatch.setattr(st, "session_state", type(st.session_state)())
+    components_2 = ktx.components
+
+    assert components_1 is not components_2
+    assert components_1.kiara is components_2.kiara
+    assert components_1.write_lock is components_2.write_lock
+    # the lock is re-entrant, so components can call each other while holding it
+    with components_1.write_lock:
+        with components_2.write_lock:
+            pass
+
+    # a new session, with a context of its own
+    monkeypatch.setattr(st, "session_state", type(st.session_state)())
+    assert st_kiara.components.write_lock is not components_1.write_lock
+
+
+def test_untracked_sessions_share_cache_session(st_kiara, monkeypatch):
+
+    ktx = KiaraStreamlit(shared_value_cache_size=1024 * 1024)
+
+    # outside of a streamlit server, sessions can't be tracked (or released)
+    assert kiara_streamlit.streamlit.get_session_id() is None
+    components_1 = ktx.components
+    monkeypatch.setattr(st, "session_state", type(st.session_state)())
+    components_2 = ktx.components
+
+    assert components_1 is not components_2
+    # so they all use the same session in the shared cache, instead of leaking one per session
+    assert components_1._shared_value_cache_session == _UNTRACKED_SESSION_ID
+    assert components_2._shared_value_cache_session == _UNTRACKED_SESSION_ID
@@ -0,0 +1,58 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""Tests for `kiara_streamlit.data_index`."""
+
+from kiara_streamlit.data_index import AliasIndex
+
+
+class DummyDataStore(object):
+    def __init__(self, alias_types):
+
+        self.alias_types = alias_types
+
+    @property
+    def alias_names(self):
+        return list(self.alias_types.keys())
+
+
+def create_index(alias_types) -> AliasIndex:
+
+    data_store = DummyDataStore(alias_types)
+    index = AliasIndex(data_store=data_store)  # type: ignore
+    index._lookup_alias_type = lambda alias: data_store.alias_types.get(alias)  # type: ignore
+    return index
+
+
+def test_alias_index_rescan():
+
+    index = create_index({"b": "table", "a": "table", "c": "array"})
+
+    assert index.get_aliases() == ("a", "b", "c")
+    assert index.get_aliases("table") == ("a", "b")
+    assert list(index.value_types) == ["array", "table"]
+
+    arrays = index.get_aliases("array")
+    index._data_store.alias_types = {"a": "table", "c": "array", "d": "table"}
+    index.rescan()
+    assert index.get_aliases() == ("a", "c", "d")
+    assert index.get_aliases("table") == ("a", "d")
+    # unchanged value types keep their alias sequence
+    assert index.get_aliases("array") is arrays
+
+
+def test_alias_index_search():
+
+    index = create_index(
+        {
+            alias: "table"
+            for alias in ["my_network", "network_2", "Network", "nodes", "other"]
+        }
+    )
+
+    # prefix matches first, then substring matches, then in-order characters
+    assert index.search("network") == ("Network", "network_2", "my_network")
+    assert index.search("ntwk") == ("Network", "my_network", "network_2")
+    assert index.search("xyz") == ()
+    assert index.search("") == index.get_aliases()
+    assert index.search("nodes", value_type="array") == ()
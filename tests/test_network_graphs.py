@@ -0,0 +1,188 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""Tests for `kiara_streamlit.network_graphs`."""
+
+import json
+
+import numpy as np
+import pytest
+
+from kiara_streamlit.network_graphs import (
+    GraphEdgeList,
+    GraphPayload,
+    ReducedGraph,
+    spring_layout,
+)
+
+
+def create_edge_list(edges) -> GraphEdgeList:
+
+    node_ids = sorted(set(n for edge in edges for n in edge))
+    index = {node_id: idx for idx, node_id in enumerate(node_ids)}
+    return GraphEdgeList(
+        node_ids=np.array(node_ids, dtype=object),
+        sources=np.array([index[s] for s, _ in edges], dtype=np.int64),
+        targets=np.array([index[t] for _, t in edges], dtype=np.int64),
+    )
+
+
+def test_edge_list_from_graph():
+
+    nx = pytest.importorskip("networkx")
+
+    graph = nx.Graph()
+    graph.add_node("isolated")
+    graph.add_edges_from([("a", "b"), ("b", 1), (1, ("c", 2))])
+    edge_list = GraphEdgeList.from_graph(graph)
+
+    # isolated nodes are not included, node ids are converted to strings
+    assert sorted(edge_list.node_ids.tolist()) == ["('c', 2)", "1", "a", "b"]
+    assert edge_list.num_nodes == 4
+    assert edge_list.num_edges == 3
+    edges = {
+        frozenset((edge_list.node_ids[s], edge_list.node_ids[t]))
+        for s, t in zip(edge_list.sources, edge_list.targets)
+    }
+    assert edges == {
+        frozenset(("a", "b")),
+        frozenset(("b", "1")),
+        frozenset(("1", "('c', 2)")),
+    }
+
+
+@pytest.mark.parametrize("with_positions", [False, True])
+def test_graph_payload_size(with_positions):
+
+    edge_list = create_edge_list(
+        [("a", "bb"), ("bb", "ccc"), ("ccc", "a"), ("ccc", "dddd"), ("dddd", "dddd")]
+    )
+    positions = spring_layout(edge_list, seed=1) if with_positions else None
+    payload = GraphPayload(edge_list, positions=positions)
+
+    assert payload.num_nodes == 4
+    assert payload.num_links == 5
+    assert payload.size == len(json.dumps(payload.data, separators=(",", ":")))
+
+
+def test_connected_components():
+
+    edge_list = create_edge_list(
+        [("a", "b"), ("c", "d"), ("d", "e"), ("f", "e"), ("b", "g"), ("h", "h")]
+    )
+    labels = dict(zip(edge_list.node_ids.tolist(), edge_list.connected_components()))
+
+    assert labels["a"] == labels["b"] == labels["g"]
+    assert labels["c"] == labels["d"] == labels["e"] == labels["f"]
+    assert len({labels["a"], labels["c"], labels["h"]}) == 3
+
+
+def test_connected_components_long_path():
+
+    # labels have to travel along the whole path
+    edges = [(f"n_{i:03}", f"n_{i + 1:03}") for i in range(200)]
+    edge_list = create_edge_list(edges[::-1])
+    assert set(edge_list.connected_components().tolist()) == {0}
+
+
+def test_k_core():
+
+    # a 4-clique, with a triangle attached to it, and a tail
+    edges = [(a, b) for a in "abcd" for b in "abcd" if a < b]
+    edges.extend([("d", "e"), ("e", "f"), ("f", "d"), ("f", "g"), ("g", "g")])
+    edge_list = create_edge_list(edges)
+
+    def core(k):
+        return set(edge_list.node_ids[edge_list.k_core(k)].tolist())
+
+    assert core(1) == set("abcdefg")
+    assert core(2) == set("abcdef")
+    assert core(3) == set("abcd")
+    assert core(4) == set()
+
+
+def test_reduce_not_needed():
+
+    edge_list = create_edge_list([("a", "b"), ("b", "c")])
+
+    for max_nodes in [None, 3, 10]:
+        reduced = ReducedGraph(edge_list, max_nodes=max_nodes)
+        assert not reduced.is_reduced
+        assert reduced.edge_list is edge_list
+        assert reduced.describe() == "3 nodes, 2 links"
+
+    with pytest.raises(ValueError):
+        ReducedGraph(edge_list, max_nodes=2, method="random")
+
+
+def test_reduce_top_degree():
+
+    edges = [("hub", f"leaf_{i}") for i in range(10)]
+    edges.extend([("leaf_0", "leaf_1"), ("leaf_1", "leaf_2")])
+    edge_list = create_edge_list(edges)
+
+    reduced = ReducedGraph(edge_list, max_nodes=2, method="top_degree")
+    assert reduced.is_reduced
+    assert set(reduced.edge_list.node_ids.tolist()) == {"hub", "leaf_1"}
+    assert reduced.edge_list.num_edges == 1
+    assert reduced.describe() == (
+        "Showing 2 of 11 nodes (18.2%) and 1 of 12 links (8.3%), reduced to: top 2 nodes by degree"
+    )
+
+
+def test_reduce_k_core():
+
+    # a 4-clique, with a triangle attached to it, and a long tail
+    edges = [(a, b) for a in "abcd" for b in "abcd" if a < b]
+    edges.extend([("d", "e"), ("e", "f"), ("f", "d")])
+    edges.extend((f"t_{i}", f"t_{i + 1}") for i in range(10))
+    edges.append(("f", "t_0"))
+    edge_list = create_edge_list(edges)
+
+    reduced = ReducedGraph(edge_list, max_nodes=6, method="k_core")
+    assert set(reduced.edge_list.node_ids.tolist()) == set("abcdef")
+    assert reduced.details == "2-core"
+
+    reduced = ReducedGraph(edge_list, max_nodes=4, method="k_core")
+    assert set(reduced.edge_list.node_ids.tolist()) == set("abcd")
+    assert reduced.details == "3-core"
+
+    # even the densest core is too large
+    reduced = ReducedGraph(edge_list, max_nodes=2, method="k_core")
+    assert reduced.edge_list.num_nodes == 2
+    assert reduced.details == "3-core, top 2 nodes by degree"
+
+
+def test_reduce_components_keeps_largest():
+
+    # a star with 50 leaves, and 20 fragments with 2 nodes each
+    edges = [("hub", f"leaf_{i}") for i in range(50)]
+    edges.extend((f"a_{i}", f"b_{i}") for i in range(20))
+    edge_list = create_edge_list(edges)
+
+    reduced = ReducedGraph(edge_list, max_nodes=10, method="components", seed=1)
+    node_ids = set(reduced.edge_list.node_ids.tolist())
+    assert reduced.edge_list.num_nodes == 10
+    assert "hub" in node_ids
+    assert all(n == "hub" or n.startswith("leaf_") for n in node_ids)
+
+    # the largest component fits, the rest is filled up with other components
+    reduced = ReducedGraph(edge_list, max_nodes=60, method="components", seed=1)
+    node_ids = set(reduced.edge_list.node_ids.tolist())
+    assert reduced.edge_list.num_nodes == 59
+    assert "hub" in node_ids
+    assert len([n for n in node_ids if n.startswith("a_")]) == 4
+
+
+def test_spring_layout():
+
+    edge_list = create_edge_list([("a", "b"), ("b", "c"), ("c", "a"), ("c", "d")])
+
+    positions = spring_layout(edge_list, seed=1, scale=100)
+    assert positions.shape == (4, 2)
+    assert np.abs(positions).max() == pytest.approx(100)
+    assert np.array_equal(positions, spring_layout(edge_list, seed=1, scale=100))
+
+    # the layout needs memory quadratic in the number of nodes, so large graphs are refused
+    with pytest.raises(ValueError):
+        spring_layout(edge_list, max_nodes=3)
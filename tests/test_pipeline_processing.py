@@ -0,0 +1,336 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""Tests for `kiara_streamlit.pipeline_processing`."""
+
+import datetime
+import threading
+import uuid
+
+import pytest
+from kiara.pipeline.controller.batch import BatchControllerManual
+from kiara.processing import JobStatus
+from kiara.processing.parallel import ThreadPoolProcessor
+from kiara.processing.synchronous import SynchronousProcessor
+
+from kiara_streamlit.pipeline_processing import (
+    CachedJobId,
+    MemoizingBatchController,
+    StageProcessingJob,
+    create_module_processor,
+    get_processor_max_workers,
+    get_stage_runtimes,
+    get_step_fingerprint,
+    get_value_fingerprint,
+    set_pipeline_max_workers,
+)
+
+
+class DummyHash(object):
+    def __init__(self, hash_type, hash):
+
+        self.hash_type = hash_type
+        self.hash = hash
+
+
+class DummyValue(object):
+    def __init__(self, hashes=None, is_set=True):
+
+        self.id = str(uuid.uuid4())
+        self.is_set = is_set
+        self._hashes = hashes
+
+    def get_hashes(self):
+
+        if self._hashes is None:
+            raise Exception("Can't hash this type.")
+        return self._hashes
+
+
+class DummyStep(object):
+    def __init__(self, module_type, module_config):
+
+        self.module_type = module_type
+        self.module_config = module_config
+
+
+class DummyOutputs(object):
+    def items_are_valid(self):
+        return True
+
+
+class DummyJob(object):
+
+    status = JobStatus.SUCCESS
+
+
+def create_controller(controller, steps, inputs):
+
+    controller.get_step = lambda step_id: steps[step_id]
+    controller.get_step_inputs = lambda step_id: inputs[step_id]
+    controller.get_step_outputs = lambda step_id: DummyOutputs()
+    controller.get_job_details = lambda job_id: DummyJob()
+    return controller
+
+
+def test_get_value_fingerprint():
+
+    value = DummyValue(hashes=[DummyHash("sha3", "b"), DummyHash("md5", "a")])
+    assert get_value_fingerprint(value) == "md5:a"
+
+    value = DummyValue()
+    assert get_value_fingerprint(value) == f"id:{value.id}"
+
+    assert get_value_fingerprint(DummyValue(is_set=False)) == "__not_set__"
+
+
+def test_get_step_fingerprint():
+
+    steps = {"step": DummyStep("table.cut_column", {"constants": {"a": 1}})}
+    inputs = {
+        "step": {
+            "table": DummyValue(hashes=[DummyHash("md5", "a")]),
+            "column": DummyValue(hashes=[DummyHash("md5", "b")]),
+        }
+    }
+    controller = create_controller(object.__new__(BatchControllerManual), steps, inputs)
+    fingerprint = get_step_fingerprint(controller, "step")
+
+    # same data, different value objects
+    inputs["step"] = {
+        "column": DummyValue(hashes=[DummyHash("md5", "b")]),
+        "table": DummyValue(hashes=[DummyHash("md5", "a")]),
+    }
+    assert get_step_fingerprint(controller, "step") == fingerprint
+
+    inputs["step"]["column"] = DummyValue(hashes=[DummyHash("md5", "c")])
+    assert get_step_fingerprint(controller, "step") != fingerprint
+
+    inputs["step"]["column"] = DummyValue(hashes=[DummyHash("md5", "b")])
+    steps["step"] = DummyStep("table.cut_column", {"constants": {"a": 2}})
+    assert get_step_fingerprint(controller, "step") != fingerprint
+
+
+def test_memoizing_batch_controller(monkeypatch):
+
+    processed = []
+
+    def process_step(self, step_id, raise_exception=False, wait=False):
+        processed.append(step_id)
+        return f"job_{len(processed)}"
+
+    monkeypatch.setattr(BatchControllerManual, "process_step", process_step)
+
+    steps = {"step": DummyStep("table.cut_column", {})}
+    inputs = {"step": {"table": DummyValue(hashes=[DummyHash("md5", "a")])}}
+    controller = create_controller(
+        object.__new__(MemoizingBatchController), steps, inputs
+    )
+    controller._step_memo = {}
+
+    assert controller.process_step("step") == "job_1"
+    job_id = controller.process_step("step")
+    assert isinstance(job_id, CachedJobId)
+    assert job_id == "job_1"
+    assert processed == ["step"]
+
+    inputs["step"] = {"table": DummyValue(hashes=[DummyHash("md5", "b")])}
+    assert controller.process_step("step") == "job_2"
+    assert processed == ["step", "step"]
+
+
+class DummyJobLog(object):
+    def __init__(self, percent_finished=0):
+
+        self.percent_finished = percent_finished
+
+
+class DummyStepJob(object):
+    def __init__(self, status, percent_finished=0):
+
+        self.id = str(uuid.uuid4())
+        self.status = status
+        self.job_log = DummyJobLog(percent_finished)
+
+
+class DummyStageController(object):
+    def __init__(self, finished_until=None):
+
+        self._finished_until = finished_until
+        self.jobs = {}
+        self.release = threading.Event()
+        self.stage_result = None
+
+    def get_job_details(self, step_id):
+        return self.jobs.get(step_id, None)
+
+    def process_stage(self, stage_nr):
+
+        assert self.release.wait(timeout=10)
+        if isinstance(self.stage_result, Exception):
+            raise self.stage_result
+        return self.stage_result
+
+
+class DummyStagePipeline(object):
+    def __init__(self, controller):
+
+        self.controller = controller
+
+    def get_steps_by_stage(self):
+        return {1: {"a": None}, 2: {"b": None, "c": None}, 3: {"d": None}}
+
+
+def test_stage_processing_job():
+
+    controller = DummyStageController()
+    # a job from a previous run
+    controller.jobs["a"] = DummyStepJob(JobStatus.SUCCESS)
+    job = StageProcessingJob(DummyStagePipeline(controller), stage_nr=2)
+
+    assert not job.done
+    assert job.step_status() == {
+        1: {"a": "processing"},
+        2: {"b": "waiting", "c": "waiting"},
+    }
+    assert job.progress() == 0.0
+
+    job.start()
+    controller.jobs["a"] = DummyStepJob(JobStatus.SUCCESS)
+    controller.jobs["b"] = DummyStepJob(JobStatus.STARTED, percent_finished=50)
+    assert job.step_status() == {
+        1: {"a": "success"},
+        2: {"b": "processing", "c": "processing"},
+    }
+    assert job.progress() == pytest.approx(0.5)
+    with pytest.raises(Exception):
+        job.result()
+
+    controller.jobs["b"] = DummyStepJob(JobStatus.SUCCESS)
+    controller.stage_result = {
+        1: {"a": controller.jobs["a"].id},
+        2: {"b": CachedJobId(controller.jobs["b"].id), "c": None},
+    }
+    controller.release.set()
+    assert job.wait(timeout=10)
+
+    assert job.result() == controller.stage_result
+    assert job.error is None
+    assert job.step_status() == {
+        1: {"a": "success"},
+        2: {"b": "cached", "c": "skipped"},
+    }
+    assert job.progress() == 1.0
+    assert job.elapsed > 0
+    with pytest.raises(Exception):
+        job.start()
+
+
+def test_stage_processing_job_finished_stages():
+
+    # the first stage was processed already, and its inputs did not change since
+    controller = DummyStageController(finished_until=0)
+    job = StageProcessingJob(DummyStagePipeline(controller), stage_nr=3)
+
+    job.start()
+    controller.jobs["b"] = DummyStepJob(JobStatus.FAILED)
+    controller.jobs["c"] = DummyStepJob(JobStatus.SUCCESS)
+    assert job.step_status() == {
+        1: {"a": "unchanged"},
+        2: {"b": "failed", "c": "success"},
+        3: {"d": "processing"},
+    }
+    assert job.progress() == pytest.approx(2 / 3)
+
+    controller.stage_result = Exception("Pipeline already running.")
+    controller.release.set()
+    assert job.wait(timeout=10)
+    assert job.error is controller.stage_result
+    with pytest.raises(Exception) as e:
+        job.result()
+    assert e.value is controller.stage_result
+
+
+class DummyProcessorController(object):
+    def __init__(self, processor):
+
+        self._processor = processor
+        self._is_running = False
+
+
+class DummyProcessorPipeline(object):
+    def __init__(self, processor):
+
+        self.controller = DummyProcessorController(processor)
+
+
+def test_set_pipeline_max_workers():
+
+    with pytest.raises(ValueError):
+        create_module_processor(max_workers=0)
+
+    processor = create_module_processor()
+    processor._finished_jobs["job_1"] = "step_1"
+    pipeline = DummyProcessorPipeline(processor)
+    assert get_processor_max_workers(processor) == 1
+
+    set_pipeline_max_workers(pipeline, 1)
+    assert pipeline.controller._processor is processor
+
+    set_pipeline_max_workers(pipeline, 4)
+    thread_pool = pipeline.controller._processor
+    assert isinstance(thread_pool, ThreadPoolProcessor)
+    assert get_processor_max_workers(thread_pool) == 4
+    # details of previous jobs are kept, and they count as finished
+    assert thread_pool._finished_jobs == {"job_1": "step_1"}
+    assert thread_pool._futures["job_1"].done()
+
+    pipeline.controller._is_running = True
+    with pytest.raises(Exception):
+        set_pipeline_max_workers(pipeline, 2)
+    assert pipeline.controller._processor is thread_pool
+
+    pipeline.controller._is_running = False
+    set_pipeline_max_workers(pipeline, 1)
+    assert isinstance(pipeline.controller._processor, SynchronousProcessor)
+    assert pipeline.controller._processor._finished_jobs == {"job_1": "step_1"}
+    # the thread pool of the replaced processor was shut down
+    with pytest.raises(RuntimeError):
+        thread_pool._executor.submit(print)
+
+
+class DummyTimedJob(object):
+    def __init__(self, started, finished):
+
+        start = datetime.datetime(2022, 1, 1)
+        self.started = start + datetime.timedelta(seconds=started)
+        self.finished = (
+            start + datetime.timedelta(seconds=finished)
+            if finished is not None
+            else None
+        )
+
+
+def test_get_stage_runtimes():
+
+    jobs = {
+        "job_a": DummyTimedJob(0, 2),
+        "job_b": DummyTimedJob(1, 4),
+        "job_c": DummyTimedJob(0, None),
+        "job_d": DummyTimedJob(0, 100),
+    }
+    pipeline = DummyProcessorPipeline(None)
+    pipeline.controller.get_job_details = lambda job_id: jobs.get(job_id, None)
+
+    stage_result = {
+        "a": "job_a",
+        "b": "job_b",
+        # not finished, not run, failed, or not processed again
+        "c": "job_c",
+        "x": "job_x",
+        "e": None,
+        "f": Exception("failed"),
+        "d": CachedJobId("job_d"),
+    }
+    assert get_stage_runtimes(pipeline, stage_result) == (4.0, 5.0)
+    assert get_stage_runtimes(pipeline, {"d": CachedJobId("job_d"), "e": None}) is None
@@ -0,0 +1,161 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""Tests for `kiara_streamlit.pipelines`, run against 'st.kiara' like in a pipeline app."""
+
+import uuid
+
+import pytest
+import streamlit as st
+from kiara.data import Value
+
+from kiara_streamlit.components.pipeline import _is_same_input
+from kiara_streamlit.pipelines.pages import PipelinePage
+
+
+class DummyPipelineInputs(object):
+    def __init__(self, fields):
+
+        self.values = {
+            field: Value.construct(id=field, is_set=False) for field in fields
+        }
+        self.set_fields = []
+
+    def get(self, field):
+        return self.values[field]
+
+    def get_value_obj(self, field):
+        return self.values[field]
+
+    def set_values(self, **values):
+
+        self.set_fields.extend(values.keys())
+        result = {}
+        for field, data in values.items():
+            if data == "invalid":
+                result[field] = Exception("Invalid input.")
+                continue
+            if not isinstance(data, Value):
+                data = Value.construct(id=str(uuid.uuid4()), is_set=True)
+            self.values[field] = data
+            result[field] = True
+        return result
+
+
+class DummyPipeline(object):
+
+    id = "dummy_pipeline"
+
+    def __init__(self):
+
+        self.inputs = DummyPipelineInputs(["a", "b", "c"])
+
+
+class DummyApp(object):
+    def __init__(self, config=None):
+
+        self._pipeline = DummyPipeline()
+        self._config = config if config is not None else {}
+
+
+class DummyJob(object):
+    def __init__(self, stage_nr, done):
+
+        self.stage_nr = stage_nr
+        self.done = done
+
+
+class DummyPage(PipelinePage):
+    def run_page(self, st):
+        pass
+
+
+@pytest.fixture
+def page(st_kiara):
+
+    page = DummyPage(id="dummy")
+    page.set_app(DummyApp())  # type: ignore
+    return page
+
+
+def test_page_stage_job(page):
+
+    assert page.get_stage_job() is None
+    assert not page.is_processing()
+
+    job = DummyJob(stage_nr=2, done=False)
+    st.session_state[f"__pipeline_stage_job_{DummyPipeline.id}__"] = job
+    assert page.get_stage_job() is job
+    assert page.get_stage_job(stage_nr=2) is job
+    assert page.get_stage_job(stage_nr=1) is None
+    assert page.is_processing()
+
+    job.done = True
+    assert not page.is_processing()
+
+
+def test_is_same_input():
+
+    data = object()
+    assert _is_same_input("x", "x")
+    assert _is_same_input(None, None)
+    assert _is_same_input({"a": [1, (2.0, data)]}, {"a": [1, (2.0, data)]})
+
+    assert not _is_same_input(1, True)
+    assert not _is_same_input(1, 1.0)
+    assert not _is_same_input([1, 2], [1, 2, 3])
+    assert not _is_same_input({"a": 1}, {"b": 1})
+    # anything that is not simple data is only compared by identity
+    assert not _is_same_input({"a": object()}, {"a": object()})
+
+
+def test_set_pipeline_inputs(st_kiara):
+
+    pipeline = DummyPipeline()
+    inputs = pipeline.inputs
+    table = object()
+    selected = [1, 2]
+
+    def set_inputs(**values):
+        inputs.set_fields.clear()
+        result = st.kiara.set_pipeline_inputs(pipeline, values, render_errors=False)
+        assert set(result.keys()) == set(values.keys())
+        return inputs.set_fields
+
+    assert set_inputs(a="x", b=selected, c=table) == ["a", "b", "c"]
+    # only inputs that changed are set again
+    assert set_inputs(a="x", b=[1, 2], c=table) == []
+    assert set_inputs(a="y", b=[1, 2], c=object()) == ["a", "c"]
+    # in-place changes are detected, too
+    selected.append(3)
+    assert set_inputs(b=selected) == ["b"]
+    assert set_inputs(b=selected) == []
+
+    # the input was changed elsewhere
+    inputs.values["a"] = Value.construct(id="other", is_set=True)
+    assert set_inputs(a="y") == ["a"]
+
+    # invalid inputs are set again every time
+    assert set_inputs(a="invalid") == ["a"]
+    assert set_inputs(a="invalid") == ["a"]
+
+    # value objects are compared by id
+    value = Value.construct(id="value", is_set=True)
+    assert set_inputs(c=value) == ["c"]
+    assert set_inputs(c=value) == []
+    assert set_inputs(c=table) == ["c"]
+
+
+def test_page_set_pipeline_inputs(page):
+
+    inputs = page.pipeline.inputs
+    result = page.set_pipeline_inputs({"a": "x"}, render_errors=False)
+    assert set(result.keys()) == {"a"}
+    assert inputs.set_fields == ["a"]
+
+    # inputs are not changed while the pipeline is processed
+    st.session_state[f"__pipeline_stage_job_{DummyPipeline.id}__"] = DummyJob(
+        stage_nr=1, done=False
+    )
+    assert page.set_pipeline_inputs({"a": "y"}) == {}
+    assert inputs.set_fields == ["a"]
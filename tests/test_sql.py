@@ -0,0 +1,224 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""Tests for `kiara_streamlit.sql`."""
+
+import threading
+import time
+
+import duckdb
+import pyarrow as pa
+import pytest
+
+from kiara_streamlit.sql import (
+    SqlEngine,
+    SqlQueryCancelled,
+    SqlQueryJob,
+    find_referenced_relations,
+    limit_sql_query,
+    normalize_sql_query,
+)
+
+SLOW_QUERY = "SELECT sum(hash(range)) FROM range(100000000000)"
+
+
+def run_in_thread(func):
+
+    outcome = {}
+
+    def run():
+        try:
+            outcome["result"] = func()
+        except Exception as e:
+            outcome["error"] = e
+
+    thread = threading.Thread(target=run, daemon=True)
+    thread.start()
+    return thread, outcome
+
+
+def wait_for(condition, timeout=10):
+
+    started = time.perf_counter()
+    while not condition():
+        assert time.perf_counter() - started < timeout
+        time.sleep(0.01)
+
+
+def test_normalize_sql_query():
+
+    assert normalize_sql_query("  SELECT *\n  FROM data;  ") == "SELECT * FROM data"
+    assert normalize_sql_query("SELECT\t*   FROM data") == normalize_sql_query(
+        "SELECT * FROM data;"
+    )
+    # whitespace within quotes is significant
+    assert (
+        normalize_sql_query("SELECT 'a  b' AS \"x  y\"  FROM data")
+        == "SELECT 'a  b' AS \"x  y\" FROM data"
+    )
+
+
+def test_normalize_sql_query_comments():
+
+    connection = duckdb.connect(database=":memory:")
+
+    # the line break ends the comment, so these two are different queries
+    query_1 = "SELECT 1 AS x -- note\n, 2 AS y"
+    query_2 = "SELECT 1 AS x -- note , 2 AS y"
+    assert connection.execute(query_1).fetchall() == [(1, 2)]
+    assert connection.execute(query_2).fetchall() == [(1,)]
+    assert normalize_sql_query(query_1) != normalize_sql_query(query_2)
+
+    assert normalize_sql_query("SELECT /* a\ncomment */ *\nFROM data -- x") == (
+        "SELECT * FROM data"
+    )
+    # comment markers within quotes are not comments
+    assert (
+        normalize_sql_query("SELECT '--  a', \"/* b */\" FROM data")
+        == "SELECT '--  a', \"/* b */\" FROM data"
+    )
+
+
+def test_find_referenced_relations():
+
+    relation_names = ["data", "my-table", "Other", "data_2"]
+
+    assert find_referenced_relations("SELECT * FROM data", relation_names) == ["data"]
+    assert find_referenced_relations(
+        'SELECT * FROM "my-table" JOIN other USING (id)', relation_names
+    ) == ["my-table", "Other"]
+    # names are only matched as whole tokens
+    assert find_referenced_relations("SELECT * FROM data_2", relation_names) == [
+        "data_2"
+    ]
+    assert find_referenced_relations("SELECT metadata FROM x", relation_names) == []
+
+
+def test_limit_sql_query():
+
+    connection = duckdb.connect(database=":memory:")
+
+    query = limit_sql_query("SELECT * FROM range(100) ORDER BY 1 DESC;", limit=3)
+    assert connection.execute(query).fetchall() == [(99,), (98,), (97,)]
+
+    # a trailing comment must not swallow the rest of the wrapped query
+    query = limit_sql_query("SELECT * FROM range(100) -- a comment", limit=2)
+    assert len(connection.execute(query).fetchall()) == 2
+
+
+def test_sql_engine_query():
+
+    engine = SqlEngine()
+    table = pa.table({"a": list(range(10))})
+
+    result = engine.query("SELECT * FROM data ORDER BY a DESC", tables={"data": table})
+    assert result.num_rows == 10
+
+    result = engine.query(
+        "SELECT * FROM data ORDER BY a DESC;", tables={"data": table}, limit=3
+    )
+    assert result.column("a").to_pylist() == [9, 8, 7]
+    # statements that can't be used as sub-queries are run as they are, and their result is limited
+    assert engine.query("PRAGMA version", limit=1).num_rows == 1
+
+    # tables are only registered for the query that asked for them
+    with pytest.raises(duckdb.Error):
+        engine.query("SELECT * FROM data")
+
+
+def test_sql_engine_cancel_running():
+
+    engine = SqlEngine()
+    assert not engine.cancel("query")
+
+    thread, outcome = run_in_thread(lambda: engine.query(SLOW_QUERY, query_id="query"))
+    wait_for(lambda: "query" in engine._running)
+    assert engine.cancel("query", reason="timed out")
+    thread.join(timeout=10)
+
+    assert isinstance(outcome["error"], SqlQueryCancelled)
+    assert outcome["error"].reason == "timed out"
+    assert not engine.cancel("query")
+    # the engine is still usable
+    assert engine.query("SELECT 1 AS x").column("x").to_pylist() == [1]
+
+
+def test_sql_engine_cancel_pending():
+
+    engine = SqlEngine()
+
+    # holding the engine lock keeps the query from getting a cursor
+    with engine._lock:
+        thread, outcome = run_in_thread(
+            lambda: engine.query("SELECT 1", query_id="query")
+        )
+        wait_for(lambda: "query" in engine._pending)
+        assert engine.cancel("query")
+    thread.join(timeout=10)
+
+    assert isinstance(outcome["error"], SqlQueryCancelled)
+    assert outcome["error"].reason == "cancelled"
+
+
+def test_sql_query_job():
+
+    job = SqlQueryJob(lambda: 42, key="job").start()
+    assert job.wait(timeout=10)
+    assert job.done
+    assert job.result() == 42
+    assert job.error is None
+    with pytest.raises(Exception):
+        job.start()
+
+    def fail():
+        raise ValueError("invalid")
+
+    job = SqlQueryJob(fail).start()
+    assert job.wait(timeout=10)
+    assert isinstance(job.error, ValueError)
+    with pytest.raises(ValueError):
+        job.result()
+
+
+def test_sql_query_job_cancel():
+
+    release = threading.Event()
+    cancelled = []
+
+    def cancel():
+        cancelled.append(True)
+        release.set()
+
+    job = SqlQueryJob(lambda: release.wait(timeout=10), cancel=cancel).start()
+    assert not job.done
+    with pytest.raises(Exception):
+        job.result()
+
+    job.cancel()
+    assert job.done
+    assert cancelled == [True]
+    with pytest.raises(SqlQueryCancelled) as e:
+        job.result()
+    assert e.value.reason == "cancelled"
+
+    # cancelling a finished job does nothing
+    job.cancel()
+    assert cancelled == [True]
+
+
+def test_sql_query_job_timeout():
+
+    engine = SqlEngine()
+    job = SqlQueryJob(
+        lambda: engine.query(SLOW_QUERY, query_id="query"),
+        cancel=lambda: engine.cancel("query", reason="timed out"),
+        timeout=0.2,
+    ).start()
+
+    assert job.wait(timeout=10)
+    with pytest.raises(SqlQueryCancelled) as e:
+        job.result()
+    assert e.value.reason == "timed out"
+    assert 0.2 <= job.elapsed < 10
+    # the query itself was stopped, not only its result discarded
+    wait_for(lambda: "query" not in engine._running)
@@ -0,0 +1,131 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""Tests for `kiara_streamlit.table_utils`."""
+
+import pyarrow as pa
+import pytest
+
+from kiara_streamlit.table_utils import (
+    elide_binary_columns,
+    prepare_table_window,
+    project_columns,
+    sample_table,
+    truncate_strings,
+)
+
+
+def create_table() -> pa.Table:
+
+    return pa.table(
+        {
+            "id": list(range(10)),
+            "name": [f"name_{i}" * (i + 1) for i in range(10)],
+            "blob": [b"x" * i for i in range(10)],
+        }
+    )
+
+
+def test_project_columns():
+
+    table = create_table()
+
+    assert project_columns(table) is table
+    assert project_columns(table, ["name", "id"]).column_names == ["name", "id"]
+    # unknown columns are ignored
+    assert project_columns(table, ["id", "missing"]).column_names == ["id"]
+
+
+def test_truncate_strings():
+
+    table = pa.table(
+        {"a": ["short", "much too long", None], "b": ["much too long"] * 3}
+    )
+
+    truncated = truncate_strings(table, max_str_len=5)
+    assert truncated.column("a").to_pylist() == ["short", "much …", None]
+    assert truncated.column("b").to_pylist() == ["much …"] * 3
+
+    truncated = truncate_strings(table, max_str_len={"b": 4})
+    assert truncated.column("a").to_pylist() == ["short", "much too long", None]
+    assert truncated.column("b").to_pylist() == ["much…"] * 3
+
+    assert truncate_strings(table) is table
+
+
+def test_elide_binary_columns():
+
+    elided = elide_binary_columns(create_table())
+
+    assert elided.column_names == ["id", "name", "blob (bytes)"]
+    assert elided.column("blob (bytes)").to_pylist() == list(range(10))
+
+
+def test_prepare_table_window():
+
+    table = create_table()
+
+    window = prepare_table_window(
+        table,
+        offset=8,
+        length=5,
+        columns=["name", "blob"],
+        max_str_len=6,
+        elide_binary=True,
+    )
+    assert window.num_rows == 2
+    assert window.column_names == ["name", "blob (bytes)"]
+    assert window.column("name").to_pylist() == ["name_8…", "name_9…"]
+    assert window.column("blob (bytes)").to_pylist() == [8, 9]
+
+    # no options: the full table, unchanged
+    assert prepare_table_window(table).equals(table)
+
+
+def test_sample_table_head():
+
+    sample = sample_table(create_table(), method="head", size=30)
+    assert sample.column("id").to_pylist() == [0, 1, 2]
+
+
+def test_sample_table_random():
+
+    table = pa.table({"id": list(range(1000))})
+
+    sample = sample_table(table, method="random", size=10, seed=1)
+    ids = sample.column("id").to_pylist()
+    assert len(ids) == 100
+    assert len(set(ids)) == 100
+    # the original order is kept
+    assert ids == sorted(ids)
+    # the same seed always returns the same sample
+    assert sample.equals(sample_table(table, method="random", size=10, seed=1))
+
+    array = sample_table(pa.chunked_array([list(range(10)), list(range(10))]), size=50)
+    assert len(array) == 10
+
+
+def test_sample_table_stratified():
+
+    groups = ["a"] * 800 + ["b"] * 150 + ["c"] * 50
+    table = pa.table({"id": list(range(1000)), "group": groups})
+
+    sample = sample_table(
+        table, method="stratified", size=10, seed=1, stratify_by="group"
+    )
+    sampled_groups = sample.column("group").to_pylist()
+    assert sampled_groups.count("a") == 80
+    assert sampled_groups.count("b") == 15
+    assert sampled_groups.count("c") == 5
+
+    with pytest.raises(ValueError):
+        sample_table(table, method="stratified", size=10)
+
+
+def test_sample_table_invalid_args():
+
+    table = create_table()
+    with pytest.raises(ValueError):
+        sample_table(table, size=101)
+    with pytest.raises(ValueError):
+        sample_table(table, method="systematic")
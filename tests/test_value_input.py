@@ -0,0 +1,76 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""Tests for `kiara_streamlit.components.value_input`, run against 'st.kiara'."""
+
+import pytest
+import streamlit as st
+
+import kiara_streamlit.components
+from kiara_streamlit.defaults import ONBOARD_MAKER_KEY
+
+
+class DummyAliasIndex(object):
+    def __init__(self, aliases):
+
+        self.aliases = tuple(aliases)
+
+    def get_aliases(self, value_type="any"):
+        return self.aliases
+
+    def search(self, query, value_type="any"):
+        return self.aliases
+
+
+@pytest.fixture
+def alias_index(st_kiara, monkeypatch):
+
+    index = DummyAliasIndex([f"table_{i}" for i in range(5)])
+    monkeypatch.setattr(
+        kiara_streamlit.components, "get_alias_index", lambda data_store: index
+    )
+    return index
+
+
+@pytest.mark.parametrize("max_options", [10, 2])
+def test_value_select_box_onboarding(alias_index, max_options):
+
+    # without a 'no value' option, the onboard option is the pre-selected one
+    # (selecting it triggers a rerun, which is not an "Exception")
+    with pytest.raises(BaseException) as e:
+        st.kiara.value_select_box(
+            value_type="table",
+            onboard_options={"enabled": True, "source": "file"},
+            max_options=max_options,
+            key="select_table",
+        )
+    assert "Rerun" in type(e.value).__name__
+
+    assert st.session_state[ONBOARD_MAKER_KEY] == {
+        "enabled": True,
+        "source": "file",
+        "value_type": "table",
+        "store_key": "select_table",
+    }
+
+
+@pytest.mark.parametrize("max_options", [10, 2])
+def test_value_select_box_no_value(alias_index, max_options):
+
+    selected = st.kiara.value_select_box(
+        value_type="table",
+        add_no_value_option=True,
+        onboard_options={"enabled": True},
+        max_options=max_options,
+        key="select_table",
+    )
+    assert selected is None
+    assert ONBOARD_MAKER_KEY not in st.session_state.keys()
+
+
+def test_value_search_box_default(alias_index):
+
+    selected = st.kiara.value_search_box(
+        value_type="table", default="table_3", key="search_table"
+    )
+    assert selected == "table_3"